@@ -504,89 +504,68 @@ Key fixes in this version:
   2. Multi-booking with different routes/dates per vehicle
   3. Compact system prompt (< 300 tokens for fast response)
   4. No re module — pure string matching for greetings
-  5. Proxy-safe OpenAI caller (Mode 1: SDK, Mode 2: raw httpx)
+  5. Proxy-safe OpenAI caller (Mode 1: SDK, Mode 2: raw httpx) on
+     long-lived keep-alive clients from llm_clients
+  6. Rule-based intent parser (intent_parser.py) answers common phrasings
+     without an LLM round trip; unsure messages still go to the LLM
+  7. Parsed LLM output cached per normalised message (llm_cache) —
+     repeats and concurrent duplicates cost one LLM call
+  8. run_agent_async — awaits async LLM clients and runs DB work off the
+     event loop, so one slow chat no longer stalls the whole worker
+  9. Every stage is timed (core/metrics.py); step-by-step chatter is
+     DEBUG logging, off unless LOG_LEVEL=DEBUG
+ 10. stream_agent — the async pipeline as a sequence of stage events
+     (intent, dispatch, rows, message lines) for /api/chat/stream;
+     run_agent_async is just its last event
+ 11. run_batch_async — many messages: LLM parsing under a concurrency
+     cap, create_booking / create_multi_booking written in shared
+     transactions (/api/chat/batch)
+ 12. Prefix-stable prompt: SYSTEM_PROMPT is static (provider prompt
+     caching can reuse it); today's date travels in a tiny per-call
+     suffix, so it never goes stale. Prompt / cached token counts are
+     recorded per call (metrics.record_tokens)
+ 13. LLM calls go through llm_router — per-provider EWMA latency / error
+     rate, a timeout budget, a hedged request to the other provider when
+     the first is slow, and a circuit breaker for failing providers
+ 14. LLM_TOOL_MODE=native — the tools are declared as native function
+     schemas (tool_schemas.py) and the model answers with a function
+     call instead of JSON text; _extract_json is only used in json mode
 """
 from __future__ import annotations
 
+import asyncio
 import json
+import logging
+import time
 from datetime import datetime, date
+from typing import AsyncIterator, Iterator
+from app.core import metrics
 from app.core.config import settings
-from app.agents.tools import dispatch_tool
-
-# ─────────────────────────────────────────────────────────────────
-#  City abbreviation table  (used by LLM prompt + Python expander)
-# ─────────────────────────────────────────────────────────────────
-CITY_MAP: dict[str, str] = {
-    # Bhubaneswar
-    "bbsr": "Bhubaneswar", "bbs": "Bhubaneswar", "bhubaneswar": "Bhubaneswar",
-    # Visakhapatnam
-    "vskp": "Visakhapatnam", "vizag": "Visakhapatnam", "visakhapatnam": "Visakhapatnam",
-    # Hyderabad
-    "hyd": "Hyderabad", "hyderabad": "Hyderabad",
-    # Bangalore
-    "blr": "Bangalore", "bengaluru": "Bangalore", "bangalore": "Bangalore",
-    # Chennai
-    "maa": "Chennai", "mas": "Chennai", "chennai": "Chennai",
-    # Delhi
-    "del": "New Delhi", "ndls": "New Delhi", "delhi": "New Delhi", "new delhi": "New Delhi",
-    # Mumbai
-    "bom": "Mumbai", "cst": "Mumbai", "mumbai": "Mumbai", "bombay": "Mumbai",
-    # Kolkata
-    "kol": "Kolkata", "ccl": "Kolkata", "kolkata": "Kolkata", "calcutta": "Kolkata",
-    # Howrah
-    "hwh": "Howrah", "howrah": "Howrah",
-    # Pune
-    "pune": "Pune", "pnq": "Pune",
-    # Coimbatore
-    "cbe": "Coimbatore", "coimbatore": "Coimbatore",
-    # Thiruvananthapuram
-    "tvc": "Thiruvananthapuram", "trivandrum": "Thiruvananthapuram",
-    # Ahmedabad
-    "adi": "Ahmedabad", "ahmedabad": "Ahmedabad",
-    # Jaipur
-    "jp": "Jaipur", "jaipur": "Jaipur",
-    # Kochi
-    "cok": "Kochi", "kochi": "Kochi", "cochin": "Kochi",
-    # Guwahati
-    "gwl": "Guwahati", "guwahati": "Guwahati",
-    # Patna
-    "pnbe": "Patna", "patna": "Patna",
-    # Bhopal
-    "bpl": "Bhopal", "bhopal": "Bhopal",
-    # Nagpur
-    "ngp": "Nagpur", "nagpur": "Nagpur",
-    # Lucknow
-    "lko": "Lucknow", "lucknow": "Lucknow",
-    # Chandigarh
-    "cdg": "Chandigarh", "chandigarh": "Chandigarh",
-}
-
-def _expand_city(name: str | None) -> str | None:
-    """Expand any city abbreviation to full name. Case-insensitive."""
-    if not name:
-        return None
-    key = name.strip().lower()
-    expanded = CITY_MAP.get(key, name.strip().title())
-    if expanded != name.strip().title():
-        print(f"[Agent] 🗺️  City expanded: '{name}' → '{expanded}'")
-    return expanded
+from app.agents import llm_cache, llm_clients, llm_router, tool_schemas
+from app.agents.cities import city_hints, expand_city, prompt_abbreviations
+from app.agents.intent_parser import parse_intent
+from app.agents.tools import BOOKING_TOOLS, dispatch_tool, plan_bookings, write_booking_plans
 
+log = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────
-#  Dynamic system prompt  (compact — < 300 tokens)
+#  System prompt — static prefix (byte-identical every call, so the
+#  provider can cache it) + dynamic date suffix (_date_suffix, per call)
 # ─────────────────────────────────────────────────────────────────
 _VEHICLES    = " | ".join(settings.VEHICLE_TABLES)
 _HISTORY_TBL = settings.TABLE_NAME
-_TODAY       = date.today().strftime("%Y-%m-%d")
 
-# Build city abbreviation list for prompt
-_CITY_ABBR = (
-    "bbsr/bbs→Bhubaneswar, vskp/vizag→Visakhapatnam, hwh→Howrah, "
-    "hyd→Hyderabad, blr→Bangalore, maa→Chennai, del→New Delhi, "
-    "bom→Mumbai, kol→Kolkata, pune→Pune, cbe→Coimbatore, tvc→Thiruvananthapuram"
+# City abbreviation list for the prompt — the most common cities' codes from
+# the resolver's data file (file order, so the prefix stays byte-stable);
+# everything else is caught by the resolver in _expand_cities_in_args
+_CITY_ABBR = prompt_abbreviations(settings.CITY_PROMPT_MAX)
+
+_DATE_RULES = (
+    'DATE RULES: YYYY-MM-DD. "27th March 2026"→"2026-03-27". "3rd April"→"2026-04-03" (current year).\n'
+    '"today" / "tomorrow" / missing year → resolve against TODAY, given after these instructions.'
 )
 
-SYSTEM_PROMPT = f"""You are an AI Travel Booking Agent. Today: {_TODAY}. Vehicles: {_VEHICLES}.
+SYSTEM_PROMPT = f"""You are an AI Travel Booking Agent. Vehicles: {_VEHICLES}.
 Return ONLY valid JSON: {{"tool":"<name>","arguments":{{...}}}}
 
 TOOLS:
@@ -598,7 +577,7 @@ TOOLS:
    Use when: different vehicles have DIFFERENT routes OR DIFFERENT dates
    Example: bus A→B on D1, car B→A on D2
 
-3. get_travel_history: vehicle(str|null), start_date(YYYY-MM-DD|null), end_date(YYYY-MM-DD|null)
+3. get_travel_history: vehicle(str|null), start_date(YYYY-MM-DD|null), end_date(YYYY-MM-DD|null), limit(int|null — "last 5 trips"→5)
 
 4. update_booking_by_id: booking_id(int), vehicle, field(from|to|travel_date|status), value
    Use when: user gives an explicit booking #ID
@@ -623,7 +602,7 @@ PARSING RULES FOR update_booking_by_query:
 CITY EXPAND — ALWAYS use full names in ALL fields:
 {_CITY_ABBR}
 
-DATE RULES: YYYY-MM-DD. "27th March 2026"→"2026-03-27". "3rd April"→"2026-04-03". "today"→{_TODAY}
+{_DATE_RULES}
 
 STRICT:
 - Return ONLY JSON. No text, no markdown.
@@ -636,6 +615,54 @@ STRICT:
 """
 
 
+# Native function-calling mode: the tool list and argument shapes travel as
+# function schemas (tool_schemas.py), so the prompt keeps only the routing rules
+NATIVE_SYSTEM_PROMPT = f"""You are an AI Travel Booking Agent. Vehicles: {_VEHICLES}.
+Answer EVERY message with exactly ONE function call.
+
+CHOOSING:
+- Same route + date, one or more vehicles → create_booking (vehicles list)
+- Different routes or dates per vehicle → create_multi_booking
+- Explicit booking #ID → update_booking_by_id / delete_booking
+- No booking ID → update_booking_by_query: source / destination / current_date
+  FIND the booking; updates lists EVERY change (one message can change several fields)
+  "change HWH location as VSKP" → updates:[{{"field":"from","value":"Visakhapatnam"}}]
+
+CITY EXPAND — ALWAYS use full names in ALL fields:
+{_CITY_ABBR}
+
+{_DATE_RULES}
+"""
+
+
+def _native() -> bool:
+    return settings.LLM_TOOL_MODE == "native"
+
+
+def system_prompt() -> str:
+    """The static prompt for the configured LLM_TOOL_MODE."""
+    return NATIVE_SYSTEM_PROMPT if _native() else SYSTEM_PROMPT
+
+
+def llm_setup() -> tuple[str, list | None]:
+    """(system prompt, Gemini tools or None) — what llm_clients.warm_up builds the model with."""
+    return system_prompt(), (tool_schemas.gemini_tools() if _native() else None)
+
+
+def _date_suffix() -> str:
+    """The only per-day part of the instructions — sent after the static prefix."""
+    today = date.today()
+    return f"TODAY: {today.strftime('%Y-%m-%d')} ({today.strftime('%A')})"
+
+
+def _call_suffix(user_message: str) -> str:
+    """Per-call part after the static prefix: today's date + possible misspelt cities."""
+    hints = city_hints(user_message)
+    if not hints:
+        return _date_suffix()
+    return f"{_date_suffix()}\nPOSSIBLE CITY TYPOS (use only if the user meant that city): {hints}"
+
+
 # ─────────────────────────────────────────────────────────────────
 #  Greeting detection — no regex
 # ─────────────────────────────────────────────────────────────────
@@ -653,7 +680,7 @@ _GREETINGS = {
 def _is_greeting(text: str) -> bool:
     normalised = text.strip().lower().rstrip("!?.").strip()
     result = normalised in _GREETINGS
-    print(f"[Agent] 🔎 Greeting check: {normalised!r} → {result}")
+    log.debug(f"[Agent] 🔎 Greeting check: {normalised!r} → {result}")
     return result
 
 
@@ -663,7 +690,7 @@ def _human_response(text: str) -> dict:
     tg     = "Good morning" if hour < 12 else ("Good afternoon" if hour < 17 else "Good evening")
     prov   = "OpenAI GPT" if settings.LLM_PROVIDER == "openai" else "Google Gemini"
 
-    print(f"[Agent] 💬 Chitchat reply for: {lower!r}")
+    log.debug(f"[Agent] 💬 Chitchat reply for: {lower!r}")
 
     if   "good morning"   in lower: r = f"Good morning! 🌅 Ready to plan your next trip? I can book trains 🚆, buses 🚌, flights ✈️, cars 🚗, bikes 🏍️!"
     elif "good afternoon" in lower: r = f"Good afternoon! ☀️ Where are you travelling today? Just tell me and I'll book it instantly!"
@@ -696,7 +723,7 @@ def _human_response(text: str) -> dict:
     else:
         r = f"{tg}! 👋 I'm your AI Travel Booking Agent. What trip can I help with today?"
 
-    print(f"[Agent] 💬 Reply: {r[:80]}...")
+    log.debug(f"[Agent] 💬 Reply: {r[:80]}...")
     return {"success": True, "message": r, "tool_called": "chitchat", "arguments": {"input": text}}
 
 
@@ -704,7 +731,7 @@ def _human_response(text: str) -> dict:
 #  JSON extractor — brace counting, no regex
 # ─────────────────────────────────────────────────────────────────
 def _extract_json(text: str) -> dict:
-    print(f"[Agent] 🔍 Extracting JSON ({len(text)} chars): {text[:100]!r}")
+    log.debug(f"[Agent] 🔍 Extracting JSON ({len(text)} chars): {text[:100]!r}")
     cleaned = text.strip()
     for fence in ("```json", "```JSON", "```"):
         cleaned = cleaned.replace(fence, "")
@@ -728,7 +755,7 @@ def _extract_json(text: str) -> dict:
         raise ValueError(f"Unmatched braces in: {cleaned[:300]}")
 
     json_str = cleaned[start:end]
-    print(f"[Agent] ✅ JSON: {json_str[:200]}")
+    log.debug(f"[Agent] ✅ JSON: {json_str[:200]}")
     return json.loads(json_str)
 
 
@@ -740,6 +767,8 @@ def _expand_cities_in_args(tool_name: str, arguments: dict) -> dict:
     """
     Safety net: expand city abbreviations in ALL argument fields after LLM response.
     Handles: source, destination, value, updates list, bookings list.
+    expand_city resolves station / airport codes and unique name prefixes —
+    never near-miss spellings, so an unknown city is kept as the user wrote it.
     """
     args = dict(arguments)
 
@@ -747,16 +776,16 @@ def _expand_cities_in_args(tool_name: str, arguments: dict) -> dict:
     for field in ("source", "destination"):
         if field in args and isinstance(args[field], str):
             orig = args[field]
-            args[field] = _expand_city(orig)
+            args[field] = expand_city(orig)
             if args[field] != orig:
-                print(f"[Agent] 🗺️  Expanded '{field}': '{orig}' → '{args[field]}'")
+                log.debug(f"[Agent] 🗺️  Expanded '{field}': '{orig}' → '{args[field]}'")
 
-    # Single update 'value' field (for update_booking_by_id)
-    if "value" in args and isinstance(args["value"], str):
+    # Single update 'value' field (for update_booking_by_id) — only when it is a city
+    if "value" in args and isinstance(args["value"], str) and args.get("field") in ("from", "to"):
         orig = args["value"]
-        args["value"] = _expand_city(orig)
+        args["value"] = expand_city(orig)
         if args["value"] != orig:
-            print(f"[Agent] 🗺️  Expanded 'value': '{orig}' → '{args['value']}'")
+            log.debug(f"[Agent] 🗺️  Expanded 'value': '{orig}' → '{args['value']}'")
 
     # updates list: [{field, value}, ...] — expand city values
     if "updates" in args and isinstance(args["updates"], list):
@@ -766,9 +795,9 @@ def _expand_cities_in_args(tool_name: str, arguments: dict) -> dict:
             # Only expand city values for from/to fields
             if nu.get("field") in ("from", "to", "from_loc", "to_loc", "source", "destination"):
                 orig = nu.get("value", "")
-                nu["value"] = _expand_city(orig) or orig
+                nu["value"] = expand_city(orig) or orig
                 if nu["value"] != orig:
-                    print(f"[Agent] 🗺️  Expanded update value: '{orig}' → '{nu['value']}'")
+                    log.debug(f"[Agent] 🗺️  Expanded update value: '{orig}' → '{nu['value']}'")
             expanded_updates.append(nu)
         args["updates"] = expanded_updates
 
@@ -777,8 +806,8 @@ def _expand_cities_in_args(tool_name: str, arguments: dict) -> dict:
         expanded_bookings = []
         for b in args["bookings"]:
             nb = dict(b)
-            nb["source"]      = _expand_city(nb.get("source", "")) or nb.get("source", "")
-            nb["destination"] = _expand_city(nb.get("destination", "")) or nb.get("destination", "")
+            nb["source"]      = expand_city(nb.get("source", "")) or nb.get("source", "")
+            nb["destination"] = expand_city(nb.get("destination", "")) or nb.get("destination", "")
             expanded_bookings.append(nb)
         args["bookings"] = expanded_bookings
 
@@ -786,139 +815,568 @@ def _expand_cities_in_args(tool_name: str, arguments: dict) -> dict:
 
 
 # ─────────────────────────────────────────────────────────────────
-#  LLM callers
+#  LLM callers — clients come from llm_clients (built once, kept alive)
 # ─────────────────────────────────────────────────────────────────
-def _call_openai(user_message: str) -> str:
-    api_key  = settings.OPENAI_API_KEY
-    model    = settings.OPENAI_MODEL
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user",   "content": user_message},
-    ]
-    print(f"[LLM] 🤖 OpenAI | model={model}")
-
-    # Mode 1: SDK + explicit httpx.Client
-    try:
-        import httpx
-        from openai import OpenAI
-        print("[LLM] 📡 Mode 1: SDK ...")
-        http = httpx.Client(
-            timeout=httpx.Timeout(connect=5.0, read=30.0, write=8.0, pool=5.0),
-            follow_redirects=True,
-        )
-        client = OpenAI(api_key=api_key, http_client=http)
-        resp   = client.chat.completions.create(
-            model           = model,
-            messages        = messages,
-            temperature     = 0,
-            max_tokens      = 250,
-            response_format = {"type": "json_object"},
-        )
-        content = resp.choices[0].message.content
-        print(f"[LLM] ✅ SDK success | tokens={resp.usage.total_tokens}")
-        return content
-    except TypeError as te:
-        if "proxies" in str(te) or "unexpected keyword" in str(te):
-            print(f"[LLM] ⚠️  SDK TypeError ({te}) → Mode 2")
-        else:
-            raise
-    except Exception as exc:
-        print(f"[LLM] ❌ SDK error: {exc}")
-        raise
-
-    # Mode 2: Raw httpx POST
-    import httpx
-    print("[LLM] 📡 Mode 2: raw httpx ...")
-    payload = {
-        "model": model, "temperature": 0, "max_tokens": 250,
-        "response_format": {"type": "json_object"},
-        "messages": messages,
+def _openai_request(user_message: str) -> dict:
+    request = {
+        "model":       settings.OPENAI_MODEL,
+        "temperature": 0,
+        "max_tokens":  250,
+        "messages": [
+            {"role": "system", "content": system_prompt()},    # static → provider prompt cache
+            {"role": "system", "content": _call_suffix(user_message)},
+            {"role": "user",   "content": user_message},
+        ],
     }
-    with httpx.Client(timeout=35.0) as cl:
-        r = cl.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-            json=payload,
-        )
-        r.raise_for_status()
-        content = r.json()["choices"][0]["message"]["content"]
-        print(f"[LLM] ✅ Mode 2 success ({len(content)} chars)")
-        return content
-
-
-def _call_gemini(user_message: str) -> str:
-    import google.generativeai as genai
-    print(f"[LLM] 🤖 Gemini | model={settings.GEMINI_MODEL}")
-    genai.configure(api_key=settings.GEMINI_API_KEY)
-    model = genai.GenerativeModel(
-        model_name=settings.GEMINI_MODEL,
-        system_instruction=SYSTEM_PROMPT,
-        generation_config={"response_mime_type": "application/json", "temperature": 0},
+    if _native():
+        request["tools"]       = tool_schemas.openai_tools()
+        request["tool_choice"] = "required"
+    else:
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+
+def _field(obj, name: str):
+    """Attribute or dict key — SDK objects and raw JSON carry the same usage fields."""
+    if obj is None:
+        return None
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def _record_openai_usage(usage) -> None:
+    details = _field(usage, "prompt_tokens_details")
+    metrics.record_tokens(
+        "openai",
+        prompt     = _field(usage, "prompt_tokens") or 0,
+        cached     = _field(details, "cached_tokens") or 0,
+        completion = _field(usage, "completion_tokens") or 0,
+    )
+
+
+def _record_gemini_usage(resp) -> None:
+    usage = getattr(resp, "usage_metadata", None)
+    metrics.record_tokens(
+        "gemini",
+        prompt     = _field(usage, "prompt_token_count") or 0,
+        cached     = _field(usage, "cached_content_token_count") or 0,
+        completion = _field(usage, "candidates_token_count") or 0,
+    )
+
+
+def _is_proxy_type_error(te: TypeError) -> bool:
+    return "proxies" in str(te) or "unexpected keyword" in str(te)
+
+
+def _call_openai(user_message: str):
+    """The assistant message (SDK object or raw dict): .content in json mode, .tool_calls in native mode."""
+    request = _openai_request(user_message)
+    log.debug(f"[LLM] 🤖 OpenAI | model={request['model']}")
+
+    # Mode 1: SDK on the shared keep-alive httpx.Client
+    if llm_clients.openai_sdk_usable():
+        try:
+            log.debug("[LLM] 📡 Mode 1: SDK ...")
+            resp    = llm_clients.openai_client().chat.completions.create(**request)
+            message = resp.choices[0].message
+            _record_openai_usage(resp.usage)
+            log.debug(f"[LLM] ✅ SDK success | tokens={resp.usage.total_tokens}")
+            return message
+        except TypeError as te:
+            if not _is_proxy_type_error(te):
+                raise
+            llm_clients.disable_openai_sdk(te)
+        except Exception as exc:
+            log.error(f"[LLM] ❌ SDK error: {exc}")
+            raise
+
+    # Mode 2: Raw httpx POST on the same pooled client
+    log.debug("[LLM] 📡 Mode 2: raw httpx ...")
+    r = llm_clients.http_client().post(
+        llm_clients.OPENAI_CHAT_URL, headers=llm_clients.openai_headers(), json=request,
+    )
+    r.raise_for_status()
+    data    = r.json()
+    message = data["choices"][0]["message"]
+    _record_openai_usage(data.get("usage"))
+    log.debug("[LLM] ✅ Mode 2 success")
+    return message
+
+
+def _call_gemini(user_message: str):
+    log.debug(f"[LLM] 🤖 Gemini | model={settings.GEMINI_MODEL}")
+    resp = llm_clients.gemini_model(*llm_setup()).generate_content([_call_suffix(user_message), user_message])
+    _record_gemini_usage(resp)
+    log.debug("[LLM] ✅ Gemini success")
+    return resp
+
+
+async def _call_openai_async(user_message: str):
+    """Async twin of _call_openai — awaits the HTTP round trip instead of blocking the loop."""
+    request = _openai_request(user_message)
+    log.debug(f"[LLM] 🤖 OpenAI (async) | model={request['model']}")
+
+    if llm_clients.openai_sdk_usable():
+        try:
+            log.debug("[LLM] 📡 Mode 1: async SDK ...")
+            resp    = await llm_clients.openai_async_client().chat.completions.create(**request)
+            message = resp.choices[0].message
+            _record_openai_usage(resp.usage)
+            log.debug(f"[LLM] ✅ SDK success | tokens={resp.usage.total_tokens}")
+            return message
+        except TypeError as te:
+            if not _is_proxy_type_error(te):
+                raise
+            llm_clients.disable_openai_sdk(te)
+        except Exception as exc:
+            log.error(f"[LLM] ❌ SDK error: {exc}")
+            raise
+
+    log.debug("[LLM] 📡 Mode 2: raw async httpx ...")
+    r = await llm_clients.async_http_client().post(
+        llm_clients.OPENAI_CHAT_URL, headers=llm_clients.openai_headers(), json=request,
     )
-    resp = model.generate_content(user_message)
-    print(f"[LLM] ✅ Gemini success ({len(resp.text)} chars)")
-    return resp.text
+    r.raise_for_status()
+    data    = r.json()
+    message = data["choices"][0]["message"]
+    _record_openai_usage(data.get("usage"))
+    log.debug("[LLM] ✅ Mode 2 success")
+    return message
+
+
+async def _call_gemini_async(user_message: str):
+    log.debug(f"[LLM] 🤖 Gemini (async) | model={settings.GEMINI_MODEL}")
+    model = await llm_clients.gemini_model_async(*llm_setup())
+    resp  = await model.generate_content_async([_call_suffix(user_message), user_message])
+    _record_gemini_usage(resp)
+    log.debug("[LLM] ✅ Gemini success")
+    return resp
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Provider answer → {"tool", "arguments"}
+#  json mode: text → _extract_json;  native mode: the function call itself
+# ─────────────────────────────────────────────────────────────────
+def _plain(value):
+    """Gemini's proto maps / lists → dicts / lists; whole-number floats → int (ids, limits)."""
+    if hasattr(value, "items"):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) or type(value).__name__ == "RepeatedComposite":
+        return [_plain(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _openai_tool_call(message) -> dict:
+    calls = _field(message, "tool_calls") or []
+    if not calls:
+        raise _LLMParseError(ValueError("no function call in the response"), _field(message, "content") or "")
+    fn   = _field(calls[0], "function")
+    args = _field(fn, "arguments") or "{}"
+    try:
+        arguments = json.loads(args)
+    except ValueError as exc:
+        raise _LLMParseError(exc, args) from exc
+    return {"tool": _field(fn, "name"), "arguments": arguments}
+
+
+def _gemini_tool_call(resp) -> dict:
+    for candidate in getattr(resp, "candidates", None) or []:
+        for part in candidate.content.parts:
+            fc = getattr(part, "function_call", None)
+            if fc and fc.name:
+                return {"tool": fc.name, "arguments": _plain(fc.args)}
+    raise _LLMParseError(ValueError("no function call in the response"), str(resp)[:300])
+
+
+def _parse_openai(message) -> dict:
+    return _openai_tool_call(message) if _native() else _parse_raw(_field(message, "content") or "")
+
+
+def _parse_gemini(resp) -> dict:
+    return _gemini_tool_call(resp) if _native() else _parse_raw(resp.text)
 
 
 # ─────────────────────────────────────────────────────────────────
-#  Main entry point
+#  Pipeline steps shared by run_agent / run_agent_async
+# ─────────────────────────────────────────────────────────────────
+def _log_request(user_message: str) -> None:
+    log.debug(f"\n{'='*60}")
+    log.debug(f"[Agent] 📨 Message  : {user_message!r}")
+    log.debug(f"[Agent] ⚙️  Provider : {settings.LLM_PROVIDER.upper()}")
+    log.debug(f"[Agent] 🗄️  DB       : {settings.DB_NAME} | Table: {settings.TABLE_NAME}")
+    log.debug(f"{'='*60}")
+
+
+def _llm_failure(provider: str, exc: Exception) -> dict:
+    err = str(exc)
+    log.error(f"[Agent] ❌ LLM failed: {err}")
+    return {"success": False, "message": f"⚠️ LLM error ({provider}): {err}", "raw_response": err}
+
+
+def _local_tool_call(user_message: str) -> tuple[str, dict] | None:
+    """Step 0b: high-confidence rule-based parse, or None to fall back to the LLM."""
+    if not settings.INTENT_PARSER_ENABLED:
+        return None
+    with metrics.span("intent_parse"):
+        parsed = parse_intent(user_message)
+    if not parsed:
+        return None
+    return parsed["tool"], parsed["arguments"]
+
+
+class _LLMParseError(Exception):
+    """The LLM answered, but not with usable JSON — keeps the raw text for the reply."""
+
+    def __init__(self, exc: Exception, raw: str) -> None:
+        super().__init__(str(exc))
+        self.raw = raw
+
+
+def _parse_raw(raw: str) -> dict:
+    log.debug(f"[Agent] 📤 Raw output:\n{raw}")
+    try:
+        with metrics.span("json_extract"):
+            return _extract_json(raw)
+    except Exception as exc:
+        raise _LLMParseError(exc, raw) from exc
+
+
+def _llm_attempt(provider: str, user_message: str) -> dict:
+    """One provider's try: call → parsed tool call (an unusable answer fails the try, so the router moves on)."""
+    if provider == "openai":
+        return _parse_openai(_call_openai(user_message))
+    return _parse_gemini(_call_gemini(user_message))
+
+
+async def _llm_attempt_async(provider: str, user_message: str) -> dict:
+    if provider == "openai":
+        return _parse_openai(await _call_openai_async(user_message))
+    return _parse_gemini(await _call_gemini_async(user_message))
+
+
+def _llm_parse(user_message: str) -> dict:
+    """Step 1 + 2 (sync): routed LLM call → parsed JSON. This is what llm_cache stores."""
+    log.debug("[Agent] 🚀 Calling LLM (router) ...")
+    with metrics.span("llm_call"):
+        provider, parsed = llm_router.call(lambda p: _llm_attempt(p, user_message))
+    log.debug(f"[Agent] ✅ Answered by {provider.upper()}")
+    return parsed
+
+
+async def _llm_parse_async(user_message: str) -> dict:
+    log.debug("[Agent] 🚀 Calling LLM (router, async) ...")
+    with metrics.span("llm_call"):
+        provider, parsed = await llm_router.call_async(lambda p: _llm_attempt_async(p, user_message))
+    log.debug(f"[Agent] ✅ Answered by {provider.upper()}")
+    return parsed
+
+
+def _parse_failure(exc: _LLMParseError) -> dict:
+    log.error(f"[Agent] ❌ JSON parse error: {exc}")
+    return {"success": False, "message": f"⚠️ Could not parse LLM response: {exc}", "raw_response": exc.raw}
+
+
+def _provider_failure(exc: llm_router.ProviderError) -> dict:
+    """No provider produced usable JSON — report the first-tried provider's error."""
+    if isinstance(exc.error, _LLMParseError):
+        return _parse_failure(exc.error)
+    return _llm_failure(exc.provider, exc.error)
+
+
+async def _llm_tool_call_async(
+    user_message: str,
+    slots: asyncio.Semaphore | None = None,
+) -> tuple[str | None, dict, dict | None]:
+    """
+    Step 1–3 (async): cached, single-flight LLM parse → city expansion.
+    Returns (tool_name, arguments, None), or (None, {}, failure result).
+    slots caps concurrent provider calls (batch endpoint) — held only around
+    a real call, so cache hits and joined in-flight calls never wait for one.
+    """
+    async def call() -> dict:
+        if slots is None:
+            return await _llm_parse_async(user_message)
+        async with slots:
+            return await _llm_parse_async(user_message)
+
+    key = llm_cache.key_for(user_message, system_prompt())
+    try:
+        parsed = await llm_cache.aget_or_call(key, call)
+    except llm_router.ProviderError as exc:
+        return None, {}, _provider_failure(exc)
+    except Exception as exc:
+        return None, {}, _llm_failure(settings.LLM_PROVIDER, exc)
+
+    tool_name, arguments = _tool_call(parsed)
+    return tool_name, arguments, None
+
+
+def _tool_call(parsed: dict) -> tuple[str | None, dict]:
+    """Step 3: parsed JSON → (tool_name, city-expanded arguments)."""
+    tool_name = parsed.get("tool")
+    arguments = parsed.get("arguments", {})
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"[Agent] 🛠️  Tool      : {tool_name}")
+        log.debug(f"[Agent] 📋 Arguments : {json.dumps(arguments, indent=2, ensure_ascii=False)}")
+
+    # Expand city abbreviations (safety net for what LLM missed)
+    with metrics.span("city_expand"):
+        arguments = _expand_cities_in_args(tool_name, arguments)
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"[Agent] 🗺️  Expanded  : {json.dumps(arguments, indent=2, ensure_ascii=False)}")
+    return tool_name, arguments
+
+
+def _dispatch(tool_name: str | None, arguments: dict) -> dict:
+    """Step 4, timed (SQL statements inside get their own spans)."""
+    with metrics.span("dispatch"):
+        return dispatch_tool(tool_name, arguments)
+
+
+def _finish(tool_name: str | None, arguments: dict, result: dict) -> dict:
+    ok  = result.get("success", False)
+    msg = result.get("message", "")[:120]
+    log.debug(f"[Agent] {'✅' if ok else '❌'} success={ok} | {msg}")
+    log.debug(f"{'='*60}\n")
+
+    result["tool_called"] = tool_name
+    result["arguments"]   = arguments
+    return result
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Main entry points
 # ─────────────────────────────────────────────────────────────────
 def run_agent(user_message: str) -> dict:
     """
     Pipeline:
       0. Greeting → instant reply (no LLM cost)
-      1. LLM call
-      2. Parse JSON
+      0b. Rule-based intent parse → dispatch directly (no LLM cost)
+      1. LLM call        ┐ cached by normalised message (llm_cache, TTL + LRU,
+      2. Parse JSON      ┘ single-flight); routed / hedged by llm_router
       3. Expand city abbreviations (safety net)
       4. Dispatch tool
     """
-    print(f"\n{'='*60}")
-    print(f"[Agent] 📨 Message  : {user_message!r}")
-    print(f"[Agent] ⚙️  Provider : {settings.LLM_PROVIDER.upper()}")
-    print(f"[Agent] 🗄️  DB       : {settings.DB_NAME} | Table: {settings.TABLE_NAME}")
-    print(f"{'='*60}")
+    _log_request(user_message)
 
     # Step 0: Greeting shortcut
-    if _is_greeting(user_message):
+    with metrics.span("greeting_check"):
+        greeting = _is_greeting(user_message)
+    if greeting:
         return _human_response(user_message)
 
-    # Step 1: LLM call
-    provider = settings.LLM_PROVIDER.strip().lower()
-    try:
-        print(f"[Agent] 🚀 Calling {provider.upper()} ...")
-        raw = _call_openai(user_message) if provider == "openai" else _call_gemini(user_message)
-        print(f"[Agent] 📤 Raw output:\n{raw}")
-    except Exception as exc:
-        err = str(exc)
-        print(f"[Agent] ❌ LLM failed: {err}")
-        return {"success": False, "message": f"⚠️ LLM error ({provider}): {err}", "raw_response": err}
+    # Step 0b: Rule-based parse — common phrasings skip the LLM entirely
+    local = _local_tool_call(user_message)
+    if local:
+        tool_name, arguments = local
+        log.debug(f"[Agent] ⚡ Dispatching → {tool_name} (no LLM) ...")
+        return _finish(tool_name, arguments, _dispatch(tool_name, arguments))
 
-    # Step 2: Parse JSON
+    # Step 1 + 2: routed LLM call → JSON (cached per normalised message, single-flight)
+    key = llm_cache.key_for(user_message, system_prompt())
     try:
-        parsed = _extract_json(raw)
+        parsed = llm_cache.get_or_call(key, lambda: _llm_parse(user_message))
+    except llm_router.ProviderError as exc:
+        return _provider_failure(exc)
     except Exception as exc:
-        print(f"[Agent] ❌ JSON parse error: {exc}")
-        return {"success": False, "message": f"⚠️ Could not parse LLM response: {exc}", "raw_response": raw}
+        return _llm_failure(settings.LLM_PROVIDER, exc)
 
-    tool_name = parsed.get("tool")
-    arguments = parsed.get("arguments", {})
+    # Step 3: Expand cities
+    tool_name, arguments = _tool_call(parsed)
 
-    print(f"[Agent] 🛠️  Tool      : {tool_name}")
-    print(f"[Agent] 📋 Arguments : {json.dumps(arguments, indent=2, ensure_ascii=False)}")
+    # Step 4: Dispatch
+    log.debug(f"[Agent] ⚡ Dispatching → {tool_name} ...")
+    result = _dispatch(tool_name, arguments)
+    return _finish(tool_name, arguments, result)
 
-    # Step 3: Expand city abbreviations (safety net for what LLM missed)
-    arguments = _expand_cities_in_args(tool_name, arguments)
-    print(f"[Agent] 🗺️  Expanded  : {json.dumps(arguments, indent=2, ensure_ascii=False)}")
 
-    # Step 4: Dispatch
-    print(f"[Agent] ⚡ Dispatching → {tool_name} ...")
-    result = dispatch_tool(tool_name, arguments)
+async def run_agent_async(user_message: str) -> dict:
+    """
+    Same pipeline as run_agent, but never blocks the event loop:
+      • the LLM round trip is awaited on the provider's async client
+      • dispatch_tool (psycopg2, pooled) runs in a worker thread
+    """
+    async for event, data in stream_agent(user_message):
+        if event == "result":
+            return data
+    raise RuntimeError("stream_agent ended without a result")   # unreachable
+
+
+def _message_events(text: str) -> Iterator[tuple[str, dict]]:
+    """One message event per line — the same shape on every path."""
+    for line in text.split("\n"):
+        yield "message", {"text": line}
+
+
+def _result_events(tool_name: str | None, arguments: dict, result: dict) -> Iterator[tuple[str, dict]]:
+    """rows → message line(s) → result, for a finished dispatch."""
+    result = _finish(tool_name, arguments, result)
+    yield "rows", {
+        "tool":     tool_name,
+        "success":  result.get("success", False),
+        "written":  len(result.get("bookings") or []) + len(result.get("updated_ids") or []),
+        "returned": len(result.get("records") or []),
+    }
+    yield from _message_events(result.get("message", ""))
+    yield "result", result
 
-    ok  = result.get("success", False)
-    msg = result.get("message", "")[:120]
-    print(f"[Agent] {'✅' if ok else '❌'} success={ok} | {msg}")
-    print(f"{'='*60}\n")
 
-    result["tool_called"] = tool_name
-    result["arguments"]   = arguments
-    return result
\ No newline at end of file
+async def stream_agent(user_message: str) -> AsyncIterator[tuple[str, dict]]:
+    """
+    The async pipeline as (event, data) pairs, each produced the moment its
+    stage completes — /api/chat/stream sends them as Server-Sent Events:
+
+      intent   {"source": "greeting" | "rules" | "llm", "tool", "arguments"}
+      stage    {"stage": "llm_call" | "dispatch", ...}
+      rows     {"tool", "success", "written", "returned"}
+      message  {"text": one line of the reply}
+      result   the full result dict (what run_agent_async returns)
+    """
+    _log_request(user_message)
+
+    with metrics.span("greeting_check"):
+        greeting = _is_greeting(user_message)
+    if greeting:
+        yield "intent", {"source": "greeting", "tool": None, "arguments": None}
+        result = _human_response(user_message)
+        for event in _message_events(result["message"]):
+            yield event
+        yield "result", result
+        return
+
+    local = _local_tool_call(user_message)
+    if local:
+        tool_name, arguments = local
+        yield "intent", {"source": "rules", "tool": tool_name, "arguments": arguments}
+    else:
+        yield "stage", {"stage": "llm_call", "provider": settings.LLM_PROVIDER.strip().lower()}
+
+        tool_name, arguments, failure = await _llm_tool_call_async(user_message)
+        if failure:
+            for event in _message_events(failure["message"]):
+                yield event
+            yield "result", failure
+            return
+
+        yield "intent", {"source": "llm", "tool": tool_name, "arguments": arguments}
+
+    yield "stage", {"stage": "dispatch", "tool": tool_name}
+    log.debug(f"[Agent] ⚡ Dispatching → {tool_name} (worker thread) ...")
+    result = await asyncio.to_thread(_dispatch, tool_name, arguments)
+    for event in _result_events(tool_name, arguments, result):
+        yield event
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Batch entry point
+# ─────────────────────────────────────────────────────────────────
+async def _resolve_async(user_message: str, slots: asyncio.Semaphore) -> tuple[str, str | None, dict, dict | None]:
+    """(source, tool_name, arguments, finished result or None) — nothing dispatched yet."""
+    if _is_greeting(user_message):
+        return "greeting", None, {}, _human_response(user_message)
+    local = _local_tool_call(user_message)
+    if local:
+        return "rules", local[0], local[1], None
+    tool_name, arguments, failure = await _llm_tool_call_async(user_message, slots)
+    return "llm", tool_name, arguments, failure
+
+
+def _write_grouped(plans: dict[int, list], calls: list[tuple]) -> tuple[dict[int, dict], int]:
+    """
+    Worker thread: write planned bookings BATCH_WRITE_CHUNK messages per
+    transaction. A chunk that fails is retried message by message, so one
+    bad row only fails its own message. Returns (results by index, transactions).
+    """
+    results: dict[int, dict] = {}
+    order   = list(plans)
+    size    = max(1, settings.BATCH_WRITE_CHUNK)
+    txns    = 0
+    for start in range(0, len(order), size):
+        chunk = order[start:start + size]
+        try:
+            txns += 1
+            for i, result in zip(chunk, write_booking_plans([plans[i] for i in chunk])):
+                results[i] = result
+        except Exception as exc:
+            log.warning(f"[Batch] ⚠️  Grouped write of {len(chunk)} message(s) failed ({exc}) → one by one")
+            for i in chunk:
+                tool_name, arguments = calls[i]
+                txns += 1
+                results[i] = dispatch_tool(tool_name, arguments)
+    return results, txns
+
+
+def _dispatch_rest(indexes: list[int], calls: list[tuple]) -> dict[int, dict]:
+    """Worker thread: every other tool call, one by one, in message order."""
+    return {i: dispatch_tool(*calls[i]) for i in indexes}
+
+
+async def run_batch_async(messages: list[str]) -> dict:
+    """
+    Many messages, one response:
+      1. Resolve every message (greeting / rules / LLM cache / LLM)
+         concurrently — at most BATCH_LLM_CONCURRENCY provider calls in
+         flight; parser and cache hits never wait for a slot
+      2. create_booking / create_multi_booking calls are validated, then
+         written together (BATCH_WRITE_CHUNK messages per transaction)
+      3. Every other tool runs afterwards, in message order
+
+    Returns {"results": [result per message, in order], "timing": {...}}.
+    """
+    t0    = time.perf_counter()
+    slots = asyncio.Semaphore(max(1, settings.BATCH_LLM_CONCURRENCY))
+    log.debug(f"[Batch] 📦 {len(messages)} message(s), LLM concurrency {settings.BATCH_LLM_CONCURRENCY}")
+
+    with metrics.span("batch_parse"):
+        resolved = await asyncio.gather(*(_resolve_async(m, slots) for m in messages))
+    t_parse = time.perf_counter()
+
+    results: list[dict | None] = [None] * len(messages)
+    calls:   list[tuple]       = [(None, {})] * len(messages)
+    plans:   dict[int, list]   = {}
+    rest:    list[int]         = []
+    sources: dict[str, int]    = {"greeting": 0, "rules": 0, "llm": 0}
+    for i, (source, tool_name, arguments, done) in enumerate(resolved):
+        sources[source] += 1
+        calls[i] = (tool_name, arguments)
+        if done is not None:
+            results[i] = done
+            continue
+        if tool_name in BOOKING_TOOLS:
+            try:
+                groups = plan_bookings(tool_name, arguments)
+            except Exception:
+                groups = []            # dispatch it alone for the usual error message
+            if groups:
+                plans[i] = groups
+                continue
+        rest.append(i)
+
+    with metrics.span("batch_write"):
+        written, txns = await asyncio.to_thread(_write_grouped, plans, calls) if plans else ({}, 0)
+    t_write = time.perf_counter()
+
+    with metrics.span("batch_dispatch"):
+        others = await asyncio.to_thread(_dispatch_rest, rest, calls) if rest else {}
+    t_end = time.perf_counter()
+
+    for i, result in {**written, **others}.items():
+        results[i] = _finish(*calls[i], result)
+
+    return {
+        "results": results,
+        "timing": {
+            "messages":           len(messages),
+            "by_source":          sources,
+            "grouped_writes":     len(plans),
+            "write_transactions": txns,
+            "other_dispatches":   len(rest),
+            "succeeded":          sum(1 for r in results if r.get("success")),
+            "parse_ms":           round((t_parse - t0) * 1000, 2),
+            "write_ms":           round((t_write - t_parse) * 1000, 2),
+            "dispatch_ms":        round((t_end - t_write) * 1000, 2),
+            "total_ms":           round((t_end - t0) * 1000, 2),
+        },
+    }
@@ -0,0 +1,285 @@
+"""
+agents/cities.py
+================
+City / station resolver — codes, names and typos → canonical city name.
+
+Shared by the LLM prompt, the post-LLM safety net in booking_agent and
+the rule-based intent parser — kept in its own module so none of them
+has to import the others.
+
+Loaded once, at import (app startup), from settings.CITY_DATA_FILE
+(app/data/cities.csv by default):
+
+  city,codes,aliases
+  Bhubaneswar,bbsr|bbs|bbi,bhubaneshwar
+
+  • codes   — station / airport codes: exact match only (three or four
+              letters are too short to fuzz without false hits)
+  • aliases — old names, spellings; the city itself is always one.
+              Matched exactly, then by unique prefix ("bhubanes")
+
+Near-miss spellings ("bhubaneswr", "pnue") are only ever suggestions:
+city_hints() lists them for the LLM prompt, but resolve_city / expand_city
+— whose results end up in booking rows — never use them. A real city that
+isn't in the CSV ("Manali") must stay what the user typed, not become the
+nearest known one. Suggestions need the same first letter, at most 1 edit
+below 8 letters (2 from 8 up), and a clear winner: the runner-up city
+must be further away, not tied.
+
+Indexes, built once at load:
+  exact    dict   alias → city
+  prefix   trie   each node knows which cities' names pass through it
+  fuzzy    dict   every name with up to 2 letters deleted → names
+           (symmetric-delete: a typo and its name share a deleted form,
+           so a lookup is ~50 dict probes plus a bounded distance check
+           on the few candidates — no scan over all names)
+
+Results are memoised, so a repeat is one dict hit. Anything not matched
+resolves to nothing, and the caller keeps the user's text.
+"""
+from __future__ import annotations
+
+import csv
+import functools
+import logging
+import re
+import time
+from pathlib import Path
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_MIN_FUZZY  = 4                 # shorter keys: exact only
+_MIN_PREFIX = 5                 # shortest key completed by unique prefix
+_LONG_KEY   = 8                 # keys this long may be _MAX_EDITS off; shorter ones 1
+_MAX_EDITS  = 2
+_MAX_HINTS  = 3                 # city suggestions per prompt
+_SUFFIXES   = ("railway station", "station", "airport", "junction", "jn", "city", "central")
+_WORD       = re.compile(r"[a-z]+")
+
+
+def _max_distance(key: str) -> int:
+    return _MAX_EDITS if len(key) >= _LONG_KEY else 1
+
+
+def _deletes(word: str, depth: int) -> set[str]:
+    """word with 0..depth letters removed."""
+    found, frontier = {word}, {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def _distance(a: str, b: str, bound: int) -> int:
+    """Edit distance (adjacent swap = 1 edit); anything past `bound` is bound + 1."""
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    prev, row = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i]
+        for j in range(1, len(b) + 1):
+            best = min(cur[j - 1] + 1, row[j] + 1, row[j - 1] + (a[i - 1] != b[j - 1]))
+            if prev is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                best = min(best, prev[j - 2] + 1)
+            cur.append(best)
+        if min(cur) > bound:
+            return bound + 1
+        prev, row = row, cur
+    return min(row[-1], bound + 1)
+
+
+def normalize(name: str) -> str:
+    """'Howrah Jn.' → 'howrah' — lowercase, no dots/hyphens, no station suffix."""
+    key = " ".join(name.lower().replace(".", " ").replace("-", " ").split())
+    for suffix in _SUFFIXES:
+        if key.endswith(" " + suffix):
+            key = key[: -len(suffix) - 1]
+    return key
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Resolver
+# ─────────────────────────────────────────────────────────────────
+class _Node:
+    __slots__ = ("children", "cities")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.cities:   set[str]         = set()    # cities whose names pass through here
+
+
+class CityResolver:
+    def __init__(self) -> None:
+        self._root   = _Node()
+        self._fuzzy: dict[str, list[str]] = {}      # deleted form → names
+        self.exact:  dict[str, str]       = {}      # alias → city (codes + names)
+        self.codes:  dict[str, list[str]] = {}      # city → codes, file order
+        self.source  = ""
+        self.load_ms = 0.0
+        self.resolve = functools.lru_cache(maxsize=4096)(self._resolve)
+        self.suggest = functools.lru_cache(maxsize=4096)(self._suggest)
+
+    def add(self, alias: str, city: str, fuzzy: bool) -> None:
+        known = self.exact.get(alias)
+        if known is not None:
+            if known != city:
+                log.warning(f"[Cities] ⚠️  '{alias}' already maps to {known} — ignored for {city}")
+            return
+        self.exact[alias] = city
+        if not fuzzy:
+            return
+        node = self._root
+        for ch in alias:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+            node.cities.add(city)
+        for form in _deletes(alias, _MAX_EDITS):
+            self._fuzzy.setdefault(form, []).append(alias)
+
+    def _resolve(self, key: str) -> str | None:
+        """Exact alias, or a unique prefix of one — safe to store."""
+        city = self.exact.get(key)
+        if city is not None or len(key) < _MIN_FUZZY:
+            return city
+
+        node = self._root
+        for ch in key:
+            node = node.children.get(ch)
+            if node is None:
+                break
+        else:
+            if len(key) >= _MIN_PREFIX and len(node.cities) == 1:
+                return next(iter(node.cities))
+        return None
+
+    def _suggest(self, key: str) -> str | None:
+        """A near-miss spelling's city — a hint only, never stored."""
+        if len(key) < _MIN_FUZZY or self.resolve(key) is not None:
+            return None
+        return self._nearest(key, _max_distance(key))
+
+    def _nearest(self, key: str, bound: int) -> str | None:
+        """
+        Closest name within `bound` edits that starts with the same letter;
+        None if none, or if the runner-up city is just as close.
+        """
+        names: set[str] = set()
+        for form in _deletes(key, bound):
+            names.update(n for n in self._fuzzy.get(form, ()) if n[0] == key[0])
+        by_city: dict[str, int] = {}
+        for name in names:
+            d = _distance(key, name, bound)
+            if d <= bound:
+                city = self.exact[name]
+                by_city[city] = min(d, by_city.get(city, d))
+        if not by_city:
+            return None
+        ranked = sorted(by_city.items(), key=lambda kv: kv[1])
+        if len(ranked) > 1 and ranked[1][1] <= ranked[0][1]:
+            return None
+        return ranked[0][0]
+
+    def stats(self) -> dict:
+        info = self.resolve.cache_info()
+        return {
+            "source":     self.source,
+            "cities":     len(self.codes),
+            "aliases":    len(self.exact),
+            "fuzzy_keys": len(self._fuzzy),
+            "load_ms":    round(self.load_ms, 2),
+            "cache_hits": info.hits,
+            "cache_size": info.currsize,
+        }
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Loading
+# ─────────────────────────────────────────────────────────────────
+CITY_MAP: dict[str, str] = {}      # exact alias → city (the intent parser's view)
+
+_resolver = CityResolver()
+
+
+def load(path: str | Path | None = None) -> CityResolver:
+    """(Re)build the resolver from a cities CSV; CITY_MAP is updated in place."""
+    global _resolver
+    path = Path(path or settings.CITY_DATA_FILE)
+    t0   = time.perf_counter()
+    res  = CityResolver()
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    # names first — a code that is also a name ("pune", "puri") stays fuzzy-matchable
+    for row in rows:
+        city = row["city"].strip()
+        res.codes[city] = [c.strip().lower() for c in (row["codes"] or "").split("|") if c.strip()]
+        for name in [city, *(row["aliases"] or "").split("|")]:
+            if name.strip():
+                res.add(normalize(name), city, fuzzy=True)
+    for city, codes in res.codes.items():
+        for code in codes:
+            res.add(code, city, fuzzy=False)
+    res.source  = str(path)
+    res.load_ms = (time.perf_counter() - t0) * 1000
+
+    _resolver = res
+    CITY_MAP.clear()
+    CITY_MAP.update(res.exact)
+    log.debug(f"[Cities] ✅ {len(res.codes)} cities / {len(res.exact)} aliases from {path.name} ({res.load_ms:.1f} ms)")
+    return res
+
+
+def resolver() -> CityResolver:
+    return _resolver
+
+
+load()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Public helpers
+# ─────────────────────────────────────────────────────────────────
+def resolve_city(name: str | None) -> str | None:
+    """Canonical city for a code / name / unique name prefix, or None. Never a guess."""
+    if not name:
+        return None
+    return _resolver.resolve(normalize(name))
+
+
+def expand_city(name: str | None) -> str | None:
+    """Expand any city abbreviation to full name. Case-insensitive; unknown names are title-cased."""
+    if not name:
+        return None
+    expanded = resolve_city(name) or name.strip().title()
+    if expanded != name.strip().title():
+        log.debug(f"[Agent] 🗺️  City expanded: '{name}' → '{expanded}'")
+    return expanded
+
+
+def city_hints(message: str) -> str:
+    """
+    'bhubaneswr→Bhubaneswar, pnue→Pune' for words (and word pairs) in a
+    message that look like misspelt cities — for the LLM prompt only; the
+    LLM decides, and whatever it returns is resolved exactly.
+    """
+    words = _WORD.findall(message.lower())
+    hints: dict[str, str] = {}
+    for key in [*words, *(f"{a} {b}" for a, b in zip(words, words[1:]))]:
+        city = _resolver.suggest(key)
+        if city is not None and key not in hints:
+            hints[key] = city
+            if len(hints) == _MAX_HINTS:
+                break
+    return ", ".join(f"{k}→{c}" for k, c in hints.items())
+
+
+def prompt_abbreviations(max_cities: int) -> str:
+    """'bbsr/bbs/bbi→Bhubaneswar, ...' for the first cities in the data file that have codes."""
+    parts = [
+        f"{'/'.join(codes)}→{city}"
+        for city, codes in _resolver.codes.items() if codes
+    ]
+    return ", ".join(parts[:max_cities])
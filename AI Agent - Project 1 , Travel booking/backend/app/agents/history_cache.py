@@ -0,0 +1,136 @@
+"""
+agents/history_cache.py
+=======================
+Read-through TTL + LRU cache for get_travel_history pages.
+
+The frontend re-reads history after every booking, so the same SELECT
+runs again and again between writes. get_travel_history looks here first:
+
+  key   = (vehicle, start_date, end_date, cursor, page_size)
+          (vehicle validated, dates already parsed to YYYY-MM-DD)
+  value = the page's raw rows (page_size + 1 of them, dates still date objects)
+
+Invalidation is by what a write touched, not a global flush:
+  every written row reports (vehicle, travel_date) — for updates both the
+  old and the new date — and only entries whose vehicle filter and date
+  range could contain that row are dropped (all of their pages).
+
+  • a generation counter stops a read that started before a write from
+    storing its (now stale) rows after the write invalidated
+  • HISTORY_CACHE_TTL bounds staleness from writes this process can't see
+    (other workers, manual SQL)
+
+Rows are copied in and out — callers may serialise them in place.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+HistoryKey = tuple   # (vehicle, start_date, end_date, cursor, page_size)
+Change     = tuple   # (vehicle, travel_date) — travel_date: "YYYY-MM-DD" | date | None | ANY_DATE
+
+ANY_DATE = object()  # a row whose date isn't known → matches every date range
+
+_lock:       threading.Lock                              = threading.Lock()
+_entries:    OrderedDict[HistoryKey, tuple[float, list]] = OrderedDict()
+_generation: int                                         = 0
+_stats:      dict[str, int] = {"hits": 0, "misses": 0, "invalidated": 0, "stale_puts": 0, "evictions": 0, "expired": 0}
+
+
+def _copy(rows: list[dict]) -> list[dict]:
+    return [dict(r) for r in rows]
+
+
+def _matches(key: HistoryKey, vehicle: str, travel_date) -> bool:
+    """Could a row (vehicle, travel_date) appear in this entry's filter?"""
+    k_vehicle, start, end = key[0], key[1], key[2]
+    if k_vehicle is not None and k_vehicle != vehicle:
+        return False
+    if travel_date is ANY_DATE:
+        return True
+    if travel_date is None:                      # NULL dates never pass a date filter
+        return start is None and end is None
+    d = str(travel_date)
+    return (start is None or d >= start) and (end is None or d <= end)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Read-through
+# ─────────────────────────────────────────────────────────────────
+def get_or_load(key: HistoryKey, load: Callable[[], list[dict]]) -> list[dict]:
+    """Cached rows for key, or load() them and remember the result."""
+    if not settings.HISTORY_CACHE_ENABLED:
+        return load()
+
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] < now:
+            del _entries[key]
+            _stats["expired"] += 1
+            entry = None
+        if entry is not None:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            rows = entry[1]
+        else:
+            _stats["misses"] += 1
+            generation = _generation
+    if entry is not None:
+        log.debug(f"[HistoryCache] 🎯 hit {key}")
+        return _copy(rows)
+
+    rows = load()
+    with _lock:
+        if generation != _generation:            # a write landed while we were reading
+            _stats["stale_puts"] += 1
+            return rows
+        _entries[key] = (time.monotonic() + settings.HISTORY_CACHE_TTL, _copy(rows))
+        _entries.move_to_end(key)
+        while len(_entries) > settings.HISTORY_CACHE_MAX:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+    return rows
+
+
+def invalidate(changes: Iterable[Change]) -> int:
+    """Drop every entry a written row (vehicle, travel_date) could belong to."""
+    global _generation
+    changes = list(changes)
+    with _lock:
+        _generation += 1
+        stale = [k for k in _entries if any(_matches(k, v, d) for v, d in changes)]
+        for k in stale:
+            del _entries[k]
+        _stats["invalidated"] += len(stale)
+    if stale:
+        log.debug(f"[HistoryCache] 🧹 {len(stale)} entr(y/ies) invalidated by {len(changes)} change(s)")
+    return len(stale)
+
+
+def clear() -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        _entries.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled":  settings.HISTORY_CACHE_ENABLED,
+            "size":     len(_entries),
+            "max_size": settings.HISTORY_CACHE_MAX,
+            "ttl_s":    settings.HISTORY_CACHE_TTL,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+            **_stats,
+        }
@@ -0,0 +1,267 @@
+"""
+agents/intent_parser.py
+=======================
+Deterministic, rule-based parser for the most common booking phrases —
+resolves them straight into dispatch_tool() arguments without an LLM call.
+
+Built only from what the agent already knows:
+  • CITY_MAP                  — source / destination (exact codes / names from
+                                the city resolver; typos go to the LLM path)
+  • settings.VEHICLE_TABLES   — vehicle names
+  • tools._parse_date         — dates (must resolve to YYYY-MM-DD)
+
+Recognised shapes (anything else → None → LLM fallback):
+  book/reserve <vehicle>[ and <vehicle>] [ticket] from <city> to <city> [on <date>|today|tomorrow]
+  show/list [my|all] [<vehicle>] history|bookings|trips
+  cancel/delete [<vehicle>] booking [#]<id>
+
+Precision over recall: every token must be understood, otherwise the
+message goes to the LLM. No re module — plain token matching, like the
+greeting detector.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from app.core.config import settings
+from app.agents.cities import CITY_MAP
+from app.agents.tools import _parse_date
+
+log = logging.getLogger(__name__)
+
+# ─────────────────────────────────────────────────────────────────
+#  Vocabulary
+# ─────────────────────────────────────────────────────────────────
+_VEHICLE_WORDS: dict[str, str] = {}
+for _v in settings.VEHICLE_TABLES:
+    _VEHICLE_WORDS[_v]       = _v
+    _VEHICLE_WORDS[_v + "s"] = _v
+    _VEHICLE_WORDS[_v + "es"] = _v       # "buses"
+
+_BOOK_VERBS    = {"book", "reserve", "buy"}
+_SHOW_VERBS    = {"show", "list", "view", "display", "get", "see", "fetch"}
+_DELETE_VERBS  = {"cancel", "delete", "remove"}
+_HISTORY_NOUNS = {"history", "bookings", "trips", "records"}
+_FILLER        = {"please", "pls", "me", "a", "an", "the", "one", "my", "all", "i", "want", "to", "can", "you"}
+_TICKET_WORDS  = {"ticket", "tickets", "seat", "seats"}
+_HISTORY_EXTRA = {"my", "all", "the", "me", "of", "past", "previous", "travel", "trip", "booking", "please", "pls"}
+_DELETE_EXTRA  = {"my", "the", "booking", "ticket", "reservation", "id", "number", "no", "please", "pls"}
+_MAX_CITY_WORDS = max(len(k.split()) for k in CITY_MAP)
+
+
+def _tokens(text: str) -> list[str]:
+    cleaned = text.strip().lower()
+    for ch in ",.!?;:()\"'":
+        cleaned = cleaned.replace(ch, " ")
+    return cleaned.replace("#", " # ").split()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Hit-rate / latency counters
+# ─────────────────────────────────────────────────────────────────
+_lock  = threading.Lock()
+_stats = {"attempts": 0, "hits": 0, "misses": 0, "total_us": 0.0, "by_tool": {}}
+
+
+def _record(tool: str | None, elapsed_s: float) -> None:
+    with _lock:
+        _stats["attempts"] += 1
+        _stats["total_us"] += elapsed_s * 1_000_000
+        if tool:
+            _stats["hits"] += 1
+            _stats["by_tool"][tool] = _stats["by_tool"].get(tool, 0) + 1
+        else:
+            _stats["misses"] += 1
+
+
+def stats() -> dict:
+    """How much LLM traffic the parser removed, and what it cost."""
+    with _lock:
+        attempts = _stats["attempts"]
+        return {
+            "enabled":            settings.INTENT_PARSER_ENABLED,
+            "attempts":           attempts,
+            "hits":               _stats["hits"],
+            "misses":             _stats["misses"],
+            "hit_rate":           round(_stats["hits"] / attempts, 3) if attempts else 0.0,
+            "llm_calls_avoided":  _stats["hits"],
+            "avg_parse_us":       round(_stats["total_us"] / attempts, 1) if attempts else 0.0,
+            "by_tool":            dict(_stats["by_tool"]),
+        }
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Pieces
+# ─────────────────────────────────────────────────────────────────
+def _take_city(tokens: list[str], i: int) -> tuple[str | None, int]:
+    """Longest known city starting at tokens[i] → (full name, next index)."""
+    for n in range(min(_MAX_CITY_WORDS, len(tokens) - i), 0, -1):
+        city = CITY_MAP.get(" ".join(tokens[i:i + n]))
+        if city:
+            return city, i + n
+    return None, i
+
+
+def _strict_date(tokens: list[str]) -> str | None:
+    """Date words → YYYY-MM-DD, or None if not unambiguous."""
+    if not tokens:
+        return None
+    if tokens == ["today"]:
+        return date.today().strftime("%Y-%m-%d")
+    if tokens == ["tomorrow"]:
+        return (date.today() + timedelta(days=1)).strftime("%Y-%m-%d")
+
+    words = []
+    for t in tokens:
+        for suffix in ("st", "nd", "rd", "th"):
+            if t.endswith(suffix) and t[:-len(suffix)].isdigit():
+                t = t[:-len(suffix)]
+                break
+        words.append(t)
+    if len(words) > 1 and not any(len(w) == 4 and w.isdigit() for w in words):
+        words.append(str(date.today().year))   # "27 March" → this year (same rule as the prompt)
+
+    parsed = _parse_date(" ".join(words))
+    try:
+        datetime.strptime(parsed or "", "%Y-%m-%d")
+    except ValueError:
+        return None
+    return parsed
+
+
+def _take_vehicles(tokens: list[str], i: int) -> tuple[list[str], int]:
+    found: list[str] = []
+    while i < len(tokens):
+        t = tokens[i]
+        if t in _VEHICLE_WORDS:
+            if _VEHICLE_WORDS[t] not in found:
+                found.append(_VEHICLE_WORDS[t])
+        elif not (t in ("and", "&", "+") and found):
+            break
+        i += 1
+    return found, i
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Intent grammars
+# ─────────────────────────────────────────────────────────────────
+def _parse_booking(tokens: list[str]) -> dict | None:
+    i = 0
+    while i < len(tokens) and tokens[i] in _FILLER:
+        i += 1
+    if i >= len(tokens) or tokens[i] not in _BOOK_VERBS:
+        return None
+    i += 1
+    while i < len(tokens) and tokens[i] in _FILLER:
+        i += 1
+
+    vehicles, i = _take_vehicles(tokens, i)
+    if not vehicles:
+        return None
+    while i < len(tokens) and tokens[i] in _TICKET_WORDS:
+        i += 1
+
+    if i >= len(tokens) or tokens[i] != "from":
+        return None
+    source, i = _take_city(tokens, i + 1)
+    if not source or i >= len(tokens) or tokens[i] != "to":
+        return None
+    destination, i = _take_city(tokens, i + 1)
+    if not destination or source == destination:
+        return None
+
+    rest = tokens[i:]
+    if rest and rest[0] in ("on", "for"):
+        rest = rest[1:]
+    travel_date = _strict_date(rest) if rest else None
+    if rest and not travel_date:
+        return None
+
+    return {
+        "tool": "create_booking",
+        "arguments": {
+            "vehicles":    vehicles,
+            "source":      source,
+            "destination": destination,
+            "date":        travel_date,
+        },
+    }
+
+
+def _parse_history(tokens: list[str]) -> dict | None:
+    if not tokens or not (tokens[0] in _SHOW_VERBS or tokens[0] == "my"):
+        return None
+    if not any(t in _HISTORY_NOUNS for t in tokens):
+        return None
+
+    vehicles = set()
+    for t in tokens[1:] if tokens[0] in _SHOW_VERBS else tokens:
+        if t in _VEHICLE_WORDS:
+            vehicles.add(_VEHICLE_WORDS[t])
+        elif t not in _HISTORY_NOUNS and t not in _HISTORY_EXTRA:
+            return None                      # date ranges etc. → LLM
+    if len(vehicles) > 1:
+        return None
+
+    return {
+        "tool": "get_travel_history",
+        "arguments": {
+            "vehicle":    vehicles.pop() if vehicles else None,
+            "start_date": None,
+            "end_date":   None,
+        },
+    }
+
+
+def _parse_delete(tokens: list[str]) -> dict | None:
+    if not tokens or tokens[0] not in _DELETE_VERBS:
+        return None
+
+    vehicle    = None
+    booking_id = None
+    for t in tokens[1:]:
+        if t.isdigit():
+            if booking_id is not None:
+                return None
+            booking_id = int(t)
+        elif t in _VEHICLE_WORDS:
+            if vehicle and vehicle != _VEHICLE_WORDS[t]:
+                return None
+            vehicle = _VEHICLE_WORDS[t]
+        elif t != "#" and t not in _DELETE_EXTRA:
+            return None
+    if booking_id is None:
+        return None
+
+    return {"tool": "delete_booking", "arguments": {"booking_id": booking_id, "vehicle": vehicle}}
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Entry point
+# ─────────────────────────────────────────────────────────────────
+def parse_intent(message: str) -> dict | None:
+    """
+    Resolve a message to {"tool", "arguments"} when the phrasing is
+    unambiguous; None means "not sure — ask the LLM".
+    """
+    start  = time.perf_counter()
+    tokens = _tokens(message)
+    parsed = None
+    if tokens:
+        head = tokens[0]
+        if head in _DELETE_VERBS:
+            parsed = _parse_delete(tokens)
+        elif head in _SHOW_VERBS or head == "my":
+            parsed = _parse_history(tokens)
+        if parsed is None:
+            parsed = _parse_booking(tokens)
+    _record(parsed["tool"] if parsed else None, time.perf_counter() - start)
+
+    if parsed:
+        log.debug(f"[Intent] ⚡ Local parse → {parsed['tool']} {parsed['arguments']}")
+    else:
+        log.debug("[Intent] ↪️  Not confident → LLM")
+    return parsed
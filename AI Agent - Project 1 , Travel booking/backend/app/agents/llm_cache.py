@@ -0,0 +1,207 @@
+"""
+agents/llm_cache.py
+===================
+TTL + LRU cache for the LLM's parsed tool call, with single-flight.
+
+The agent calls the LLM with temperature=0, so the same message produces
+the same {"tool", "arguments"} JSON — repeats don't need a second round
+trip. This cache sits between step 1 (LLM call) and step 2 (dispatch):
+
+  key   = sha256( sha256(SYSTEM_PROMPT) | today | provider:model | normalised message )
+          (the static prompt of the active LLM_TOOL_MODE; today stands in for
+           the date suffix — so json and native answers never mix)
+  value = parsed {"tool": ..., "arguments": {...}}  (never raw text, never errors)
+
+  • today is part of the key, so "tomorrow" never resolves to a stale date
+  • a prompt change (new deploy) changes the key, so old entries just age out
+  • concurrent identical messages share ONE in-flight LLM call
+    (aget_or_call for the async pipeline, get_or_call for the sync one);
+    async callers all await it through shield(), so one caller being
+    cancelled (disconnect, lost hedge) never cancels it for the others
+
+Only the LLM parse is cached — the tool itself still runs every time.
+"""
+from __future__ import annotations
+
+import logging
+import asyncio
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Awaitable, Callable
+
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+_lock:    threading.Lock                            = threading.Lock()
+_entries: OrderedDict[str, tuple[float, dict]]      = OrderedDict()
+_stats:   dict[str, int] = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0}
+
+_inflight_async: dict[str, asyncio.Task]   = {}
+_inflight_sync:  dict[str, "_Call"]        = {}
+
+_prompt_hash: tuple[str, str] = ("", "")      # (prompt, sha256) memo
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Keys
+# ─────────────────────────────────────────────────────────────────
+def normalize(message: str) -> str:
+    """Case / whitespace / trailing-punctuation insensitive form of a message."""
+    return " ".join(message.lower().split()).rstrip("!?.").strip()
+
+
+def _fingerprint(system_prompt: str) -> str:
+    global _prompt_hash
+    if _prompt_hash[0] is not system_prompt:
+        _prompt_hash = (system_prompt, hashlib.sha256(system_prompt.encode()).hexdigest())
+    return _prompt_hash[1]
+
+
+def key_for(message: str, system_prompt: str) -> str:
+    provider = settings.LLM_PROVIDER
+    model    = settings.OPENAI_MODEL if provider == "openai" else settings.GEMINI_MODEL
+    raw = "|".join((
+        _fingerprint(system_prompt),
+        date.today().isoformat(),
+        f"{provider}:{model}",
+        normalize(message),
+    ))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Storage
+# ─────────────────────────────────────────────────────────────────
+def _get(key: str) -> dict | None:
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            _stats["misses"] += 1
+            return None
+        expires_at, value = entry
+        if expires_at < now:
+            del _entries[key]
+            _stats["expired"] += 1
+            _stats["misses"]  += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits"] += 1
+    log.debug("[Cache] 🎯 LLM parse cache hit")
+    return copy.deepcopy(value)
+
+
+def _put(key: str, value: dict) -> None:
+    if not settings.LLM_CACHE_ENABLED:
+        return
+    with _lock:
+        _entries[key] = (time.monotonic() + settings.LLM_CACHE_TTL, copy.deepcopy(value))
+        _entries.move_to_end(key)
+        while len(_entries) > settings.LLM_CACHE_MAX:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def stats() -> dict:
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            "enabled":  settings.LLM_CACHE_ENABLED,
+            "size":     len(_entries),
+            "max_size": settings.LLM_CACHE_MAX,
+            "ttl_s":    settings.LLM_CACHE_TTL,
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+            "in_flight": len(_inflight_async) + len(_inflight_sync),
+            **_stats,
+        }
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Single-flight lookups
+# ─────────────────────────────────────────────────────────────────
+async def aget_or_call(key: str, call: Callable[[], Awaitable[dict]]) -> dict:
+    """Cached value, or join the in-flight call for this key, or make it."""
+    hit = _get(key)
+    if hit is not None:
+        return hit
+
+    task = _inflight_async.get(key)
+    if task is not None:
+        with _lock:
+            _stats["coalesced"] += 1
+        log.debug("[Cache] 🔗 Joining in-flight LLM call")
+    else:
+        task = _inflight_async[key] = asyncio.ensure_future(_run(key, call))
+        task.add_done_callback(_retrieve)
+    return copy.deepcopy(await asyncio.shield(task))
+
+
+async def _run(key: str, call: Callable[[], Awaitable[dict]]) -> dict:
+    """The shared call — its own task, so it outlives any one caller's cancellation."""
+    try:
+        value = await call()
+        _put(key, value)
+        return value
+    finally:
+        _inflight_async.pop(key, None)
+
+
+def _retrieve(task: asyncio.Task) -> None:
+    # Every caller may be gone by the time it fails — don't log "exception never retrieved"
+    if not task.cancelled():
+        task.exception()
+
+
+class _Call:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done  = threading.Event()
+        self.value: dict | None          = None
+        self.error: BaseException | None = None
+
+
+def get_or_call(key: str, call: Callable[[], dict]) -> dict:
+    """Thread-safe sync twin of aget_or_call (used by run_agent)."""
+    hit = _get(key)
+    if hit is not None:
+        return hit
+
+    with _lock:
+        pending = _inflight_sync.get(key)
+        leader  = pending is None
+        if leader:
+            pending = _inflight_sync[key] = _Call()
+        else:
+            _stats["coalesced"] += 1
+
+    if not leader:
+        log.debug("[Cache] 🔗 Joining in-flight LLM call")
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return copy.deepcopy(pending.value)
+
+    try:
+        pending.value = call()
+        _put(key, pending.value)
+        return copy.deepcopy(pending.value)
+    except BaseException as exc:
+        pending.error = exc
+        raise
+    finally:
+        with _lock:
+            _inflight_sync.pop(key, None)
+        pending.done.set()
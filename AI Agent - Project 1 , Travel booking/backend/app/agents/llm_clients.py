@@ -0,0 +1,297 @@
+"""
+agents/llm_clients.py
+=====================
+Process-wide LLM provider clients — created once, reused by every message.
+
+Before this module each message built a fresh httpx.Client + OpenAI client
+(or re-ran genai.configure + GenerativeModel), paying TLS setup and client
+construction on every request. Here:
+
+  • One httpx.Client and one httpx.AsyncClient with keep-alive pooling
+    (HTTP/2 when the optional 'h2' package is installed) back both the
+    OpenAI SDK and the raw-httpx fallback.
+  • OpenAI / AsyncOpenAI and the Gemini GenerativeModel are built lazily on
+    first use and cached.
+  • warm_up() is called from the FastAPI startup event so the first user
+    doesn't pay the TLS handshake; aclose() runs on shutdown.
+  • Gemini: with LLM_PROMPT_CACHE the static system prompt is uploaded once
+    as a CachedContent (refreshed before its TTL runs out — the replaced one
+    simply expires); if the model or prompt doesn't qualify, it falls back
+    to a plain system_instruction. One model per prompt, so the JSON and
+    native function-calling modes (LLM_TOOL_MODE) can coexist.
+    Async callers use gemini_model_async(): building the model (blocking
+    network calls under a thread lock) happens in a worker thread, and an
+    expiring prompt cache is rebuilt in the background.
+
+OpenAI proxy fix (openai==1.30.1 + httpx>0.26.0):
+  If the SDK ever raises the "proxies" TypeError, disable_openai_sdk() flips
+  the process to Mode 2 (raw httpx POST) for good instead of retrying the SDK
+  on every message.
+"""
+from __future__ import annotations
+
+import asyncio
+import datetime
+import importlib.util
+import threading
+import time
+from typing import Any
+
+import httpx
+
+from app.core.config import settings
+
+OPENAI_CHAT_URL = f"{settings.OPENAI_BASE_URL}/chat/completions"
+
+_lock = threading.Lock()
+
+_http_sync:    httpx.Client      | None = None
+_http_async:   httpx.AsyncClient | None = None
+_openai_sync:  Any = None
+_openai_async: Any = None
+_gemini_models: dict[str, tuple[Any, Any, float]] = {}   # prompt → (model, CachedContent | None, rebuild deadline)
+_gemini_builds: dict[str, asyncio.Task]            = {}   # prompt → gemini_model() running in a worker thread
+_openai_sdk_ok: bool = True
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Shared HTTP transport
+# ─────────────────────────────────────────────────────────────────
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(connect=5.0, read=30.0, write=8.0, pool=5.0)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections           = settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections = settings.LLM_MAX_CONNECTIONS,
+        keepalive_expiry          = settings.LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def http_client() -> httpx.Client:
+    """Keep-alive sync client shared by the OpenAI SDK and Mode 2."""
+    global _http_sync
+    if _http_sync is None:
+        with _lock:
+            if _http_sync is None:
+                _http_sync = httpx.Client(
+                    timeout=_timeout(), limits=_limits(),
+                    http2=_http2_available(), follow_redirects=True,
+                )
+                print(f"[LLM] 🔌 httpx.Client ready (http2={_http2_available()})")
+    return _http_sync
+
+
+def async_http_client() -> httpx.AsyncClient:
+    """Keep-alive async client shared by AsyncOpenAI and async Mode 2."""
+    global _http_async
+    if _http_async is None:
+        with _lock:
+            if _http_async is None:
+                _http_async = httpx.AsyncClient(
+                    timeout=_timeout(), limits=_limits(),
+                    http2=_http2_available(), follow_redirects=True,
+                )
+                print(f"[LLM] 🔌 httpx.AsyncClient ready (http2={_http2_available()})")
+    return _http_async
+
+
+# ─────────────────────────────────────────────────────────────────
+#  OpenAI
+# ─────────────────────────────────────────────────────────────────
+def openai_sdk_usable() -> bool:
+    return _openai_sdk_ok
+
+
+def disable_openai_sdk(reason: Exception) -> None:
+    """Remember that the SDK is unusable here — go straight to Mode 2 from now on."""
+    global _openai_sdk_ok
+    _openai_sdk_ok = False
+    print(f"[LLM] ⚠️  OpenAI SDK disabled for this process ({reason}) → Mode 2 only")
+
+
+def openai_client():
+    global _openai_sync
+    if _openai_sync is None:
+        from openai import OpenAI
+        client = OpenAI(
+            api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, http_client=http_client(),
+        )
+        with _lock:
+            if _openai_sync is None:
+                _openai_sync = client
+    return _openai_sync
+
+
+def openai_async_client():
+    global _openai_async
+    if _openai_async is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL, http_client=async_http_client(),
+        )
+        with _lock:
+            if _openai_async is None:
+                _openai_async = client
+    return _openai_async
+
+
+def openai_headers() -> dict[str, str]:
+    return {"Authorization": f"Bearer {settings.OPENAI_API_KEY}", "Content-Type": "application/json"}
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Gemini
+# ─────────────────────────────────────────────────────────────────
+_GEMINI_JSON  = {"response_mime_type": "application/json", "temperature": 0}
+_GEMINI_TOOLS = {"temperature": 0}                                   # function calls, not JSON text
+_GEMINI_ANY   = {"function_calling_config": {"mode": "ANY"}}          # must call a function
+
+
+def _gemini_cached_model(genai, system_instruction: str, tools: list | None):
+    """(GenerativeModel backed by a CachedContent of the prompt [+ tools], cache), or None if not possible."""
+    try:
+        from google.generativeai import caching
+        name  = settings.GEMINI_MODEL
+        extra = {"tools": tools, "tool_config": _GEMINI_ANY} if tools else {}
+        cache = caching.CachedContent.create(
+            model=name if name.startswith("models/") else f"models/{name}",
+            system_instruction=system_instruction,
+            ttl=datetime.timedelta(seconds=settings.LLM_PROMPT_CACHE_TTL),
+            **extra,
+        )
+        model = genai.GenerativeModel.from_cached_content(
+            cached_content=cache, generation_config=_GEMINI_TOOLS if tools else _GEMINI_JSON,
+        )
+    except Exception as exc:
+        print(f"[LLM] ⚠️  Gemini prompt cache unavailable ({type(exc).__name__}: {exc}) → plain system_instruction")
+        return None
+    print(f"[LLM] 📌 Gemini prompt cached ({cache.name}, ttl {settings.LLM_PROMPT_CACHE_TTL}s)")
+    return model, cache
+
+
+def gemini_model(system_instruction: str, tools: list | None = None):
+    """
+    Configure the SDK once and cache the model per prompt (same prompt every
+    call). tools → native function calling (mode ANY) instead of JSON text.
+    """
+    key   = system_instruction
+    entry = _gemini_models.get(key)
+    if entry is not None and entry[1] is not None and time.monotonic() > entry[2]:
+        entry = None                        # CachedContent about to expire → build a fresh one
+    if entry is None:
+        import google.generativeai as genai
+        with _lock:
+            entry = _gemini_models.get(key)
+            if entry is None or (entry[1] is not None and time.monotonic() > entry[2]):
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                cached = _gemini_cached_model(genai, system_instruction, tools) if settings.LLM_PROMPT_CACHE else None
+                if cached:
+                    model, cache = cached
+                    expires      = time.monotonic() + settings.LLM_PROMPT_CACHE_TTL * 0.9
+                else:
+                    extra = {"tools": tools, "tool_config": _GEMINI_ANY} if tools else {}
+                    model, cache, expires = genai.GenerativeModel(
+                        model_name=settings.GEMINI_MODEL,
+                        system_instruction=system_instruction,
+                        generation_config=_GEMINI_TOOLS if tools else _GEMINI_JSON,
+                        **extra,
+                    ), None, 0.0
+                entry = _gemini_models[key] = (model, cache, expires)
+                print(f"[LLM] 🔌 Gemini model ready ({settings.GEMINI_MODEL}{', native tools' if tools else ''})")
+    return entry[0]
+
+
+def _gemini_build(system_instruction: str, tools: list | None) -> asyncio.Task:
+    """One worker-thread build per prompt at a time; concurrent callers share it."""
+    task = _gemini_builds.get(system_instruction)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(gemini_model, system_instruction, tools))
+        _gemini_builds[system_instruction] = task
+
+        def done(t: asyncio.Task) -> None:
+            _gemini_builds.pop(system_instruction, None)
+            if not t.cancelled() and t.exception() is not None:
+                print(f"[LLM] ⚠️  Gemini model build failed: {type(t.exception()).__name__}: {t.exception()}")
+
+        task.add_done_callback(done)
+    return task
+
+
+async def gemini_model_async(system_instruction: str, tools: list | None = None):
+    """
+    gemini_model() for the event loop — never blocks it. The first build runs
+    in a worker thread; once the prompt cache passes its rebuild deadline the
+    current model (its CachedContent still has 10% of the TTL left) keeps
+    serving while a fresh one is built in the background.
+    """
+    entry = _gemini_models.get(system_instruction)
+    if entry is not None:
+        if entry[1] is not None and time.monotonic() > entry[2]:
+            _gemini_build(system_instruction, tools)
+        return entry[0]
+    return await asyncio.shield(_gemini_build(system_instruction, tools))
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Lifecycle — called from main.py startup / shutdown
+# ─────────────────────────────────────────────────────────────────
+async def warm_up(system_instruction: str, gemini_tools: list | None = None) -> None:
+    """
+    Build the clients of the configured provider — and of the fallback the
+    router may hedge / fail over to — and open one keep-alive connection
+    each, so neither a first chat nor a first failover pays TLS setup.
+    Never fails startup.
+    """
+    providers = [settings.LLM_PROVIDER]
+    if settings.LLM_FALLBACK_ENABLED:
+        keys       = {"openai": settings.OPENAI_API_KEY, "gemini": settings.GEMINI_API_KEY}
+        providers += [p for p, key in keys.items() if p != settings.LLM_PROVIDER and key]
+    await asyncio.gather(*(_warm_up(p, system_instruction, gemini_tools) for p in providers))
+
+
+async def _warm_up(provider: str, system_instruction: str, gemini_tools: list | None) -> None:
+    try:
+        if provider == "openai":
+            if not settings.OPENAI_API_KEY:
+                print("[LLM] ⚠️  Warm-up skipped: OPENAI_API_KEY not set")
+                return
+            client = openai_async_client()
+            await client.models.retrieve(settings.OPENAI_MODEL)
+            openai_client()
+        else:
+            await gemini_model_async(system_instruction, gemini_tools)
+        print(f"[LLM] 🔥 Warm-up done ({provider})")
+    except TypeError as te:
+        if "proxies" in str(te) or "unexpected keyword" in str(te):
+            disable_openai_sdk(te)
+        else:
+            print(f"[LLM] ⚠️  Warm-up failed ({provider}): {te}")
+    except Exception as exc:
+        print(f"[LLM] ⚠️  Warm-up failed ({provider}): {type(exc).__name__}: {exc}")
+
+
+async def aclose() -> None:
+    """Close pooled HTTP connections and drop cached clients."""
+    global _http_sync, _http_async, _openai_sync, _openai_async
+    if _http_async is not None:
+        await _http_async.aclose()
+    if _http_sync is not None:
+        _http_sync.close()
+    for task in list(_gemini_builds.values()):
+        task.cancel()
+    for _, cache, _ in _gemini_models.values():
+        if cache is None:
+            continue
+        try:
+            await asyncio.to_thread(cache.delete)
+        except Exception as exc:
+            print(f"[LLM] ⚠️  Could not delete Gemini prompt cache: {exc}")
+    _gemini_models.clear()
+    _http_sync = _http_async = _openai_sync = _openai_async = None
+    print("[LLM] 🔌 Provider clients closed")
@@ -0,0 +1,333 @@
+"""
+agents/llm_router.py
+====================
+Provider router — picks OpenAI or Gemini per call, hedges slow calls and
+keeps failing providers out of the way.
+
+Per provider it tracks:
+  • EWMA latency and EWMA error rate (alpha 0.2) → routing score
+      score = latency × (1 + 3 × error rate)   (no samples yet → ∞)
+    the configured LLM_PROVIDER goes first until every provider has
+    latency samples and another one scores at least 25% lower
+  • a circuit breaker: LLM_BREAKER_FAILURES failures in a row → open
+    (skipped) for LLM_BREAKER_COOLDOWN s → half-open: one trial call,
+    success closes it, failure opens it again
+
+Per call (call_async / call):
+  1. start the best provider
+  2. no answer after the hedge delay (LLM_HEDGE_DELAY_MS; 0 = twice the
+     first provider's EWMA) or it failed → start the second provider too
+  3. first success wins; the loser is cancelled (async) or ignored (sync)
+  4. everything must finish inside LLM_TIMEOUT_BUDGET seconds — a provider
+     still running then counts as failed (breaker), not as a lost race
+
+The second provider only takes part when LLM_FALLBACK_ENABLED is on and
+its API key is set, so a single-provider setup behaves as before, plus
+the budget and the breaker.
+"""
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures as cf
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from app.core import metrics
+from app.core.config import settings
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_ALPHA         = 0.2
+_ERROR_PENALTY = 3.0
+_MIN_HEDGE_MS  = 200.0
+_SWITCH_MARGIN = 0.25           # a fallback must score this much lower to go first
+
+
+class ProviderError(Exception):
+    """Every provider tried failed (or the budget ran out); .error is the first-tried one's."""
+
+    def __init__(self, provider: str, error: BaseException) -> None:
+        super().__init__(f"{provider}: {error}")
+        self.provider = provider
+        self.error    = error
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Per-provider health
+# ─────────────────────────────────────────────────────────────────
+class _Health:
+    def __init__(self, name: str) -> None:
+        self.name       = name
+        self.ewma_ms:   float | None = None
+        self.error_rate = 0.0
+        self.failures   = 0                 # consecutive
+        self.state      = "closed"          # closed | open | half_open
+        self.opened_at  = 0.0
+        self.trial      = False             # half-open trial call in flight
+        self.counts     = {"calls": 0, "errors": 0, "hedges": 0, "hedge_wins": 0, "cancelled": 0, "opens": 0}
+
+    def score(self) -> float:
+        if self.ewma_ms is None:
+            return float("inf")             # never measured — not "free"
+        return self.ewma_ms * (1 + _ERROR_PENALTY * self.error_rate)
+
+    def _latency(self, ms: float) -> None:
+        self.ewma_ms = ms if self.ewma_ms is None else self.ewma_ms + _ALPHA * (ms - self.ewma_ms)
+
+    def available(self, now: float) -> bool:
+        if self.state == "open" and now - self.opened_at >= settings.LLM_BREAKER_COOLDOWN:
+            self.state, self.trial = "half_open", False
+            log.info(f"[Router] 🟡 {self.name} breaker half-open — one trial call")
+        if self.state == "open":
+            return False
+        return not (self.state == "half_open" and self.trial)
+
+    def started(self) -> None:
+        self.counts["calls"] += 1
+        if self.state == "half_open":
+            self.trial = True
+
+    def succeeded(self, ms: float) -> None:
+        self._latency(ms)
+        self.error_rate += _ALPHA * (0.0 - self.error_rate)
+        self.failures    = 0
+        if self.state != "closed":
+            log.info(f"[Router] 🟢 {self.name} breaker closed")
+        self.state, self.trial = "closed", False
+
+    def failed(self, ms: float) -> None:
+        self._latency(ms)
+        self.error_rate += _ALPHA * (1.0 - self.error_rate)
+        self.failures   += 1
+        self.counts["errors"] += 1
+        if self.state == "half_open" or self.failures >= settings.LLM_BREAKER_FAILURES:
+            if self.state != "open":
+                self.counts["opens"] += 1
+                log.warning(f"[Router] 🔴 {self.name} breaker open ({self.failures} failure(s) in a row)")
+            self.state, self.opened_at, self.trial = "open", time.monotonic(), False
+
+    def cancelled(self, ms: float) -> None:
+        """
+        Stopped with no outcome of its own — another provider answered first,
+        or the caller went away. Still slower than ms, so a latency sample,
+        but not an error. Running out of LLM_TIMEOUT_BUDGET is failed() instead.
+        """
+        self._latency(ms)
+        self.counts["cancelled"] += 1
+        self.trial = False
+
+    def snapshot(self) -> dict:
+        return {
+            "state":      self.state,
+            "ewma_ms":    round(self.ewma_ms, 1) if self.ewma_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            **self.counts,
+        }
+
+
+_lock   = threading.Lock()
+_health = {name: _Health(name) for name in ("openai", "gemini")}
+_pool: cf.ThreadPoolExecutor | None = None      # sync hedging
+
+
+def _configured(provider: str) -> bool:
+    return bool(settings.OPENAI_API_KEY if provider == "openai" else settings.GEMINI_API_KEY)
+
+
+def _plan() -> list[str]:
+    """Providers to try, best first (open breakers left out); config order until all are measured."""
+    primary = settings.LLM_PROVIDER.strip().lower()
+    names   = [primary]
+    if settings.LLM_FALLBACK_ENABLED:
+        names += [p for p in _health if p != primary and _configured(p)]
+    now = time.monotonic()
+    with _lock:
+        usable = [p for p in names if _health[p].available(now)]
+        if all(_health[p].ewma_ms is not None for p in usable):
+            usable.sort(key=lambda p: _health[p].score() * (1.0 if p == primary else 1 + _SWITCH_MARGIN))
+    return usable
+
+
+def _hedge_delay_s(provider: str) -> float:
+    if settings.LLM_HEDGE_DELAY_MS > 0:
+        return settings.LLM_HEDGE_DELAY_MS / 1000
+    ewma = _health[provider].ewma_ms
+    return max(_MIN_HEDGE_MS, 2 * ewma) / 1000 if ewma else 2.0
+
+
+def _start(provider: str, hedge: bool) -> float:
+    with _lock:
+        _health[provider].started()
+        if hedge:
+            _health[provider].counts["hedges"] += 1
+    return time.perf_counter()
+
+
+def _finish(provider: str, t0: float, error: BaseException | None, hedge: bool = False) -> None:
+    ms = (time.perf_counter() - t0) * 1000
+    with _lock:
+        h = _health[provider]
+        if error is None:
+            h.succeeded(ms)
+            if hedge:
+                h.counts["hedge_wins"] += 1
+        else:
+            h.failed(ms)
+    if error is None:
+        metrics.observe(f"llm_{provider}", ms)
+    else:
+        log.warning(f"[Router] ⚠️  {provider} failed after {ms:.0f} ms: {type(error).__name__}: {error}")
+
+
+def _cancel(provider: str, t0: float) -> None:
+    with _lock:
+        _health[provider].cancelled((time.perf_counter() - t0) * 1000)
+
+
+def _expire(provider: str, t0: float) -> None:
+    """Still running when the budget ran out — a failure, so a hung provider trips its breaker."""
+    _finish(provider, t0, TimeoutError(f"no answer within LLM_TIMEOUT_BUDGET ({settings.LLM_TIMEOUT_BUDGET:g}s)"))
+
+
+def _unavailable() -> ProviderError:
+    return ProviderError(settings.LLM_PROVIDER, RuntimeError("circuit breaker open — provider skipped"))
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Async
+# ─────────────────────────────────────────────────────────────────
+async def call_async(attempt: Callable[[str], Awaitable[T]]) -> tuple[str, T]:
+    """Run attempt(provider) with hedging / failover → (provider that answered, result)."""
+    plan = _plan()
+    if not plan:
+        raise _unavailable()
+    loop     = asyncio.get_running_loop()
+    deadline = loop.time() + settings.LLM_TIMEOUT_BUDGET
+    running: dict[asyncio.Task, tuple[str, float, bool]] = {}
+    errors:  list[tuple[str, BaseException]] = []
+
+    def launch(provider: str, hedge: bool) -> None:
+        t0 = _start(provider, hedge)
+        running[asyncio.ensure_future(attempt(provider))] = (provider, t0, hedge)
+
+    launch(plan[0], hedge=False)
+    waiting = list(plan[1:])
+    expired = False
+    try:
+        while running:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                expired = True
+                break
+            timeout = min(remaining, _hedge_delay_s(plan[0])) if waiting else remaining
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                if waiting:
+                    log.debug(f"[Router] 🏁 {plan[0]} slow → hedging with {waiting[0]}")
+                    launch(waiting.pop(0), hedge=True)
+                continue
+            for task in done:
+                provider, t0, hedge = running.pop(task)
+                error = task.exception()
+                _finish(provider, t0, error, hedge)
+                if error is None:
+                    return provider, task.result()
+                errors.append((provider, error))
+            if not running and waiting:
+                launch(waiting.pop(0), hedge=False)            # plain failover
+    finally:
+        for task, (provider, t0, _) in running.items():
+            task.cancel()
+            if expired:
+                _expire(provider, t0)
+            else:
+                _cancel(provider, t0)          # lost to the winner, or the caller was cancelled
+
+    _raise(plan, errors)
+
+
+def _raise(plan: list[str], errors: list[tuple[str, BaseException]]) -> None:
+    if errors:
+        provider, error = errors[0]
+        raise ProviderError(provider, error) from error
+    raise ProviderError("+".join(plan), TimeoutError(f"no LLM answer within {settings.LLM_TIMEOUT_BUDGET:g}s"))
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Sync (run_agent) — same policy on a small thread pool
+# ─────────────────────────────────────────────────────────────────
+def _executor() -> cf.ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = cf.ThreadPoolExecutor(max_workers=settings.LLM_MAX_CONNECTIONS, thread_name_prefix="llm-hedge")
+    return _pool
+
+
+def call(attempt: Callable[[str], T]) -> tuple[str, T]:
+    """Sync twin of call_async. A losing call can't be interrupted — it finishes in the background."""
+    plan = _plan()
+    if not plan:
+        raise _unavailable()
+    deadline = time.monotonic() + settings.LLM_TIMEOUT_BUDGET
+    running: dict[cf.Future, tuple[str, float, bool]] = {}
+    errors:  list[tuple[str, BaseException]] = []
+
+    def launch(provider: str, hedge: bool) -> None:
+        t0 = _start(provider, hedge)
+        running[_executor().submit(attempt, provider)] = (provider, t0, hedge)
+
+    launch(plan[0], hedge=False)
+    waiting = list(plan[1:])
+    while running:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        timeout = min(remaining, _hedge_delay_s(plan[0])) if waiting else remaining
+        done, _ = cf.wait(running, timeout=timeout, return_when=cf.FIRST_COMPLETED)
+        if not done:
+            if waiting:
+                launch(waiting.pop(0), hedge=True)
+            continue
+        for fut in done:
+            provider, t0, hedge = running.pop(fut)
+            error = fut.exception()
+            _finish(provider, t0, error, hedge)
+            if error is None:
+                for provider_left, t_left, _ in running.values():
+                    _cancel(provider_left, t_left)
+                return provider, fut.result()
+            errors.append((provider, error))
+        if not running and waiting:
+            launch(waiting.pop(0), hedge=False)
+
+    for provider, t0, _ in running.values():
+        _expire(provider, t0)                   # only reached when the budget ran out
+    _raise(plan, errors)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Introspection / lifecycle
+# ─────────────────────────────────────────────────────────────────
+def stats() -> dict:
+    with _lock:
+        return {
+            "primary":          settings.LLM_PROVIDER,
+            "fallback_enabled": settings.LLM_FALLBACK_ENABLED,
+            "hedge_delay_ms":   settings.LLM_HEDGE_DELAY_MS or "adaptive",
+            "budget_s":         settings.LLM_TIMEOUT_BUDGET,
+            "providers":        {name: h.snapshot() for name, h in _health.items()
+                                 if name == settings.LLM_PROVIDER or _configured(name)},
+        }
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
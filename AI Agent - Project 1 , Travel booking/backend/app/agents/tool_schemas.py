@@ -0,0 +1,190 @@
+"""
+agents/tool_schemas.py
+======================
+The booking tools as native function-calling declarations
+(settings.LLM_TOOL_MODE = "native").
+
+One neutral definition per tool, rendered for each provider:
+  • openai_tools()  — chat.completions `tools=[{"type": "function", ...}]`
+                      (optional fields: "type": [<type>, "null"])
+  • gemini_tools()  — google.generativeai `tools=[{"function_declarations": [...]}]`
+                      (optional fields: "nullable": true)
+
+Argument names and shapes are exactly what tools.py's functions take, so
+a native call goes through dispatch_tool unchanged — the same
+{"tool", "arguments"} dict the JSON mode extracts from text.
+"""
+from __future__ import annotations
+
+from app.core.config import settings
+
+_DATE   = "YYYY-MM-DD"
+_FIELDS = ["from", "to", "travel_date", "status"]
+
+
+def _vehicle(nullable: bool = False) -> dict:
+    return {"type": "string", "enum": list(settings.VEHICLE_TABLES), "nullable": nullable}
+
+
+def _text(description: str, nullable: bool = False) -> dict:
+    return {"type": "string", "description": description, "nullable": nullable}
+
+
+def _booking_item() -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "vehicle":     _vehicle(),
+            "source":      _text("Full city name"),
+            "destination": _text("Full city name"),
+            "date":        _text(_DATE, nullable=True),
+        },
+        "required": ["vehicle", "source", "destination", "date"],
+    }
+
+
+def _update_item() -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            "field": {"type": "string", "enum": _FIELDS},
+            "value": _text("New value — full city name for from/to, YYYY-MM-DD for travel_date"),
+        },
+        "required": ["field", "value"],
+    }
+
+
+def _declarations() -> list[dict]:
+    return [
+        {
+            "name": "create_booking",
+            "description": "Book one or more vehicles on the SAME route and date.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "vehicles":    {"type": "array", "items": _vehicle()},
+                    "source":      _text("Full city name"),
+                    "destination": _text("Full city name"),
+                    "date":        _text(_DATE, nullable=True),
+                },
+                "required": ["vehicles", "source", "destination", "date"],
+            },
+        },
+        {
+            "name": "create_multi_booking",
+            "description": "Book vehicles whose routes OR dates differ (e.g. outbound + return).",
+            "parameters": {
+                "type": "object",
+                "properties": {"bookings": {"type": "array", "items": _booking_item()}},
+                "required": ["bookings"],
+            },
+        },
+        {
+            "name": "get_travel_history",
+            "description": "List past bookings, newest first, optionally filtered.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "vehicle":    _vehicle(nullable=True),
+                    "start_date": _text(_DATE, nullable=True),
+                    "end_date":   _text(_DATE, nullable=True),
+                    "limit":      {"type": "integer", "description": '"last 5 trips" → 5', "nullable": True},
+                },
+                "required": [],
+            },
+        },
+        {
+            "name": "update_booking_by_id",
+            "description": "Change one field of a booking the user identifies by its #ID.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "booking_id": {"type": "integer"},
+                    "vehicle":    _vehicle(),
+                    "field":      {"type": "string", "enum": _FIELDS},
+                    "value":      _text("New value — full city name for from/to, YYYY-MM-DD for travel_date"),
+                },
+                "required": ["booking_id", "vehicle", "field", "value"],
+            },
+        },
+        {
+            "name": "update_booking_by_query",
+            "description": (
+                "No booking ID: find the booking by route/date (source, destination, "
+                "current_date are FILTERS) and apply every change in updates."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "vehicle":      _vehicle(),
+                    "source":       _text("Current origin (filter)", nullable=True),
+                    "destination":  _text("Current destination (filter)", nullable=True),
+                    "current_date": _text(f"Current travel date (filter), {_DATE}", nullable=True),
+                    "updates":      {"type": "array", "items": _update_item()},
+                },
+                "required": ["vehicle", "updates"],
+            },
+        },
+        {
+            "name": "delete_booking",
+            "description": "Cancel a booking by its #ID.",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "booking_id": {"type": "integer"},
+                    "vehicle":    _vehicle(nullable=True),
+                },
+                "required": ["booking_id"],
+            },
+        },
+    ]
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Provider renderings
+# ─────────────────────────────────────────────────────────────────
+def _openai_schema(schema: dict) -> dict:
+    """"nullable": true → "type": [<type>, "null"] (JSON Schema), recursively."""
+    out = {k: v for k, v in schema.items() if k != "nullable"}
+    if schema.get("nullable"):
+        out["type"] = [schema["type"], "null"]
+        if "enum" in out:
+            out["enum"] = [*out["enum"], None]
+    if "properties" in schema:
+        out["properties"] = {k: _openai_schema(v) for k, v in schema["properties"].items()}
+    if "items" in schema:
+        out["items"] = _openai_schema(schema["items"])
+    return out
+
+
+def _gemini_schema(schema: dict) -> dict:
+    """Gemini's OpenAPI subset: drop nullable=False noise, empty required lists."""
+    out = {k: v for k, v in schema.items() if not (k == "nullable" and not v) and not (k == "required" and not v)}
+    if "properties" in schema:
+        out["properties"] = {k: _gemini_schema(v) for k, v in schema["properties"].items()}
+    if "items" in schema:
+        out["items"] = _gemini_schema(schema["items"])
+    return out
+
+
+_openai_cache: list[dict] | None = None      # built once — callers must not mutate
+_gemini_cache: list[dict] | None = None
+
+
+def openai_tools() -> list[dict]:
+    global _openai_cache
+    if _openai_cache is None:
+        _openai_cache = [
+            {"type": "function", "function": {**d, "parameters": _openai_schema(d["parameters"])}}
+            for d in _declarations()
+        ]
+    return _openai_cache
+
+
+def gemini_tools() -> list[dict]:
+    global _gemini_cache
+    if _gemini_cache is None:
+        _gemini_cache = [{"function_declarations": [
+            {**d, "parameters": _gemini_schema(d["parameters"])} for d in _declarations()
+        ]}]
+    return _gemini_cache
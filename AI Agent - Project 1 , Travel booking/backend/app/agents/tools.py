@@ -451,18 +451,45 @@ IMPORTANT: settings.TABLE_NAME and settings.VEHICLE_TABLES are already
 lowercase (enforced by config.py). We use them directly in f-strings.
 No .lower() calls needed here — config.py handles it once at startup.
 
+Single source of truth:
+  Every booking is ONE row in the history table (settings.TABLE_NAME).
+  The per-vehicle names (train, bus, ...) are views over it, filtered by
+  vehicle — so every create / update / delete below is a single write
+  and a booking has exactly one id.
+
+History cache:
+  get_travel_history pages are read through agents/history_cache.py.
+  Every write reports the (vehicle, travel_date) of the rows it touched —
+  old and new date for updates — and only the cached filters that could
+  contain them are dropped.
+
 Tools:
-  create_booking           — INSERT one or multiple vehicles
-  get_travel_history       — SELECT with dynamic WHERE filters
+  create_booking           — INSERT one or multiple vehicles (single statement)
+  create_multi_booking     — INSERT bookings with different routes/dates (single statement)
+  get_travel_history       — SELECT with dynamic WHERE filters, keyset-paginated
   update_booking_by_id     — UPDATE by explicit booking ID
-  update_booking_by_query  — UPDATE by matching route/date (no ID needed)
+  update_booking_by_query  — UPDATE by matching route/date (no ID needed, one statement)
   delete_booking           — DELETE by booking ID
+
+Not an LLM tool:
+  export_travel_history    — whole filtered history as NDJSON / CSV chunks,
+                             streamed through a server-side cursor
 """
 from __future__ import annotations
 
+import base64
+import csv
+import io
+import json
+import logging
 from datetime import datetime
+from typing import Iterator
+
+from app.agents import history_cache
 from app.core.config import settings
-from app.database.db import execute_query, execute_write
+from app.database.db import execute_query, execute_returning, stream_query
+
+log = logging.getLogger(__name__)
 
 # ── All table names are lowercase from config.py ─────────────────
 VALID_VEHICLES: set[str] = set(settings.VEHICLE_TABLES)   # {'train','bus','flight','car','bike'}
@@ -493,7 +520,7 @@ def _validate_vehicle(v: str) -> str:
     val = v.strip().lower()
     if val not in VALID_VEHICLES:
         raise ValueError(f"Unknown vehicle '{v}'. Valid: {', '.join(sorted(VALID_VEHICLES))}")
-    print(f"[Tools] ✅ Vehicle: '{val}'")
+    log.debug(f"[Tools] ✅ Vehicle: '{val}'")
     return val
 
 
@@ -509,11 +536,11 @@ def _parse_date(ds: str | None) -> str | None:
     ):
         try:
             result = datetime.strptime(cleaned, fmt).strftime("%Y-%m-%d")
-            print(f"[Tools] 📅 Date '{ds}' → '{result}'")
+            log.debug(f"[Tools] 📅 Date '{ds}' → '{result}'")
             return result
         except ValueError:
             continue
-    print(f"[Tools] ⚠️  Date as-is: '{cleaned}'")
+    log.warning(f"[Tools] ⚠️  Date as-is: '{cleaned}'")
     return cleaned
 
 
@@ -521,53 +548,130 @@ def _resolve_field(field: str) -> str:
     col = FIELD_MAP.get(field.strip().lower())
     if not col:
         raise ValueError(f"Unknown field '{field}'. Allowed: {', '.join(FIELD_MAP)}")
-    print(f"[Tools] 🗂️  Field '{field}' → '{col}'")
+    log.debug(f"[Tools] 🗂️  Field '{field}' → '{col}'")
     return col
 
 
+# History columns psycopg2 hands back as date / datetime
+_ISO_COLUMNS: tuple[str, ...] = ("travel_date", "booked_at")
+
+HISTORY_SHAPES = ("rows", "columnar")
+
+
 def _serialize(rows: list[dict]) -> list[dict]:
     """
     Convert date/datetime → ISO string.
     Add 'from' and 'to' aliases for from_loc / to_loc so the
     frontend can read either column name.
+    Rows come straight from the cursor, so they are updated in place —
+    only the known date columns are touched, no per-row copy.
     """
-    out = []
     for row in rows:
-        clean = {}
-        for k, v in row.items():
-            val = v.isoformat() if hasattr(v, "isoformat") else v
-            clean[k] = val
-            if k == "from_loc":
-                clean["from"] = val   # frontend alias
-            elif k == "to_loc":
-                clean["to"] = val     # frontend alias
-        out.append(clean)
-    return out
+        for col in _ISO_COLUMNS:
+            val = row.get(col)
+            if val is not None:
+                row[col] = val.isoformat()
+        row["from"] = row.get("from_loc")   # frontend alias
+        row["to"]   = row.get("to_loc")     # frontend alias
+    return rows
+
+
+def _columnar(rows: list[dict]) -> tuple[list[str], list[list]]:
+    """
+    Compact shape: column names once, one value array per row, no aliases.
+    Dates are converted column-wise by position.
+    """
+    if not rows:
+        return [], []
+    columns = list(rows[0])
+    values  = [list(row.values()) for row in rows]
+    for i, col in enumerate(columns):
+        if col in _ISO_COLUMNS:
+            for vals in values:
+                if vals[i] is not None:
+                    vals[i] = vals[i].isoformat()
+    return columns, values
 
 
 def _log_sql(label: str, sql: str, params: tuple) -> None:
-    print(f"[SQL] ── {label}")
-    print(f"[SQL]    stmt   : {' '.join(sql.split())[:150]}")
-    print(f"[SQL]    params : {params}")
+    if not log.isEnabledFor(logging.DEBUG):
+        return
+    log.debug(f"[SQL] ── {label}")
+    log.debug(f"[SQL]    stmt   : {' '.join(sql.split())[:150]}")
+    log.debug(f"[SQL]    params : {params}")
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Booking writer — every row, one INSERT, one transaction
+# ─────────────────────────────────────────────────────────────────
+
+BookingRow = tuple[str, str, str, "str | None"]   # (vehicle, from_loc, to_loc, travel_date)
+
+
+def _insert_bookings(rows: list[BookingRow]) -> list[dict]:
+    """
+    INSERT all rows into the bookings table with a single multi-row
+    INSERT ... RETURNING (one round trip, one commit). Either every row
+    lands or none do; the vehicle views see them immediately.
+
+    Returns one dict per input row, in input order:
+      {"id": <booking id>, "history_id": <same id>, "vehicle": ...}
+    """
+    history_tbl = settings.TABLE_NAME
+    values      = ", ".join(["(%s, %s, %s, %s::date)"] * len(rows))
+    params      = tuple(x for r in rows for x in r)
+
+    # ids come from one sequence in VALUES order → sorted ids pair up with rows
+    sql_str = (
+        f"WITH h AS (INSERT INTO {history_tbl} (vehicle, from_loc, to_loc, travel_date) "
+        f"VALUES {values} RETURNING id)\n"
+        f"SELECT id FROM h ORDER BY id"
+    )
+    _log_sql(f"INSERT → {history_tbl}", sql_str, params)
+    returned = execute_returning(sql_str, params, key=("create_booking", history_tbl, len(rows)))
+    history_cache.invalidate((v, travel_date) for v, _, _, travel_date in rows)
+
+    out = []
+    for (v, src, dst, travel_date), r in zip(rows, returned):
+        out.append({
+            "id":          r["id"],
+            "history_id":  r["id"],
+            "vehicle":     v,
+            "from":        src,
+            "to":          dst,
+            "from_loc":    src,
+            "to_loc":      dst,
+            "travel_date": travel_date,
+            "status":      "confirmed",
+        })
+    log.debug(f"[Tools] ✅ {len(out)} booking(s) written: {[(b['vehicle'], b['id']) for b in out]}")
+    return out
+
+
+def _booking_message(bookings: list[dict]) -> str:
+    """User-facing confirmation for bookings that share one route/date."""
+    first        = bookings[0]
+    vehicles_str = " & ".join(f"**{b['vehicle'].capitalize()}**" for b in bookings)
+    date_str     = f" on **{first['travel_date']}**" if first["travel_date"] else ""
+    ids_str      = ", ".join(f"#{b['id']}" for b in bookings)
+    return (
+        f"✅ {vehicles_str} ticket(s) booked!\n"
+        f"📍 **{first['from_loc'].upper()}** → **{first['to_loc'].upper()}**{date_str}\n"
+        f"🎫 Booking ID(s): **{ids_str}**"
+    )
 
 
 # ─────────────────────────────────────────────────────────────────
 #  Tool 1 — create_booking
 # ─────────────────────────────────────────────────────────────────
 
-def create_booking(
+def _booking_rows(
     vehicles:    list[str] | str,
     source:      str,
     destination: str,
-    date:        str | None = None,
-) -> dict:
-    """
-    INSERT into each vehicle table + combined history table.
-    Supports single or multiple vehicles.
-    """
-    print(f"\n[Tools] ─── create_booking ───────────────────────────────")
-    print(f"[Tools] vehicles={vehicles!r}, from={source!r}, to={destination!r}, date={date!r}")
-
+    date:        str | None,
+) -> list[BookingRow]:
+    """Validate + normalise one booking request into insertable rows."""
     if isinstance(vehicles, str):
         vehicle_list = [v.strip() for v in vehicles.split(",") if v.strip()]
     else:
@@ -577,58 +681,27 @@ def create_booking(
     travel_date = _parse_date(date)
     src         = source.strip().title()
     dst         = destination.strip().title()
-    # settings.TABLE_NAME is already lowercase ("travel_history")
-    history_tbl = settings.TABLE_NAME
-    print(f"[Tools] 🗄️  History table: '{history_tbl}'")
-
-    bookings_made = []
-
-    for v in validated:
-        params = (v, src, dst, travel_date)
-
-        # INSERT vehicle table
-        sql_v = (
-            f"INSERT INTO {v} (vehicle, from_loc, to_loc, travel_date) "
-            f"VALUES (%s, %s, %s, %s) RETURNING id"
-        )
-        _log_sql(f"INSERT → {v}", sql_v, params)
-        vid = execute_write(sql_v, params)
-        print(f"[Tools] ✅ '{v}' → id={vid}")
-
-        # INSERT history table
-        sql_h = (
-            f"INSERT INTO {history_tbl} (vehicle, from_loc, to_loc, travel_date) "
-            f"VALUES (%s, %s, %s, %s) RETURNING id"
-        )
-        _log_sql(f"INSERT → {history_tbl}", sql_h, params)
-        hid = execute_write(sql_h, params)
-        print(f"[Tools] ✅ '{history_tbl}' → id={hid}")
-
-        bookings_made.append({
-            "id":          vid,
-            "vehicle":     v,
-            "from":        src,
-            "to":          dst,
-            "from_loc":    src,
-            "to_loc":      dst,
-            "travel_date": travel_date,
-            "status":      "confirmed",
-        })
+    return [(v, src, dst, travel_date) for v in validated]
 
-    vehicles_str = " & ".join(f"**{v.capitalize()}**" for v in validated)
-    date_str     = f" on **{travel_date}**" if travel_date else ""
-    ids_str      = ", ".join(f"#{b['id']}" for b in bookings_made)
 
-    return {
-        "success":  True,
-        "message":  (
-            f"✅ {vehicles_str} ticket(s) booked!\n"
-            f"📍 **{src.upper()}** → **{dst.upper()}**{date_str}\n"
-            f"🎫 Booking ID(s): **{ids_str}**"
-        ),
-        "booking":  bookings_made[0] if len(bookings_made) == 1 else None,
-        "bookings": bookings_made,
-    }
+def create_booking(
+    vehicles:    list[str] | str,
+    source:      str,
+    destination: str,
+    date:        str | None = None,
+) -> dict:
+    """
+    INSERT one booking row per vehicle.
+    Supports single or multiple vehicles — all rows in one transaction.
+    """
+    log.debug(f"[Tools] ─── create_booking ───────────────────────────────")
+    log.debug(f"[Tools] vehicles={vehicles!r}, from={source!r}, to={destination!r}, date={date!r}")
+
+    rows = _booking_rows(vehicles, source, destination, date)
+    if not rows:
+        return {"success": False, "message": "⚠️ No vehicle specified for the booking."}
+
+    return _booking_result([rows], _insert_bookings(rows))
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -644,57 +717,116 @@ def create_multi_booking(bookings: list[dict]) -> dict:
 
     Called when user requests different routes or dates per vehicle.
     e.g. "bus from A to B on date1, return car from B to A on date2"
+
+    Every item is validated first, then all of them are written in ONE
+    statement — a bad item no longer leaves the earlier ones half-booked.
     """
-    print(f"\n[Tools] ─── create_multi_booking ────────────────────────")
-    print(f"[Tools] {len(bookings)} booking(s) to create")
+    log.debug(f"[Tools] ─── create_multi_booking ────────────────────────")
+    log.debug(f"[Tools] {len(bookings)} booking(s) to create")
+
+    groups = _multi_booking_groups(bookings)
+    if not groups:
+        return {"success": False, "message": "⚠️ No bookings could be created."}
+
+    return _booking_result(groups, _insert_bookings([r for g in groups for r in g]))
 
-    all_bookings = []
-    messages     = []
 
+def _multi_booking_groups(bookings: list[dict]) -> list[list[BookingRow]]:
+    """Validate every item → one row group per item (nothing written yet)."""
+    groups: list[list[BookingRow]] = []
     for i, b in enumerate(bookings):
         vehicle     = b.get("vehicle", "")
         source      = b.get("source", "")
         destination = b.get("destination", "")
         date        = b.get("date", None)
-        print(f"[Tools] Booking {i+1}: {vehicle} | {source} → {destination} | {date}")
-
-        result = create_booking(
-            vehicles    = [vehicle],
-            source      = source,
-            destination = destination,
-            date        = date,
-        )
-        if result.get("success") and result.get("bookings"):
-            all_bookings.extend(result["bookings"])
-            messages.append(result["message"])
-
-    if not all_bookings:
-        return {"success": False, "message": "⚠️ No bookings could be created."}
+        log.debug(f"[Tools] Booking {i+1}: {vehicle} | {source} → {destination} | {date}")
+        rows = _booking_rows([vehicle], source, destination, date)
+        if rows:
+            groups.append(rows)
+    return groups
+
+
+def _booking_result(groups: list[list[BookingRow]], written: list[dict]) -> dict:
+    """Tool result for written rows — one confirmation paragraph per group."""
+    messages, pos = [], 0
+    for g in groups:
+        messages.append(_booking_message(written[pos:pos + len(g)]))
+        pos += len(g)
 
     return {
         "success":  True,
         "message":  "\n\n".join(messages),
-        "booking":  all_bookings[0] if len(all_bookings) == 1 else None,
-        "bookings": all_bookings,
+        "booking":  written[0] if len(written) == 1 else None,
+        "bookings": written,
     }
 
 
+# ─────────────────────────────────────────────────────────────────
+#  Batch support — validate many create calls, write them together
+# ─────────────────────────────────────────────────────────────────
+
+BOOKING_TOOLS: frozenset[str] = frozenset({"create_booking", "create_multi_booking"})
+
+
+def plan_bookings(tool_name: str, arguments: dict) -> list[list[BookingRow]]:
+    """
+    Validate a create_booking / create_multi_booking call into row groups
+    without touching the DB. Raises (or returns []) when dispatching the
+    call would fail — the caller then dispatches it normally for the error.
+    """
+    if tool_name == "create_booking":
+        if set(arguments) - {"vehicles", "source", "destination", "date"}:
+            raise TypeError(f"unexpected arguments for '{tool_name}'")
+        args = {"date": None, **arguments}
+        rows = _booking_rows(args["vehicles"], args["source"], args["destination"], args["date"])
+        return [rows] if rows else []
+    if tool_name == "create_multi_booking":
+        if set(arguments) != {"bookings"}:
+            raise TypeError(f"unexpected arguments for '{tool_name}'")
+        return _multi_booking_groups(arguments["bookings"])
+    raise ValueError(f"'{tool_name}' is not a booking tool")
+
+
+def write_booking_plans(plans: list[list[list[BookingRow]]]) -> list[dict]:
+    """
+    Write many validated calls (from plan_bookings) in ONE statement / one
+    transaction; returns each call's tool result, in order.
+    """
+    flat    = [r for groups in plans for g in groups for r in g]
+    written = _insert_bookings(flat)
+
+    results, pos = [], 0
+    for groups in plans:
+        n = sum(len(g) for g in groups)
+        results.append(_booking_result(groups, written[pos:pos + n]))
+        pos += n
+    return results
+
+
 # ─────────────────────────────────────────────────────────────────
 #  Tool 2 — get_travel_history
 # ─────────────────────────────────────────────────────────────────
 
-def get_travel_history(
-    vehicle:    str | None = None,
-    start_date: str | None = None,
-    end_date:   str | None = None,
-) -> dict:
-    """SELECT from history table with optional filters."""
-    print(f"\n[Tools] ─── get_travel_history ───────────────────────────")
-    print(f"[Tools] vehicle={vehicle!r}, start={start_date!r}, end={end_date!r}")
+def _encode_cursor(row: dict) -> str:
+    """Keyset position after `row` → opaque, URL-safe token."""
+    raw = f"{row['booked_at'].isoformat()}|{row['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
 
-    history_tbl = settings.TABLE_NAME   # already lowercase
-    print(f"[Tools] 🗄️  Querying table: '{history_tbl}'")
 
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        booked_at, rid = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(booked_at), int(rid)
+    except Exception:
+        raise ValueError(f"Invalid history cursor '{cursor}'")
+
+
+def _history_filters(
+    vehicle:    str | None,
+    start_date: str | None,
+    end_date:   str | None,
+) -> tuple[list[str], list]:
+    """Optional vehicle / travel_date filters → (WHERE conditions, params)."""
     conditions: list[str] = []
     params:     list      = []
 
@@ -715,33 +847,175 @@ def get_travel_history(
     elif end:
         conditions.append("travel_date <= %s")
         params.append(end)
+    return conditions, params
+
+
+def _filter_key(vehicle: str | None, start_date: str | None, end_date: str | None) -> tuple:
+    """(vehicle, start, end) as the SQL sees them — the history cache key prefix."""
+    return (
+        _validate_vehicle(vehicle) if vehicle else None,
+        _parse_date(start_date),
+        _parse_date(end_date),
+    )
+
+
+def get_travel_history(
+    vehicle:    str | None = None,
+    start_date: str | None = None,
+    end_date:   str | None = None,
+    limit:      int | None = None,
+    cursor:     str | None = None,
+    shape:      str        = "rows",
+) -> dict:
+    """
+    SELECT from history table with optional filters, newest first.
+
+    Keyset pagination: at most `limit` rows (default HISTORY_PAGE_SIZE) per
+    call; pass the returned next_cursor to get the following page. Seeks on
+    (booked_at, id) so page N costs the same as page 1.
+
+    shape="rows"     → "records": [{...}, ...]  (with from/to aliases)
+    shape="columnar" → "columns": [...], "rows": [[...], ...]
+    """
+    log.debug(f"[Tools] ─── get_travel_history ───────────────────────────")
+    log.debug(f"[Tools] vehicle={vehicle!r}, start={start_date!r}, end={end_date!r}, limit={limit!r}, cursor={cursor!r}")
+    page_size = max(1, min(int(limit or settings.HISTORY_PAGE_SIZE), settings.HISTORY_PAGE_MAX))
+    if shape not in HISTORY_SHAPES:
+        raise ValueError(f"Unknown shape '{shape}'. Valid: {', '.join(HISTORY_SHAPES)}")
+
+    history_tbl = settings.TABLE_NAME   # already lowercase
+    log.debug(f"[Tools] 🗄️  Querying table: '{history_tbl}'")
+
+    conditions, params = _history_filters(vehicle, start_date, end_date)
+
+    if cursor:
+        conditions.append("(booked_at, id) < (%s, %s)")
+        params.extend(_decode_cursor(cursor))
 
     where   = ("WHERE " + " AND ".join(conditions)) if conditions else ""
-    sql_str = f"SELECT * FROM {history_tbl} {where} ORDER BY booked_at DESC"
+    sql_str = f"SELECT * FROM {history_tbl} {where} ORDER BY booked_at DESC, id DESC LIMIT %s"
+    params.append(page_size + 1)          # one extra row tells us whether another page exists
 
     _log_sql("SELECT", sql_str, tuple(params))
-    rows = _serialize(execute_query(sql_str, tuple(params)))
-    print(f"[Tools] 📋 {len(rows)} record(s)")
+    cache_key   = (*_filter_key(vehicle, start_date, end_date), cursor, page_size)
+    raw_rows    = history_cache.get_or_load(
+        cache_key,
+        lambda: execute_query(sql_str, tuple(params), key=("get_travel_history", history_tbl, tuple(conditions))),
+    )
+    has_more    = len(raw_rows) > page_size
+    raw_rows    = raw_rows[:page_size]
+    next_cursor = _encode_cursor(raw_rows[-1]) if has_more else None
+    log.debug(f"[Tools] 📋 {len(raw_rows)} record(s), more={has_more}")
+
+    if shape == "columnar":
+        columns, values = _columnar(raw_rows)
+        data = {"columns": columns, "rows": values}
+    else:
+        data = {"records": _serialize(raw_rows)}
 
-    if not rows:
-        return {"success": True, "message": "📭 No travel records found.", "records": []}
+    if not raw_rows:
+        return {"success": True, "message": "📭 No travel records found.", **data, "next_cursor": None}
 
-    return {"success": True, "message": f"📋 Found **{len(rows)}** travel record(s).", "records": rows}
+    more_str = " — more available" if has_more else ""
+    return {
+        "success":     True,
+        "message":     f"📋 Found **{len(raw_rows)}** travel record(s){more_str}.",
+        **data,
+        "next_cursor": next_cursor,
+    }
+
+
+# ─────────────────────────────────────────────────────────────────
+#  History export — streamed, not an LLM tool
+# ─────────────────────────────────────────────────────────────────
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_COLUMNS = ("id", "vehicle", "from_loc", "to_loc", "travel_date", "booked_at", "status")
+
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+
+def _ndjson_chunks(rows: Iterator[dict]) -> Iterator[str]:
+    buf: list[str] = []
+    for row in rows:
+        rec = dict(row)
+        for col in _ISO_COLUMNS:
+            rec[col] = _iso(rec[col])
+        buf.append(json.dumps(rec, ensure_ascii=False))
+        if len(buf) >= settings.EXPORT_FETCH_SIZE:
+            yield "\n".join(buf) + "\n"
+            buf.clear()
+    if buf:
+        yield "\n".join(buf) + "\n"
+
+
+def _csv_chunks(rows: Iterator[dict]) -> Iterator[str]:
+    out     = io.StringIO()
+    writer  = csv.writer(out)
+    writer.writerow(EXPORT_COLUMNS)
+    pending = 0
+    for row in rows:
+        writer.writerow([_iso(v) if k in _ISO_COLUMNS else v for k, v in row.items()])
+        pending += 1
+        if pending >= settings.EXPORT_FETCH_SIZE:
+            yield out.getvalue()
+            out.seek(0)
+            out.truncate()
+            pending = 0
+    yield out.getvalue()
+
+
+def export_travel_history(
+    vehicle:    str | None = None,
+    start_date: str | None = None,
+    end_date:   str | None = None,
+    fmt:        str        = "ndjson",
+) -> Iterator[str]:
+    """
+    Every matching booking, newest first, as NDJSON lines or CSV text.
+
+    Filters are validated here (ValueError before anything is sent); the
+    rows are read lazily through db.stream_query, one EXPORT_FETCH_SIZE
+    batch → one chunk, so memory stays flat however big the table is.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'. Valid: {', '.join(EXPORT_FORMATS)}")
+    conditions, params = _history_filters(vehicle, start_date, end_date)
+    where   = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+    sql_str = (
+        f"SELECT {', '.join(EXPORT_COLUMNS)} FROM {settings.TABLE_NAME} {where} "
+        f"ORDER BY booked_at DESC, id DESC"
+    )
+    _log_sql("EXPORT", sql_str, tuple(params))
+    rows = stream_query(sql_str, tuple(params), name="history_export")
+    return _csv_chunks(rows) if fmt == "csv" else _ndjson_chunks(rows)
 
 
 # ─────────────────────────────────────────────────────────────────
 #  Tool 3 — update_booking_by_id
 # ─────────────────────────────────────────────────────────────────
 
+def _changed(returned: list[dict]) -> list[tuple]:
+    """UPDATE ... RETURNING vehicle, old_date, travel_date → history cache changes (old + new)."""
+    out = []
+    for r in returned:
+        out.append((r["vehicle"], r["old_date"]))
+        if r["travel_date"] != r["old_date"]:
+            out.append((r["vehicle"], r["travel_date"]))
+    return out
+
+
 def update_booking_by_id(
     booking_id: int,
     vehicle:    str,
     field:      str,
     value:      str,
 ) -> dict:
-    """UPDATE by explicit booking ID in vehicle + history tables."""
-    print(f"\n[Tools] ─── update_booking_by_id ─────────────────────────")
-    print(f"[Tools] id={booking_id}, vehicle={vehicle!r}, field={field!r}, value={value!r}")
+    """UPDATE by explicit booking ID — one row, one statement."""
+    log.debug(f"[Tools] ─── update_booking_by_id ─────────────────────────")
+    log.debug(f"[Tools] id={booking_id}, vehicle={vehicle!r}, field={field!r}, value={value!r}")
 
     v           = _validate_vehicle(vehicle)
     db_col      = _resolve_field(field)
@@ -751,17 +1025,22 @@ def update_booking_by_id(
     if db_col == "travel_date":
         value = _parse_date(value) or value
 
-    sql_v = f"UPDATE {v} SET {db_col} = %s WHERE id = %s"
-    _log_sql(f"UPDATE {v}", sql_v, (value, bid))
-    rv = execute_write(sql_v, (value, bid))
-    print(f"[Tools] ✅ {rv} row(s) updated in '{v}'")
-
-    sql_h = f"UPDATE {history_tbl} SET {db_col} = %s WHERE id = %s"
-    _log_sql(f"UPDATE {history_tbl}", sql_h, (value, bid))
-    rh = execute_write(sql_h, (value, bid))
-    print(f"[Tools] ✅ {rh} row(s) updated in '{history_tbl}'")
+    # ids are unique across vehicles, but the row must still be this vehicle's —
+    # "change my bus booking 5" must not touch a train booking #5.
+    # The self-join on id hands back the pre-update travel_date for the history cache.
+    sql_h = (
+        f"UPDATE {history_tbl} AS t SET {db_col} = %s FROM {history_tbl} AS old "
+        f"WHERE old.id = %s AND old.vehicle = %s AND t.id = old.id "
+        f"RETURNING t.vehicle, old.travel_date AS old_date, t.travel_date"
+    )
+    params = (value, bid, v)
+    _log_sql(f"UPDATE {history_tbl} ({v})", sql_h, params)
+    returned = execute_returning(sql_h, params, key=("update_booking_by_id", history_tbl, (db_col,)))
+    rh       = len(returned)
+    history_cache.invalidate(_changed(returned))
+    log.debug(f"[Tools] ✅ {rh} row(s) updated in '{history_tbl}'")
 
-    if rv == 0 and rh == 0:
+    if rh == 0:
         return {"success": False, "message": f"⚠️ No booking found with ID **#{booking_id}**."}
 
     return {
@@ -793,17 +1072,17 @@ def update_booking_by_query(
                        {"field": "from",        "value": "Visakhapatnam"}]
 
     Step 1: Build WHERE clause from vehicle + source/destination/current_date filters
-    Step 2: Find matching booking IDs
-    Step 3: Apply ALL updates to each matched row
+    Step 2: One UPDATE ... RETURNING applies ALL updates to every matching
+            row — one statement, one transaction
     """
-    print(f"\n[Tools] ─── update_booking_by_query ──────────────────────")
-    print(f"[Tools] vehicle={vehicle!r}")
-    print(f"[Tools] source={source!r}, destination={destination!r}, current_date={current_date!r}")
-    print(f"[Tools] updates={updates!r}, field={field!r}, value={value!r}")
+    log.debug(f"[Tools] ─── update_booking_by_query ──────────────────────")
+    log.debug(f"[Tools] vehicle={vehicle!r}")
+    log.debug(f"[Tools] source={source!r}, destination={destination!r}, current_date={current_date!r}")
+    log.debug(f"[Tools] updates={updates!r}, field={field!r}, value={value!r}")
 
     v           = _validate_vehicle(vehicle)
     history_tbl = settings.TABLE_NAME
-    print(f"[Tools] 🗄️  Table: '{history_tbl}'")
+    log.debug(f"[Tools] 🗄️  Table: '{history_tbl}'")
 
     # Normalise updates list — support both new (updates list) and old (field+value) formats
     if updates and isinstance(updates, list) and len(updates) > 0:
@@ -822,39 +1101,57 @@ def update_booking_by_query(
         if db_col == "travel_date":
             f_val = _parse_date(f_val) or f_val
         resolved_updates.append({"field": f_name, "db_col": db_col, "value": f_val})
-        print(f"[Tools] 📝 Update: '{f_name}' ({db_col}) → '{f_val}'")
+        log.debug(f"[Tools] 📝 Update: '{f_name}' ({db_col}) → '{f_val}'")
 
     # ── Build WHERE clause to find matching bookings ──────────────
-    conditions: list[str] = ["vehicle = %s"]
+    conditions: list[str] = ["t.vehicle = %s"]
     params:     list      = [v]
 
     if source:
         src = source.strip().title()
-        conditions.append("LOWER(from_loc) = LOWER(%s)")
+        conditions.append("LOWER(t.from_loc) = LOWER(%s)")
         params.append(src)
-        print(f"[Tools] 🔎 from_loc filter: '{src}'")
+        log.debug(f"[Tools] 🔎 from_loc filter: '{src}'")
 
     if destination:
         dst = destination.strip().title()
-        conditions.append("LOWER(to_loc) = LOWER(%s)")
+        conditions.append("LOWER(t.to_loc) = LOWER(%s)")
         params.append(dst)
-        print(f"[Tools] 🔎 to_loc filter: '{dst}'")
+        log.debug(f"[Tools] 🔎 to_loc filter: '{dst}'")
 
     if current_date:
         cd = _parse_date(current_date)
         if cd:
-            conditions.append("travel_date = %s")
+            conditions.append("t.travel_date = %s")
             params.append(cd)
-            print(f"[Tools] 🔎 travel_date filter: '{cd}'")
-
-    where    = "WHERE " + " AND ".join(conditions)
-    find_sql = f"SELECT id FROM {history_tbl} {where} ORDER BY booked_at DESC"
-    _log_sql("FIND matching", find_sql, tuple(params))
-
-    matched = execute_query(find_sql, tuple(params))
-    print(f"[Tools] 🔎 Matched {len(matched)} row(s)")
-
-    if not matched:
+            log.debug(f"[Tools] 🔎 travel_date filter: '{cd}'")
+
+    # Same column named twice ("from" + "source") → last value wins;
+    # SET can't assign one column twice.
+    set_values: dict[str, str] = {}
+    for u in resolved_updates:
+        set_values[u["db_col"]] = u["value"]
+    set_clause = ", ".join(f"{col} = %s" for col in set_values)
+
+    # WHERE sees the OLD values, even when the update rewrites the very
+    # columns being filtered on; the self-join returns the old travel_date
+    # too, so the history cache drops both the old and the new date.
+    where   = "WHERE " + " AND ".join([*conditions, "old.id = t.id"])
+    sql_str = (
+        f"WITH h AS (UPDATE {history_tbl} AS t SET {set_clause} FROM {history_tbl} AS old {where} "
+        f"RETURNING t.id, t.booked_at, t.vehicle, old.travel_date AS old_date, t.travel_date)\n"
+        f"SELECT id, vehicle, old_date, travel_date FROM h ORDER BY booked_at DESC, id"
+    )
+    all_params = (*set_values.values(), *params)
+    _log_sql(f"UPDATE {history_tbl} ({v})", sql_str, all_params)
+
+    key         = ("update_booking_by_query", history_tbl, tuple(set_values), tuple(conditions))
+    returned    = execute_returning(sql_str, all_params, key=key)
+    updated_ids = [r["id"] for r in returned]
+    history_cache.invalidate(_changed(returned))
+    log.debug(f"[Tools] 🔎 Matched + updated {len(updated_ids)} row(s)")
+
+    if not updated_ids:
         desc = f"**{v}** booking"
         if source and destination:
             desc += f" from **{source.title()}** to **{destination.title()}**"
@@ -868,30 +1165,9 @@ def update_booking_by_query(
             ),
         }
 
-    # ── Apply ALL updates to each matched row ──────────────────────
-    updated_ids = []
-    for row in matched:
-        bid = row["id"]
-        for u in resolved_updates:
-            db_col = u["db_col"]
-            f_val  = u["value"]
-
-            # Update vehicle table
-            sql_v = f"UPDATE {v} SET {db_col} = %s WHERE id = %s"
-            _log_sql(f"UPDATE {v} id={bid} {db_col}", sql_v, (f_val, bid))
-            execute_write(sql_v, (f_val, bid))
-
-            # Update history table
-            sql_h = f"UPDATE {history_tbl} SET {db_col} = %s WHERE id = %s"
-            _log_sql(f"UPDATE {history_tbl} id={bid} {db_col}", sql_h, (f_val, bid))
-            execute_write(sql_h, (f_val, bid))
-
-        if bid not in updated_ids:
-            updated_ids.append(bid)
-
     ids_str    = ", ".join(f"**#{i}**" for i in updated_ids)
     changes    = ", ".join(f"**{u['field']}** → **{u['value']}**" for u in resolved_updates)
-    print(f"[Tools] ✅ Updated IDs: {updated_ids} | Changes: {changes}")
+    log.debug(f"[Tools] ✅ Updated IDs: {updated_ids} | Changes: {changes}")
 
     return {
         "success": True,
@@ -900,6 +1176,7 @@ def update_booking_by_query(
             f"🎫 ID(s): {ids_str}\n"
             f"📝 {changes}"
         ),
+        "updated_ids": updated_ids,
     }
 
 
@@ -908,24 +1185,26 @@ def update_booking_by_query(
 # ─────────────────────────────────────────────────────────────────
 
 def delete_booking(booking_id: int, vehicle: str | None = None) -> dict:
-    """DELETE from history + vehicle table by booking ID."""
-    print(f"\n[Tools] ─── delete_booking ───────────────────────────────")
-    print(f"[Tools] booking_id={booking_id}, vehicle={vehicle!r}")
+    """DELETE by booking ID — one row, one statement."""
+    log.debug(f"[Tools] ─── delete_booking ───────────────────────────────")
+    log.debug(f"[Tools] booking_id={booking_id}, vehicle={vehicle!r}")
 
     history_tbl = settings.TABLE_NAME
     bid         = int(booking_id)
+    v           = _validate_vehicle(vehicle) if vehicle else None
 
-    sql_h = f"DELETE FROM {history_tbl} WHERE id = %s"
-    _log_sql(f"DELETE {history_tbl}", sql_h, (bid,))
-    rh = execute_write(sql_h, (bid,))
-    print(f"[Tools] 🗑️  {rh} row(s) deleted from '{history_tbl}'")
-
-    if vehicle:
-        v     = _validate_vehicle(vehicle)
-        sql_v = f"DELETE FROM {v} WHERE id = %s"
-        _log_sql(f"DELETE {v}", sql_v, (bid,))
-        rv = execute_write(sql_v, (bid,))
-        print(f"[Tools] 🗑️  {rv} row(s) deleted from '{v}'")
+    # A named vehicle must match — "cancel my bus booking 5" never deletes a train booking
+    if v:
+        sql_h  = f"DELETE FROM {history_tbl} WHERE id = %s AND vehicle = %s RETURNING vehicle, travel_date"
+        params = (bid, v)
+    else:
+        sql_h  = f"DELETE FROM {history_tbl} WHERE id = %s RETURNING vehicle, travel_date"
+        params = (bid,)
+    _log_sql(f"DELETE {history_tbl}", sql_h, params)
+    returned = execute_returning(sql_h, params, key=("delete_booking", history_tbl, bool(v)))
+    rh       = len(returned)
+    history_cache.invalidate((r["vehicle"], r["travel_date"]) for r in returned)
+    log.debug(f"[Tools] 🗑️  {rh} row(s) deleted from '{history_tbl}'")
 
     if rh == 0:
         return {"success": False, "message": f"⚠️ No booking found with ID **#{booking_id}**."}
@@ -949,7 +1228,7 @@ TOOL_REGISTRY: dict[str, callable] = {
 
 def dispatch_tool(tool_name: str | None, arguments: dict) -> dict:
     """Route tool name → function → execute."""
-    print(f"\n[Dispatch] Tool='{tool_name}' | Args={list(arguments.keys())}")
+    log.debug(f"[Dispatch] Tool='{tool_name}' | Args={list(arguments.keys())}")
 
     if not tool_name:
         return {"success": False, "message": "⚠️ LLM did not return a tool name."}
@@ -961,13 +1240,13 @@ def dispatch_tool(tool_name: str | None, arguments: dict) -> dict:
             "message": f"⚠️ Unknown tool '{tool_name}'. Available: {', '.join(TOOL_REGISTRY)}",
         }
     try:
-        print(f"[Dispatch] ⚡ Calling {tool_name}({list(arguments.keys())})")
+        log.debug(f"[Dispatch] ⚡ Calling {tool_name}({list(arguments.keys())})")
         result = func(**arguments)
-        print(f"[Dispatch] {'✅' if result.get('success') else '❌'} {tool_name} done")
+        log.debug(f"[Dispatch] {'✅' if result.get('success') else '❌'} {tool_name} done")
         return result
     except TypeError as te:
-        print(f"[Dispatch] ❌ TypeError: {te}")
+        log.error(f"[Dispatch] ❌ TypeError: {te}")
         return {"success": False, "message": f"⚠️ Bad arguments for '{tool_name}': {te}"}
     except Exception as exc:
-        print(f"[Dispatch] ❌ {type(exc).__name__}: {exc}")
+        log.error(f"[Dispatch] ❌ {type(exc).__name__}: {exc}")
         return {"success": False, "message": f"⚠️ Error in '{tool_name}': {exc}"}
\ No newline at end of file
@@ -16,7 +16,8 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 # Locate .env at backend root regardless of working directory
-_ENV_PATH = Path(__file__).resolve().parent.parent.parent / ".env"
+# (ENV_FILE points elsewhere — e.g. benchmarks/bench.env for the load test)
+_ENV_PATH = Path(os.getenv("ENV_FILE") or Path(__file__).resolve().parent.parent.parent / ".env")
 load_dotenv(dotenv_path=_ENV_PATH, override=True)
 
 print(f"[Config] 📂 Loading .env from: {_ENV_PATH}")
@@ -29,11 +30,54 @@ class Settings:
     # OpenAI
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "").strip()
     OPENAI_MODEL:   str = os.getenv("OPENAI_MODEL",   "gpt-3.5-turbo").strip()
+    # Any OpenAI-compatible endpoint (benchmarks/fake_llm.py for offline load tests)
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").strip().rstrip("/")
 
     # Google Gemini
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "").strip()
     GEMINI_MODEL:   str = os.getenv("GEMINI_MODEL",   "gemini-1.5-flash").strip()
 
+    # Long-lived provider HTTP clients (keep-alive pool shared by all requests)
+    LLM_MAX_CONNECTIONS:  int   = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "120"))   # seconds
+
+    # Provider-side prompt caching of the static system prompt
+    # (OpenAI caches automatically; Gemini gets an explicit CachedContent)
+    LLM_PROMPT_CACHE:     bool = os.getenv("LLM_PROMPT_CACHE", "true").strip().lower() == "true"
+    LLM_PROMPT_CACHE_TTL: int  = int(os.getenv("LLM_PROMPT_CACHE_TTL", "3600"))   # seconds (Gemini)
+
+    # How the model reports its tool choice: "json" (JSON text, parsed by
+    # _extract_json) or "native" (function calling with tool_schemas.py)
+    LLM_TOOL_MODE: str = os.getenv("LLM_TOOL_MODE", "json").strip().lower()
+
+    # Provider router (agents/llm_router.py): failover + hedged requests
+    # to the other provider (only if its API key is set) + circuit breaker
+    LLM_FALLBACK_ENABLED: bool  = os.getenv("LLM_FALLBACK_ENABLED", "true").strip().lower() == "true"
+    LLM_TIMEOUT_BUDGET:   float = float(os.getenv("LLM_TIMEOUT_BUDGET", "20"))     # seconds, whole LLM step
+    LLM_HEDGE_DELAY_MS:   float = float(os.getenv("LLM_HEDGE_DELAY_MS", "1500"))  # 0 = 2 × primary's EWMA
+    LLM_BREAKER_FAILURES: int   = int(os.getenv("LLM_BREAKER_FAILURES", "5"))      # in a row → open
+    LLM_BREAKER_COOLDOWN: float = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))   # seconds open → half-open
+
+    # Rule-based parser for common phrasings (skips the LLM when confident)
+    INTENT_PARSER_ENABLED: bool = os.getenv("INTENT_PARSER_ENABLED", "true").strip().lower() == "true"
+
+    # Cache of parsed LLM tool calls (temperature=0 → same message, same JSON)
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "true").strip().lower() == "true"
+    LLM_CACHE_TTL:     int  = int(os.getenv("LLM_CACHE_TTL", "3600"))    # seconds
+    LLM_CACHE_MAX:     int  = int(os.getenv("LLM_CACHE_MAX", "1024"))    # entries (LRU)
+
+    # POST /api/chat/batch
+    BATCH_MAX_MESSAGES:    int = int(os.getenv("BATCH_MAX_MESSAGES", "500"))
+    BATCH_LLM_CONCURRENCY: int = int(os.getenv("BATCH_LLM_CONCURRENCY", "8"))    # LLM calls in flight
+    BATCH_WRITE_CHUNK:     int = int(os.getenv("BATCH_WRITE_CHUNK", "100"))      # messages per write transaction
+
+    # City / station resolver data (city,codes,aliases CSV) and how many
+    # cities' codes are spelled out in the LLM prompt
+    CITY_DATA_FILE:  str = os.getenv("CITY_DATA_FILE", "").strip() or str(
+        Path(__file__).resolve().parent.parent / "data" / "cities.csv"
+    )
+    CITY_PROMPT_MAX: int = int(os.getenv("CITY_PROMPT_MAX", "16"))
+
     # ── PostgreSQL ────────────────────────────────────────────────
     # DB_NAME is lowercased here — PostgreSQL stores db names lowercase
     DB_NAME:     str = os.getenv("DATABASE", "booking").strip().lower()
@@ -42,13 +86,42 @@ class Settings:
     DB_USER:     str = os.getenv("USER",     "postgres").strip()
     DB_PASSWORD: str = os.getenv("PASSWORD", "").strip()
 
+    # Connection pool — bounded, shared by every request in the process
+    DB_POOL_MIN:     int   = int(os.getenv("DB_POOL_MIN", "1"))
+    DB_POOL_MAX:     int   = int(os.getenv("DB_POOL_MAX", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "5"))   # seconds to wait for a free connection
+
+    # Server-side prepared statements for the tools' SQL (turn off behind
+    # a transaction-mode pgbouncer — PREPARE is per server session)
+    DB_PREPARED_STATEMENTS: bool = os.getenv("DB_PREPARED_STATEMENTS", "true").strip().lower() == "true"
+    DB_PREPARED_MAX:        int  = int(os.getenv("DB_PREPARED_MAX", "256"))   # per connection
+
     # TABLE_NAME is lowercased here ONCE — used directly in SQL without .lower() calls
     # .env has: TABLE_NAME=Travel_history  →  stored as "travel_history"
     TABLE_NAME: str = os.getenv("TABLE_NAME", "travel_history").strip().lower()
 
+    # History table layout + paging
+    HISTORY_PARTITIONED:            bool = os.getenv("HISTORY_PARTITIONED", "false").strip().lower() == "true"
+    HISTORY_PARTITION_YEARS_AHEAD:  int  = int(os.getenv("HISTORY_PARTITION_YEARS_AHEAD", "2"))
+    HISTORY_PAGE_SIZE:              int  = int(os.getenv("HISTORY_PAGE_SIZE", "100"))
+    HISTORY_PAGE_MAX:               int  = int(os.getenv("HISTORY_PAGE_MAX", "500"))
+    EXPORT_FETCH_SIZE:              int  = int(os.getenv("EXPORT_FETCH_SIZE", "2000"))   # rows per server-side cursor fetch
+
+    # Read-through cache of history pages (agents/history_cache.py) — dropped per vehicle/date on writes
+    HISTORY_CACHE_ENABLED: bool = os.getenv("HISTORY_CACHE_ENABLED", "true").strip().lower() == "true"
+    HISTORY_CACHE_TTL:     int  = int(os.getenv("HISTORY_CACHE_TTL", "60"))     # seconds
+    HISTORY_CACHE_MAX:     int  = int(os.getenv("HISTORY_CACHE_MAX", "256"))    # entries (LRU)
+
+    # Responses at least this big are gzip-compressed for clients that accept it (0 = off)
+    GZIP_MIN_SIZE: int = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+
     # Vehicle tables — always lowercase (must match DB)
     VEHICLE_TABLES: list[str] = ["train", "bus", "flight", "car", "bike"]
 
+    # ── Logging ───────────────────────────────────────────────────
+    # Per-request / per-row detail is DEBUG; the default keeps the hot path quiet
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+
     # ── CORS ──────────────────────────────────────────────────────
     @property
     def ALLOWED_ORIGINS(self) -> list[str]:
@@ -61,7 +134,9 @@ class Settings:
     def print_summary(self) -> None:
         print(f"[Config] ⚙️  LLM Provider : {self.LLM_PROVIDER.upper()}")
         print(f"[Config] 🤖 LLM Model    : {self.OPENAI_MODEL if self.LLM_PROVIDER == 'openai' else self.GEMINI_MODEL}")
+        print(f"[Config] 🧰 Tool Mode    : {self.LLM_TOOL_MODE}")
         print(f"[Config] 🗄️  Database     : {self.DB_NAME} @ {self.DB_HOST}:{self.DB_PORT}")
+        print(f"[Config] 🏊 DB Pool      : {self.DB_POOL_MIN}..{self.DB_POOL_MAX} (timeout {self.DB_POOL_TIMEOUT}s)")
         print(f"[Config] 📋 History Table: {self.TABLE_NAME}")
         print(f"[Config] 🚗 Vehicles     : {self.VEHICLE_TABLES}")
 
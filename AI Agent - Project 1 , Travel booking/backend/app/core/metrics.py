@@ -0,0 +1,191 @@
+"""
+core/metrics.py
+===============
+Per-request timing spans + process-wide latency histograms.
+
+  with metrics.request_trace() as spans:      # one per HTTP request (router)
+      with metrics.span("llm_call"):          # anywhere below it
+          ...
+
+Every span is recorded twice:
+  • into the current request's span list (ContextVar — survives
+    asyncio.to_thread, so SQL spans from worker threads land in the
+    right request) → Server-Timing header
+  • into a fixed-bucket histogram per stage → GET /metrics
+
+Stages used by the agent:
+  request_total, greeting_check, intent_parse, llm_call, json_extract,
+  city_expand, dispatch, db_acquire, sql_select / sql_insert / ...
+
+LLM token counters (record_tokens) sit alongside: prompt / cached /
+completion tokens per provider, to show what prompt caching saves.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+# Upper bounds in milliseconds (+Inf is implicit)
+BUCKETS_MS: tuple[float, ...] = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "sum_ms", "max_ms")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count  = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float) -> None:
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count     += 1
+        self.sum_ms    += ms
+        self.max_ms     = max(self.max_ms, ms)
+
+    def quantile(self, q: float) -> float:
+        """Bucket upper bound containing the q-th observation (estimate)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+
+_lock:   threading.Lock             = threading.Lock()
+_hists:  dict[str, _Histogram]      = {}
+_tokens: dict[str, dict[str, int]]  = {}      # provider → calls / prompt / cached / completion
+_trace: ContextVar[list | None]    = ContextVar("request_trace", default=None)
+
+
+def observe(stage: str, ms: float) -> None:
+    with _lock:
+        hist = _hists.get(stage)
+        if hist is None:
+            hist = _hists[stage] = _Histogram()
+        hist.observe(ms)
+    spans = _trace.get()
+    if spans is not None:
+        spans.append((stage, ms))
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, (time.perf_counter() - t0) * 1000)
+
+
+@contextmanager
+def request_trace() -> Iterator[list[tuple[str, float]]]:
+    """Collect every span of one request; also times the whole request."""
+    spans: list[tuple[str, float]] = []
+    token = _trace.set(spans)
+    t0    = time.perf_counter()
+    try:
+        yield spans
+    finally:
+        _trace.reset(token)
+        total = (time.perf_counter() - t0) * 1000
+        observe("request_total", total)
+        spans.append(("request_total", total))
+
+
+def record_tokens(provider: str, prompt: int, cached: int, completion: int) -> None:
+    """Token usage of one LLM call (cached = prompt tokens served from the provider's prompt cache)."""
+    with _lock:
+        t = _tokens.get(provider)
+        if t is None:
+            t = _tokens[provider] = {"calls": 0, "prompt": 0, "cached": 0, "completion": 0}
+        t["calls"]      += 1
+        t["prompt"]     += prompt
+        t["cached"]     += cached
+        t["completion"] += completion
+
+
+def server_timing(spans: list[tuple[str, float]]) -> str:
+    """Spans → Server-Timing header value (repeated stages are summed)."""
+    totals: dict[str, float] = {}
+    for stage, ms in spans:
+        totals[stage] = totals.get(stage, 0.0) + ms
+    return ", ".join(f"{stage};dur={ms:.2f}" for stage, ms in totals.items())
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Export
+# ─────────────────────────────────────────────────────────────────
+def snapshot() -> dict:
+    with _lock:
+        return {
+            stage: {
+                "count":   h.count,
+                "avg_ms":  round(h.sum_ms / h.count, 3) if h.count else 0.0,
+                "p50_ms":  h.quantile(0.50),
+                "p95_ms":  h.quantile(0.95),
+                "p99_ms":  h.quantile(0.99),
+                "max_ms":  round(h.max_ms, 3),
+            }
+            for stage, h in sorted(_hists.items())
+        }
+
+
+def token_snapshot() -> dict:
+    with _lock:
+        return {
+            provider: {
+                **t,
+                "avg_prompt":   round(t["prompt"] / t["calls"], 1) if t["calls"] else 0.0,
+                "cached_ratio": round(t["cached"] / t["prompt"], 3) if t["prompt"] else 0.0,
+            }
+            for provider, t in sorted(_tokens.items())
+        }
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition format (histogram per stage)."""
+    name  = "booking_stage_latency_ms"
+    lines = [
+        f"# HELP {name} Latency of each booking-agent pipeline stage in milliseconds.",
+        f"# TYPE {name} histogram",
+    ]
+    with _lock:
+        for stage, h in sorted(_hists.items()):
+            cumulative = 0
+            for bound, c in zip(BUCKETS_MS, h.counts):
+                cumulative += c
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum_ms:.3f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+        tokens = "booking_llm_tokens_total"
+        calls  = "booking_llm_calls_total"
+        lines += [
+            f"# HELP {tokens} LLM tokens by provider and kind (cached = prompt tokens served from cache).",
+            f"# TYPE {tokens} counter",
+        ]
+        for provider, t in sorted(_tokens.items()):
+            for kind in ("prompt", "cached", "completion"):
+                lines.append(f'{tokens}{{provider="{provider}",kind="{kind}"}} {t[kind]}')
+        lines += [f"# HELP {calls} LLM calls by provider.", f"# TYPE {calls} counter"]
+        for provider, t in sorted(_tokens.items()):
+            lines.append(f'{calls}{{provider="{provider}"}} {t["calls"]}')
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    with _lock:
+        _hists.clear()
+        _tokens.clear()
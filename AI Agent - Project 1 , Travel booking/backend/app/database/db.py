@@ -15,31 +15,57 @@ PostgreSQL casing rule:
     settings.DB_NAME     = "booking"
     SQL uses "travel_history" (quoted) → matches exactly
 
-Startup sequence:
-  1. Connect to postgres maintenance DB
-  2. CREATE DATABASE settings.DB_NAME  (e.g. "booking")
-  3. CREATE TABLE IF NOT EXISTS for each vehicle  (train/bus/flight/car/bike)
-  4. CREATE TABLE IF NOT EXISTS for combined history (e.g. "travel_history")
+Connections:
+  One bounded, process-wide pool (DB_POOL_MIN..DB_POOL_MAX) sits behind
+  get_connection(). Callers wait up to DB_POOL_TIMEOUT seconds for a free
+  connection; pool_stats() reports saturation and wait times for /health.
+
+Prepared statements:
+  Query helpers accept an optional key=(tool, table, field set). Keyed
+  statements are PREPAREd lazily on each pooled connection the first time
+  it runs them, then sent as EXECUTE — Postgres skips parse/plan on reuse.
+
+Streaming:
+  stream_query() reads through a named (server-side) cursor: Postgres keeps
+  the result set and the client holds EXPORT_FETCH_SIZE rows at a time, so
+  exports use flat memory whatever the table size.
+
+Single source of truth:
+  The history table (e.g. "travel_history") is the ONLY bookings table.
+  train / bus / flight / car / bike are views over it (WHERE vehicle = ...),
+  so a booking is written once and has one id. Pre-existing per-vehicle
+  tables are renamed to "<vehicle>_legacy", never dropped.
+
+Startup sequence (init_db):
+  1. Read schema_version through the pool — up to date → done (one query)
+  2. Application DB missing → create it via the postgres maintenance DB
+  3. Apply pending migrations (database/migrations.py), in order:
+       v1  combined history table (e.g. "travel_history"),
+           RANGE-partitioned by travel_date when HISTORY_PARTITIONED=true
+       v2  indexes for the history filters / keyset pagination
+       v3  one view per vehicle  (train/bus/flight/car/bike)
+     then top up the yearly partitions
 """
 from __future__ import annotations
 
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
 from psycopg2 import sql as pgsql
 
+from app.core import metrics
 from app.core.config import settings
+from app.database import migrations
 
-# ── Shared column DDL ─────────────────────────────────────────────
-_COLS = """
-    id          SERIAL       PRIMARY KEY,
-    vehicle     VARCHAR(20)  NOT NULL,
-    from_loc    TEXT         NOT NULL,
-    to_loc      TEXT         NOT NULL,
-    travel_date DATE,
-    booked_at   TIMESTAMP    DEFAULT NOW(),
-    status      VARCHAR(20)  DEFAULT 'confirmed'
-"""
-
+log = logging.getLogger(__name__)
 
 # ─────────────────────────────────────────────────────────────────
 #  Connection helpers
@@ -59,20 +85,194 @@ def _raw_connect(dbname: str) -> psycopg2.extensions.connection:
     return conn
 
 
+class _Connection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which statements it has PREPAREd."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared: set[str] = set()
+
+
+class PoolTimeout(psycopg2.pool.PoolError):
+    """Raised when no pooled connection frees up within DB_POOL_TIMEOUT."""
+
+
+class _BoundedPool:
+    """
+    ThreadedConnectionPool with a blocking, time-limited acquire.
+
+    psycopg2's pool raises immediately once maxconn connections are out.
+    A semaphore with the same size in front of it turns that into
+    "wait up to DB_POOL_TIMEOUT seconds", and lets us count how often
+    (and for how long) callers had to wait.
+    """
+
+    def __init__(self, minconn: int, maxconn: int, timeout: float) -> None:
+        self._pool    = psycopg2.pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            dbname=settings.DB_NAME,           # already lowercase
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            connection_factory=_Connection,
+            cursor_factory=psycopg2.extras.RealDictCursor,
+        )
+        self._slots   = threading.BoundedSemaphore(maxconn)
+        self._lock    = threading.Lock()
+        self.minconn  = minconn
+        self.maxconn  = maxconn
+        self.timeout  = timeout
+        # ── stats ──
+        self.in_use       = 0
+        self.peak_in_use  = 0
+        self.acquired     = 0
+        self.waited       = 0
+        self.timeouts     = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s   = 0.0
+
+    def getconn(self) -> psycopg2.extensions.connection:
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            if not self._slots.acquire(timeout=self.timeout):
+                with self._lock:
+                    self.timeouts += 1
+                raise PoolTimeout(
+                    f"No DB connection free after {self.timeout}s "
+                    f"({self.maxconn} in use)"
+                )
+            waited = time.perf_counter() - start
+            with self._lock:
+                self.waited       += 1
+                self.wait_total_s += waited
+                self.wait_max_s    = max(self.wait_max_s, waited)
+
+        try:
+            conn = self._pool.getconn()
+            if conn.closed:
+                # Server restarted / connection dropped while idle — replace it
+                self._pool.putconn(conn, close=True)
+                conn = self._pool.getconn()
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self.acquired    += 1
+            self.in_use      += 1
+            self.peak_in_use  = max(self.peak_in_use, self.in_use)
+        return conn
+
+    def putconn(self, conn: psycopg2.extensions.connection, discard: bool = False) -> None:
+        try:
+            if not conn.closed and not discard:
+                # Never hand an open transaction to the next caller
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            self._pool.putconn(conn, close=discard or bool(conn.closed))
+        finally:
+            with self._lock:
+                self.in_use -= 1
+            self._slots.release()
+
+    def closeall(self) -> None:
+        self._pool.closeall()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "min":            self.minconn,
+                "max":            self.maxconn,
+                "in_use":         self.in_use,
+                "peak_in_use":    self.peak_in_use,
+                "saturation":     round(self.in_use / self.maxconn, 3),
+                "acquired":       self.acquired,
+                "waited":         self.waited,
+                "timeouts":       self.timeouts,
+                "wait_avg_ms":    round(self.wait_total_s * 1000 / self.waited, 2) if self.waited else 0.0,
+                "wait_max_ms":    round(self.wait_max_s * 1000, 2),
+                "acquire_timeout_s": self.timeout,
+            }
+
+
+_pool:      _BoundedPool | None = None
+_pool_lock: threading.Lock      = threading.Lock()
+
+
+def _get_pool() -> _BoundedPool:
+    """Create the process-wide pool on first use (after init_db made the DB)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                print(
+                    f"[DB] 🏊 Creating pool {settings.DB_POOL_MIN}..{settings.DB_POOL_MAX} "
+                    f"→ {settings.DB_USER}@{settings.DB_HOST}:{settings.DB_PORT}/{settings.DB_NAME}"
+                )
+                _pool = _BoundedPool(
+                    settings.DB_POOL_MIN,
+                    settings.DB_POOL_MAX,
+                    settings.DB_POOL_TIMEOUT,
+                )
+    return _pool
+
+
 def get_connection() -> psycopg2.extensions.connection:
     """
-    Open a RealDictCursor connection to the application database.
-    Uses settings.DB_NAME which is already lowercase from config.py.
+    Borrow a RealDictCursor connection to the application database.
+    Must be handed back with release_connection() — prefer pooled_connection().
     """
-    print(f"[DB] 🔗 get_connection → db='{settings.DB_NAME}'")
-    return psycopg2.connect(
-        dbname=settings.DB_NAME,           # already lowercase
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        cursor_factory=psycopg2.extras.RealDictCursor,
-    )
+    return _get_pool().getconn()
+
+
+def release_connection(conn: psycopg2.extensions.connection, discard: bool = False) -> None:
+    """Return a borrowed connection. discard=True closes it instead of reusing it."""
+    _get_pool().putconn(conn, discard=discard)
+
+
+@contextmanager
+def pooled_connection() -> Iterator[psycopg2.extensions.connection]:
+    """
+    with pooled_connection() as conn: ...
+    Rolls back on error; broken connections are dropped from the pool.
+    Released in finally — KeyboardInterrupt / CancelledError must not leak a slot.
+    """
+    with metrics.span("db_acquire"):
+        conn = get_connection()
+    ok = False
+    try:
+        yield conn
+        ok = True
+    finally:
+        if ok:
+            release_connection(conn)
+        else:
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            release_connection(conn, discard=broken)
+
+
+def pool_stats() -> dict:
+    """Saturation / wait-time counters for /health. Empty until first use."""
+    if _pool is None:
+        return {"status": "not_started"}
+    return {"status": "ok", **_pool.stats(), "prepared": prepared_stats()}
+
+
+def close_pool() -> None:
+    """Close every pooled connection (app shutdown)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            print("[DB] 🏊 Pool closed")
+            _pool = None
 
 
 # ─────────────────────────────────────────────────────────────────
@@ -101,97 +301,226 @@ def _ensure_database() -> None:
         conn.close()
 
 
-def _ensure_table(cur: psycopg2.extensions.cursor, table_name: str) -> None:
-    """
-    CREATE TABLE IF NOT EXISTS.
-    table_name must already be lowercase (enforced by config.py).
-    Uses pgsql.Identifier() which quotes the name → case-safe.
-    """
-    print(f"[DB] 🛠️  Ensuring table '{table_name}' ...")
-    ddl = pgsql.SQL(
-        "CREATE TABLE IF NOT EXISTS {} ({});"
-    ).format(pgsql.Identifier(table_name), pgsql.SQL(_COLS))
-    cur.execute(ddl)
-    print(f"[DB] ✔  Table '{table_name}' ready")
+def _migrate() -> int:
+    with pooled_connection() as conn:
+        return migrations.migrate(conn)
 
 
 def init_db() -> None:
-    """Full startup: ensure DB exists, create all tables."""
-    print(f"\n[DB] {'='*55}")
-    print(f"[DB] 🚀 Initialising database ...")
-    settings.print_summary()
-    print(f"[DB] {'='*55}")
-
-    _ensure_database()
-
-    conn = get_connection()
+    """
+    Startup: bring the schema up to date (database/migrations.py).
+    Already current → a single query on a pooled connection. The postgres
+    maintenance DB is only touched when the application DB is missing.
+    """
+    t0 = time.perf_counter()
     try:
-        with conn.cursor() as cur:
-            for tbl in settings.VEHICLE_TABLES:
-                _ensure_table(cur, tbl)
-            _ensure_table(cur, settings.TABLE_NAME)
-        conn.commit()
-        print(f"[DB] ✅ All tables ready in '{settings.DB_NAME}'")
+        try:
+            applied = _migrate()
+        except psycopg2.OperationalError as exc:
+            if "does not exist" not in str(exc):
+                raise
+            _ensure_database()
+            applied = _migrate()
     except Exception as exc:
-        conn.rollback()
         print(f"[DB] ❌ Init error: {exc}")
         raise
-    finally:
-        conn.close()
-    print(f"[DB] {'='*55}\n")
+    if applied:
+        print(f"[DB] ✅ All tables ready in '{settings.DB_NAME}' ({(time.perf_counter() - t0) * 1000:.0f} ms)")
 
 
 # ─────────────────────────────────────────────────────────────────
 #  Query helpers
 # ─────────────────────────────────────────────────────────────────
 
-def execute_query(sql_str: str, params: tuple = ()) -> list[dict]:
+def _sql_stage(sql_str: str) -> str:
+    """Metrics stage name for a statement: sql_select, sql_insert, sql_with, ..."""
+    return "sql_" + sql_str.lstrip().split(None, 1)[0].lower()
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Prepared-statement registry
+# ─────────────────────────────────────────────────────────────────
+
+StatementKey = tuple   # e.g. ("update_booking_by_id", "bus", ("status",))
+
+
+class _Statement:
+    """One registered statement: %s-style SQL → PREPARE / EXECUTE text."""
+    __slots__ = ("key", "name", "prepare_sql", "execute_sql", "usable")
+
+    def __init__(self, key: StatementKey, sql_str: str) -> None:
+        parts  = sql_str.split("%s")
+        body   = parts[0] + "".join(f"${i}{part}" for i, part in enumerate(parts[1:], 1))
+        nparam = len(parts) - 1
+
+        self.key         = key
+        self.name        = "ps_" + hashlib.sha1(f"{key!r}|{sql_str}".encode()).hexdigest()[:20]
+        self.prepare_sql = f"PREPARE {self.name} AS {body.replace('%%', '%')}"
+        self.execute_sql = f"EXECUTE {self.name}" + (f" ({', '.join(['%s'] * nparam)})" if nparam else "")
+        self.usable      = True     # False once the server refused to PREPARE it
+
+
+_statements:      dict[tuple[StatementKey, str], _Statement] = {}
+_statements_lock: threading.Lock = threading.Lock()
+_prep_stats:      dict[str, int] = {"prepares": 0, "executes": 0, "plain": 0, "failed": 0}
+
+
+def _statement(key: StatementKey, sql_str: str) -> _Statement:
+    stmt = _statements.get((key, sql_str))
+    if stmt is None:
+        with _statements_lock:
+            stmt = _statements.setdefault((key, sql_str), _Statement(key, sql_str))
+    return stmt
+
+
+def _count(field: str) -> None:
+    with _statements_lock:
+        _prep_stats[field] += 1
+
+
+def _run(conn, cur, sql_str: str, params: tuple, key: StatementKey | None) -> None:
+    """
+    cur.execute() through the registry when a key is given: PREPARE once per
+    connection (first statement of the transaction), EXECUTE from then on.
+    """
+    stmt = _statement(key, sql_str) if key is not None and settings.DB_PREPARED_STATEMENTS else None
+    if stmt is None or not stmt.usable or not isinstance(conn, _Connection):
+        _count("plain")
+        cur.execute(sql_str, params)
+        return
+
+    if stmt.name not in conn.prepared:
+        if len(conn.prepared) >= settings.DB_PREPARED_MAX:
+            _count("plain")
+            cur.execute(sql_str, params)
+            return
+        try:
+            cur.execute(stmt.prepare_sql)
+        except psycopg2.Error as exc:
+            # e.g. a parameter type Postgres can't infer — run this shape plain from now on
+            conn.rollback()
+            stmt.usable = False
+            _count("failed")
+            log.warning(f"[DB] ⚠️  PREPARE failed for {stmt.key}: {exc}".rstrip())
+            cur.execute(sql_str, params)
+            return
+        conn.prepared.add(stmt.name)
+        _count("prepares")
+        log.debug(f"[DB] 📌 Prepared {stmt.name} for {stmt.key}")
+
+    _count("executes")
+    cur.execute(stmt.execute_sql, params)
+
+
+def prepared_stats() -> dict:
+    """Registry size + PREPARE / EXECUTE / plain counters."""
+    with _statements_lock:
+        return {
+            "enabled":    settings.DB_PREPARED_STATEMENTS,
+            "registered": len(_statements),
+            **_prep_stats,
+        }
+
+
+def execute_query(sql_str: str, params: tuple = (), key: StatementKey | None = None) -> list[dict]:
     """
     Run a SELECT and return list[dict].
     Note: table names in sql_str must be lowercase (match DB).
+    key: optional registry key → runs as a prepared statement.
     """
-    conn = get_connection()
     try:
-        with conn.cursor() as cur:
-            print(f"[DB] 🔍 QUERY  | {sql_str.strip()[:120]} | {params}")
-            cur.execute(sql_str, params)
-            rows = [dict(r) for r in cur.fetchall()]
-            print(f"[DB] ✅ QUERY  | {len(rows)} row(s) returned")
+        with pooled_connection() as conn, conn.cursor() as cur:
+            log.debug(f"[DB] 🔍 QUERY  | {sql_str.strip()[:120]} | {params}")
+            with metrics.span(_sql_stage(sql_str)):
+                _run(conn, cur, sql_str, params, key)
+                rows = [dict(r) for r in cur.fetchall()]
+            log.debug(f"[DB] ✅ QUERY  | {len(rows)} row(s) returned")
             return rows
     except Exception as exc:
-        print(f"[DB] ❌ QUERY error: {exc}")
+        log.error(f"[DB] ❌ QUERY error: {exc}")
         raise
-    finally:
-        conn.close()
 
 
-def execute_write(sql_str: str, params: tuple = ()) -> int:
+def execute_write(sql_str: str, params: tuple = (), key: StatementKey | None = None) -> int:
     """
     Run INSERT / UPDATE / DELETE.
     Returns RETURNING id for INSERT, rowcount otherwise.
     Note: table names in sql_str must be lowercase (match DB).
+    key: optional registry key → runs as a prepared statement.
     """
-    conn = get_connection()
     try:
-        with conn.cursor() as cur:
+        with pooled_connection() as conn, conn.cursor() as cur:
             op = sql_str.strip().split()[0].upper()
-            print(f"[DB] ✍️  {op} | {sql_str.strip()[:120]} | {params}")
-            cur.execute(sql_str, params)
-            conn.commit()
+            log.debug(f"[DB] ✍️  {op} | {sql_str.strip()[:120]} | {params}")
+            with metrics.span(_sql_stage(sql_str)):
+                _run(conn, cur, sql_str, params, key)
+                conn.commit()
             try:
                 row = cur.fetchone()
                 if row:
                     rid = row["id"]
-                    print(f"[DB] ✅ {op} → id={rid}")
+                    log.debug(f"[DB] ✅ {op} → id={rid}")
                     return rid
             except Exception:
                 pass
             rc = cur.rowcount
-            print(f"[DB] ✅ {op} → rowcount={rc}")
+            log.debug(f"[DB] ✅ {op} → rowcount={rc}")
             return rc
     except Exception as exc:
-        conn.rollback()
-        print(f"[DB] ❌ WRITE error: {exc}")
+        log.error(f"[DB] ❌ WRITE error: {exc}")
+        raise
+
+
+def execute_returning(sql_str: str, params: tuple = (), key: StatementKey | None = None) -> list[dict]:
+    """
+    Run one data-modifying statement (INSERT/UPDATE/DELETE ... RETURNING,
+    or a WITH-chain of them) in a single transaction and return every row.
+    key: optional registry key → runs as a prepared statement.
+    """
+    try:
+        with pooled_connection() as conn, conn.cursor() as cur:
+            op = sql_str.strip().split()[0].upper()
+            log.debug(f"[DB] ✍️  {op} | {sql_str.strip()[:120]} | {len(params)} param(s)")
+            with metrics.span(_sql_stage(sql_str)):
+                _run(conn, cur, sql_str, params, key)
+                rows = [dict(r) for r in cur.fetchall()]
+                conn.commit()
+            log.debug(f"[DB] ✅ {op} → {len(rows)} row(s) returned")
+            return rows
+    except Exception as exc:
+        log.error(f"[DB] ❌ WRITE error: {exc}")
+        raise
+
+
+def stream_query(sql_str: str, params: tuple = (), name: str = "stream") -> Iterator[dict]:
+    """
+    Run a SELECT through a named server-side cursor and yield rows one at a
+    time, fetched from Postgres EXPORT_FETCH_SIZE rows per round trip.
+    The pooled connection stays checked out until the generator is
+    exhausted or closed (e.g. the client disconnects mid-download).
+    """
+    with metrics.span("db_acquire"):
+        conn = get_connection()
+    broken = False
+    count  = 0
+    t0     = time.perf_counter()
+    try:
+        with conn.cursor(name=f"{name}_{uuid.uuid4().hex[:12]}") as cur:
+            cur.itersize = settings.EXPORT_FETCH_SIZE
+            log.debug(f"[DB] 🌊 STREAM | {sql_str.strip()[:120]} | {params}")
+            cur.execute(sql_str, params)
+            for row in cur:
+                count += 1
+                yield row
+        log.debug(f"[DB] ✅ STREAM | {count} row(s) in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    except psycopg2.Error as exc:
+        log.error(f"[DB] ❌ STREAM error after {count} row(s): {exc}")
         raise
     finally:
-        conn.close()
\ No newline at end of file
+        metrics.observe(_sql_stage(sql_str) + "_stream", (time.perf_counter() - t0) * 1000)
+        if not conn.closed:
+            try:
+                conn.rollback()            # read-only; ends the cursor's transaction
+            except psycopg2.Error:
+                broken = True
+        release_connection(conn, discard=broken or bool(conn.closed))
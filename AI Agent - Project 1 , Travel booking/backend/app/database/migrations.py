@@ -0,0 +1,286 @@
+"""
+database/migrations.py
+======================
+Versioned schema migrations for the bookings database.
+
+schema_version keeps one row per history table (scope = settings.TABLE_NAME):
+
+  scope             TEXT PRIMARY KEY
+  version           INT        — last migration applied
+  fingerprint       TEXT       — hash of the settings the DDL depends on
+                                 (table, vehicles, partitioning)
+  partitions_until  INT        — last year with a RANGE partition
+                                 (NULL: history is a plain table)
+  applied_at        TIMESTAMP
+
+Startup (db.init_db → migrate):
+  • ONE query reads that row. Version current, fingerprint unchanged and
+    partitions far enough ahead → nothing else runs.
+  • Otherwise, under an advisory lock (several workers may start at once):
+    pending migrations run in order, each in its own transaction together
+    with its version bump; yearly partitions are topped up.
+
+Migrations must be idempotent (IF NOT EXISTS / CREATE OR REPLACE): they
+also run against databases created before this table existed, and all of
+them re-run when the fingerprint changes (e.g. a vehicle is added).
+Add new ones at the end of MIGRATIONS — never renumber.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from typing import Callable
+
+import psycopg2
+from psycopg2 import errors as pgerrors
+from psycopg2 import sql as pgsql
+
+from app.core.config import settings
+
+_LOCK_ID = 0x7472_6176            # pg_advisory_xact_lock key ("trav")
+
+# ── Shared column DDL ─────────────────────────────────────────────
+_COLS = """
+    id          SERIAL       PRIMARY KEY,
+    vehicle     VARCHAR(20)  NOT NULL,
+    from_loc    TEXT         NOT NULL,
+    to_loc      TEXT         NOT NULL,
+    travel_date DATE,
+    booked_at   TIMESTAMP    DEFAULT NOW(),
+    status      VARCHAR(20)  DEFAULT 'confirmed'
+"""
+
+# Partitioned history: PostgreSQL requires the partition key in every
+# unique constraint, and travel_date is nullable — so no PRIMARY KEY here,
+# just an index on id (created with the table).
+_COLS_PARTITIONED = _COLS.replace("SERIAL       PRIMARY KEY", "SERIAL      ")
+
+# (index suffix, column list) — names become "<table>_<suffix>"
+_HISTORY_INDEXES: list[tuple[str, str]] = [
+    # get_travel_history: WHERE vehicle = ? [AND travel_date …] ORDER BY booked_at DESC, id DESC
+    ("vehicle_booked_idx", "vehicle, booked_at DESC, id DESC"),
+    ("booked_idx",         "booked_at DESC, id DESC"),
+    ("vehicle_date_idx",   "vehicle, travel_date"),
+    ("date_idx",           "travel_date"),
+    # update_booking_by_query: vehicle + LOWER(from_loc) + LOWER(to_loc) + travel_date
+    ("route_idx",          "vehicle, LOWER(from_loc), LOWER(to_loc), travel_date"),
+]
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Helpers
+# ─────────────────────────────────────────────────────────────────
+def _relkind(cur: psycopg2.extensions.cursor, table_name: str) -> str | None:
+    """'r' plain table, 'p' partitioned table, 'v' view, None if missing."""
+    cur.execute(
+        "SELECT c.relkind FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE n.nspname = current_schema() AND c.relname = %s",
+        (table_name,),
+    )
+    row = cur.fetchone()
+    return row["relkind"] if row else None
+
+
+def _partition_horizon() -> int:
+    return date.today().year + settings.HISTORY_PARTITION_YEARS_AHEAD
+
+
+def _ensure_partitions(cur: psycopg2.extensions.cursor, table_name: str) -> int:
+    """Yearly RANGE partitions (last year … N years ahead) + DEFAULT for NULL/out-of-range dates."""
+    this_year, until = date.today().year, _partition_horizon()
+    default = f"{table_name}_default"
+    has_default = _relkind(cur, default) is not None
+    for year in range(this_year - 1, until + 1):
+        part = f"{table_name}_y{year}"
+        if _relkind(cur, part) is not None:
+            continue
+        bounds = (f"{year}-01-01", f"{year + 1}-01-01")
+        if has_default and _move_out_of_default(cur, table_name, default, part, bounds):
+            continue
+        cur.execute(pgsql.SQL(
+            "CREATE TABLE {} PARTITION OF {} FOR VALUES FROM (%s) TO (%s)"
+        ).format(pgsql.Identifier(part), pgsql.Identifier(table_name)), bounds)
+    if not has_default:
+        cur.execute(pgsql.SQL(
+            "CREATE TABLE {} PARTITION OF {} DEFAULT"
+        ).format(pgsql.Identifier(default), pgsql.Identifier(table_name)))
+    print(f"[DB] ✔  Partitions ready for '{table_name}' ({this_year - 1}..{until} + default)")
+    return until
+
+
+def _move_out_of_default(
+    cur: psycopg2.extensions.cursor, table_name: str, default: str, part: str, bounds: tuple[str, str],
+) -> bool:
+    """
+    A year's bookings made before its partition existed sit in DEFAULT, and
+    PostgreSQL refuses PARTITION OF while they do (CheckViolation). Build the
+    partition as a standalone table, move those rows into it, then ATTACH.
+    Returns False when DEFAULT holds nothing for the year (plain CREATE will do).
+    """
+    cur.execute(pgsql.SQL(
+        "SELECT 1 FROM {} WHERE travel_date >= %s AND travel_date < %s LIMIT 1"
+    ).format(pgsql.Identifier(default)), bounds)
+    if cur.fetchone() is None:
+        return False
+
+    ident, parent, dflt = pgsql.Identifier(part), pgsql.Identifier(table_name), pgsql.Identifier(default)
+    cur.execute(pgsql.SQL("CREATE TABLE {} (LIKE {} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)").format(ident, parent))
+    cur.execute(pgsql.SQL(
+        "WITH moved AS (DELETE FROM {} WHERE travel_date >= %s AND travel_date < %s RETURNING *) "
+        "INSERT INTO {} SELECT * FROM moved"
+    ).format(dflt, ident), bounds)
+    moved = cur.rowcount
+    cur.execute(pgsql.SQL("ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)").format(parent, ident), bounds)
+    print(f"[DB] 📦 {moved} row(s) moved from '{default}' into new partition '{part}'")
+    return True
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Migrations — (version, name, apply(cur)); append only
+# ─────────────────────────────────────────────────────────────────
+def _m1_history_table(cur: psycopg2.extensions.cursor) -> None:
+    """
+    Combined history table — optionally RANGE-partitioned by travel_date
+    (HISTORY_PARTITIONED=true). An existing plain table is left as it is.
+    """
+    tbl = settings.TABLE_NAME
+    if not settings.HISTORY_PARTITIONED:
+        cur.execute(pgsql.SQL("CREATE TABLE IF NOT EXISTS {} ({});").format(
+            pgsql.Identifier(tbl), pgsql.SQL(_COLS),
+        ))
+        return
+
+    kind = _relkind(cur, tbl)
+    if kind == "r":
+        print(f"[DB] ⚠️  '{tbl}' already exists as a plain table — partitioning skipped")
+        return
+    if kind is None:
+        cur.execute(pgsql.SQL(
+            "CREATE TABLE {} ({}) PARTITION BY RANGE (travel_date);"
+        ).format(pgsql.Identifier(tbl), pgsql.SQL(_COLS_PARTITIONED)))
+        cur.execute(pgsql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} (id)").format(
+            pgsql.Identifier(f"{tbl}_id_idx"), pgsql.Identifier(tbl),
+        ))
+
+
+def _m2_history_indexes(cur: psycopg2.extensions.cursor) -> None:
+    """Composite indexes behind the history filters, keyset pagination and route updates."""
+    tbl = settings.TABLE_NAME
+    for suffix, columns in _HISTORY_INDEXES:
+        cur.execute(pgsql.SQL("CREATE INDEX IF NOT EXISTS {} ON {} ({})").format(
+            pgsql.Identifier(f"{tbl}_{suffix}"), pgsql.Identifier(tbl), pgsql.SQL(columns),
+        ))
+
+
+def _m3_vehicle_views(cur: psycopg2.extensions.cursor) -> None:
+    """
+    Per-vehicle views over the history table. A plain table left over from
+    the dual-write layout is renamed to "<vehicle>_legacy" first — its rows
+    were already mirrored into history, so nothing is lost.
+    """
+    for vehicle in settings.VEHICLE_TABLES:
+        if _relkind(cur, vehicle) == "r":
+            legacy = f"{vehicle}_legacy"
+            if _relkind(cur, legacy) is not None:
+                print(f"[DB] ⚠️  '{vehicle}' is still a table and '{legacy}' exists — view skipped")
+                continue
+            cur.execute(pgsql.SQL("ALTER TABLE {} RENAME TO {}").format(
+                pgsql.Identifier(vehicle), pgsql.Identifier(legacy),
+            ))
+            print(f"[DB] 📦 Table '{vehicle}' renamed → '{legacy}'")
+
+        cur.execute(pgsql.SQL(
+            "CREATE OR REPLACE VIEW {} AS SELECT * FROM {} WHERE vehicle = {}"
+        ).format(pgsql.Identifier(vehicle), pgsql.Identifier(settings.TABLE_NAME), pgsql.Literal(vehicle)))
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[psycopg2.extensions.cursor], None]]] = [
+    (1, "history table",   _m1_history_table),
+    (2, "history indexes", _m2_history_indexes),
+    (3, "vehicle views",   _m3_vehicle_views),
+]
+LATEST = MIGRATIONS[-1][0]
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Runner
+# ─────────────────────────────────────────────────────────────────
+def _fingerprint() -> str:
+    raw = "|".join((settings.TABLE_NAME, ",".join(settings.VEHICLE_TABLES), str(settings.HISTORY_PARTITIONED)))
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+def _up_to_date(row: dict | None, fingerprint: str) -> bool:
+    if row is None or row["version"] < LATEST or row["fingerprint"] != fingerprint:
+        return False
+    until = row["partitions_until"]          # None: history is not a partitioned table
+    return not settings.HISTORY_PARTITIONED or until is None or until >= _partition_horizon()
+
+
+def _read(cur: psycopg2.extensions.cursor) -> dict | None:
+    cur.execute(
+        "SELECT version, fingerprint, partitions_until FROM schema_version WHERE scope = %s",
+        (settings.TABLE_NAME,),
+    )
+    return cur.fetchone()
+
+
+def migrate(conn: psycopg2.extensions.connection) -> int:
+    """Bring the schema to LATEST; returns the number of migrations applied (0 on the fast path)."""
+    tbl, fingerprint = settings.TABLE_NAME, _fingerprint()
+
+    # Fast path — one query
+    try:
+        with conn.cursor() as cur:
+            row = _read(cur)
+        conn.rollback()
+        if _up_to_date(row, fingerprint):
+            print(f"[DB] ✔  Schema up to date (v{LATEST}, '{tbl}')")
+            return 0
+    except pgerrors.UndefinedTable:
+        conn.rollback()
+
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_ID,))
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            " scope TEXT PRIMARY KEY, version INT NOT NULL, fingerprint TEXT NOT NULL,"
+            " partitions_until INT, applied_at TIMESTAMP NOT NULL DEFAULT NOW())"
+        )
+        row = _read(cur)                                  # another worker may have finished meanwhile
+    conn.commit()
+    if _up_to_date(row, fingerprint):
+        print(f"[DB] ✔  Schema up to date (v{LATEST}, '{tbl}')")
+        return 0
+
+    start   = row["version"] if row and row["fingerprint"] == fingerprint else 0
+    pending = [m for m in MIGRATIONS if m[0] > start]
+    applied = 0
+    for version, name, apply in pending:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_ID,))
+            apply(cur)
+            _record(cur, version, fingerprint, 0)          # 0 → partitions still to do
+        conn.commit()
+        applied += 1
+        print(f"[DB] 🧱 Migration {version} applied: {name} ('{tbl}')")
+
+    if settings.HISTORY_PARTITIONED:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (_LOCK_ID,))
+            until = _ensure_partitions(cur, tbl) if _relkind(cur, tbl) == "p" else None
+            _record(cur, LATEST, fingerprint, until)
+        conn.commit()
+
+    print(f"[DB] ✅ Schema at v{LATEST} for '{tbl}' ({applied} migration(s) applied)")
+    return applied
+
+
+def _record(cur: psycopg2.extensions.cursor, version: int, fingerprint: str, partitions_until: int | None) -> None:
+    cur.execute(
+        "INSERT INTO schema_version (scope, version, fingerprint, partitions_until, applied_at) "
+        "VALUES (%s, %s, %s, %s, NOW()) "
+        "ON CONFLICT (scope) DO UPDATE SET version = EXCLUDED.version, fingerprint = EXCLUDED.fingerprint, "
+        "partitions_until = EXCLUDED.partitions_until, applied_at = EXCLUDED.applied_at",
+        (settings.TABLE_NAME, version, fingerprint, partitions_until),
+    )
@@ -5,19 +5,35 @@ main.py — FastAPI application factory.
 Startup sequence:
   1. Load .env → Settings
   2. CORSMiddleware (origins from ALLOWED_ORIGINS in .env)
+     + GZipMiddleware for responses ≥ GZIP_MIN_SIZE bytes
   3. startup event → init_db()
-     - CREATE DATABASE Booking  (if not exists)
-     - CREATE TABLE train, bus, flight, car, bike  (if not exist)
-     - CREATE TABLE Travel_history  (if not exists)
-  4. Mount /api router
-  5. Expose /health endpoint
+     - schema already current → one schema_version query, nothing else
+     - otherwise CREATE DATABASE Booking (if missing) and the pending
+       migrations: Travel_history table, its indexes, the train / bus /
+       flight / car / bike views over it
+     then llm_clients.warm_up() → provider clients + first keep-alive connection
+     (the city / station resolver is already built — agents/cities.py loads
+      app/data/cities.csv when it is imported)
+  4. Mount /api routers (chat, history)
+  5. Expose /health endpoint (includes DB pool saturation / wait stats)
+  6. Expose /metrics endpoint (per-stage latency histograms)
+  7. shutdown event → llm_clients.aclose(), llm_router.shutdown(), close_pool()
 """
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.core import metrics
 from app.core.config import settings
-from app.database.db import init_db
-from app.routers import chat
+from app.database.db import init_db, close_pool, pool_stats
+from app.agents import cities, history_cache, llm_cache, llm_clients, llm_router, intent_parser
+from app.agents.booking_agent import llm_setup
+from app.routers import chat, history
+
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(message)s")
 
 app = FastAPI(
     title       = "AI Travel Booking Agent API",
@@ -40,6 +56,11 @@ app.add_middleware(
     allow_headers     = ["*"],
 )
 
+# Gzip (large history pages / batch results) — /api/chat/stream opts out
+# with Content-Encoding: identity (see benchmarks/check_stream_gzip.py)
+if settings.GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+
 # Startup
 @app.on_event("startup")
 async def on_startup() -> None:
@@ -48,12 +69,24 @@ async def on_startup() -> None:
     settings.print_summary()
     print("="*60)
     init_db()
+    c = cities.resolver().stats()
+    print(f"[APP] 🗺️  City resolver: {c['cities']} cities / {c['aliases']} codes+names ({c['load_ms']} ms)")
+    await llm_clients.warm_up(*llm_setup())
     print("[APP] ✅ Application ready → http://0.0.0.0:8000")
     print("[APP] 📚 Swagger UI      → http://0.0.0.0:8000/docs")
     print("="*60 + "\n")
 
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    print("[APP] 🛑 Shutting down ...")
+    await llm_clients.aclose()
+    llm_router.shutdown()
+    close_pool()
+
 # Routers
 app.include_router(chat.router, prefix="/api", tags=["Chat"])
+app.include_router(history.router, prefix="/api", tags=["History"])
 
 # Health
 @app.get("/health", tags=["Health"])
@@ -66,4 +99,27 @@ async def health() -> dict:
         "database":      settings.DB_NAME,
         "history_table": settings.TABLE_NAME,
         "vehicles":      settings.VEHICLE_TABLES,
-    }
\ No newline at end of file
+        "db_pool":       pool_stats(),
+        "intent_parser": intent_parser.stats(),
+        "llm_cache":     llm_cache.stats(),
+        "llm_router":    llm_router.stats(),
+        "history_cache": history_cache.stats(),
+    }
+
+
+# Metrics
+@app.get("/metrics", tags=["Health"])
+async def metrics_endpoint(format: str = "prometheus"):
+    """Per-stage latency histograms — Prometheus text, or ?format=json."""
+    if format == "json":
+        return JSONResponse({
+            "stages":        metrics.snapshot(),
+            "db_pool":       pool_stats(),
+            "intent_parser": intent_parser.stats(),
+            "llm_cache":     llm_cache.stats(),
+            "llm_tokens":    metrics.token_snapshot(),
+            "llm_router":    llm_router.stats(),
+            "cities":        cities.resolver().stats(),
+            "history_cache": history_cache.stats(),
+        })
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,12 +1,31 @@
 # routers/chat.py
 
 """
-routers/chat.py — POST /api/chat
+routers/chat.py — POST /api/chat, /api/chat/stream, /api/chat/batch
+
+The handler is async end to end: the LLM call is awaited and DB work runs
+in a worker thread, so concurrent chats don't queue behind each other.
+Per-stage timings come back in the Server-Timing response header.
+
+/chat/stream runs the same pipeline as Server-Sent Events — intent,
+stage, rows and message events as each stage finishes, then a final
+"done" event carrying the same body /chat would have returned.
+
+/chat/batch takes many messages (e.g. a spreadsheet replay): LLM parsing
+runs concurrently under BATCH_LLM_CONCURRENCY and the bookings are
+written in shared transactions.
 """
-from fastapi import APIRouter
-from app.schemas.chat import ChatRequest, ChatResponse
-from app.agents.booking_agent import run_agent
+import json
+import logging
+from typing import AsyncIterator
 
+from fastapi import APIRouter, Response
+from fastapi.responses import StreamingResponse
+from app.core import metrics
+from app.schemas.chat import BatchChatRequest, BatchChatResponse, ChatRequest, ChatResponse
+from app.agents.booking_agent import run_agent_async, run_batch_async, stream_agent
+
+log    = logging.getLogger(__name__)
 router = APIRouter()
 
 
@@ -19,16 +38,78 @@ router = APIRouter()
         "The agent understands greetings, booking, history, updates, and cancellations."
     ),
 )
-async def chat(request: ChatRequest) -> ChatResponse:
-    print(f"\n[Router] POST /api/chat | message={request.message!r}")
-    result = run_agent(request.message)
+async def chat(request: ChatRequest, response: Response) -> ChatResponse:
+    log.debug(f"[Router] POST /api/chat | message={request.message!r}")
+    with metrics.request_trace() as spans:
+        result = await run_agent_async(request.message)
+    response.headers["Server-Timing"] = metrics.server_timing(spans)
+    return _chat_response(result)
+
 
+def _chat_response(result: dict) -> ChatResponse:
     result.setdefault("tool_called",  None)
     result.setdefault("arguments",    None)
     result.setdefault("booking",      None)
     result.setdefault("bookings",     None)
     result.setdefault("records",      None)
+    result.setdefault("next_cursor",  None)
+    result.setdefault("updated_ids",  None)
     result.setdefault("raw_response", None)
 
-    print(f"[Router] Response: success={result['success']}")
-    return ChatResponse(**result)
\ No newline at end of file
+    log.debug(f"[Router] Response: success={result['success']}")
+    return ChatResponse(**result)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _chat_events(message: str) -> AsyncIterator[str]:
+    with metrics.request_trace() as spans:
+        async for event, data in stream_agent(message):
+            if event == "result":
+                done = _chat_response(data).model_dump()
+            else:
+                yield _sse(event, data)
+    # request_total is only known once the trace closes
+    yield _sse("done", {**done, "server_timing": metrics.server_timing(spans)})
+
+
+@router.post(
+    "/chat/stream",
+    summary="Chat with AI Booking Agent (Server-Sent Events)",
+    description=(
+        "Same as /chat, streamed: intent → stage → rows → message events "
+        "as each stage finishes, then a final 'done' event with the full response."
+    ),
+)
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    log.debug(f"[Router] POST /api/chat/stream | message={request.message!r}")
+    return StreamingResponse(
+        _chat_events(request.message),
+        media_type="text/event-stream",
+        # Content-Encoding set → GZipMiddleware passes the stream through; gzip
+        # would hold every small frame in zlib until the stream ends.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"},
+    )
+
+
+@router.post(
+    "/chat/batch",
+    response_model=BatchChatResponse,
+    summary="Run many chat messages in one call",
+    description=(
+        "Each message goes through the same pipeline as /chat. LLM calls run "
+        "concurrently (capped), bookings are written in shared transactions; "
+        "results come back in message order with aggregate timing."
+    ),
+)
+async def chat_batch(request: BatchChatRequest, response: Response) -> BatchChatResponse:
+    log.debug(f"[Router] POST /api/chat/batch | {len(request.messages)} message(s)")
+    with metrics.request_trace() as spans:
+        batch = await run_batch_async(request.messages)
+    response.headers["Server-Timing"] = metrics.server_timing(spans)
+    return BatchChatResponse(
+        results=[_chat_response(r) for r in batch["results"]],
+        timing=batch["timing"],
+    )
@@ -0,0 +1,68 @@
+# routers/history.py
+
+"""
+routers/history.py — GET /api/history
+
+Direct, paginated read of the travel history (no LLM involved).
+Pass next_cursor from one response as ?cursor= to fetch the next page.
+?shape=columnar returns column names once plus one value array per row
+(no from/to aliases) — about half the bytes of the default row objects;
+responses are gzip-compressed when the client sends Accept-Encoding: gzip.
+
+GET /api/history/export streams the whole (filtered) history as NDJSON or
+CSV from a server-side cursor — no page size, flat memory.
+"""
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.agents.tools import EXPORT_FORMATS, HISTORY_SHAPES, export_travel_history, get_travel_history
+from app.core.config import settings
+
+router = APIRouter()
+
+
+@router.get(
+    "/history",
+    summary="Browse travel history (keyset-paginated)",
+)
+async def history(
+    vehicle:    str | None = Query(None, description="train | bus | flight | car | bike"),
+    start_date: str | None = Query(None, description="YYYY-MM-DD (inclusive)"),
+    end_date:   str | None = Query(None, description="YYYY-MM-DD (inclusive)"),
+    limit:      int | None = Query(None, ge=1, description="page size (capped by HISTORY_PAGE_MAX)"),
+    cursor:     str | None = Query(None, description="next_cursor from the previous page"),
+    shape:      str        = Query("rows", description=" | ".join(HISTORY_SHAPES)),
+) -> dict:
+    try:
+        return await asyncio.to_thread(
+            get_travel_history, vehicle, start_date, end_date, limit, cursor, shape,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+@router.get(
+    "/history/export",
+    summary="Export travel history (streamed NDJSON / CSV)",
+)
+async def export_history(
+    vehicle:    str | None = Query(None, description="train | bus | flight | car | bike"),
+    start_date: str | None = Query(None, description="YYYY-MM-DD (inclusive)"),
+    end_date:   str | None = Query(None, description="YYYY-MM-DD (inclusive)"),
+    fmt:        str        = Query("ndjson", alias="format", description=" | ".join(EXPORT_FORMATS)),
+) -> StreamingResponse:
+    try:
+        chunks = export_travel_history(vehicle, start_date, end_date, fmt)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    # Sync generator → Starlette iterates it in the threadpool, so the DB reads never block the loop
+    return StreamingResponse(
+        chunks,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{settings.TABLE_NAME}.{fmt}"'},
+    )
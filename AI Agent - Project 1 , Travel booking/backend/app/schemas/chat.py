@@ -4,6 +4,8 @@ schemas/chat.py — Pydantic request / response models.
 from __future__ import annotations
 from pydantic import BaseModel, field_validator
 
+from app.core.config import settings
+
 
 class ChatRequest(BaseModel):
     message: str
@@ -24,6 +26,29 @@ class ChatResponse(BaseModel):
     booking:      dict       | None = None
     bookings:     list[dict] | None = None
     records:      list[dict] | None = None
+    next_cursor:  str        | None = None
+    updated_ids:  list[int]  | None = None
     raw_response: str        | None = None
 
-    model_config = {"arbitrary_types_allowed": True}
\ No newline at end of file
+    model_config = {"arbitrary_types_allowed": True}
+
+
+class BatchChatRequest(BaseModel):
+    messages: list[str]
+
+    @field_validator("messages")
+    @classmethod
+    def check_messages(cls, v: list[str]) -> list[str]:
+        if not v:
+            raise ValueError("messages must not be empty")
+        if len(v) > settings.BATCH_MAX_MESSAGES:
+            raise ValueError(f"at most {settings.BATCH_MAX_MESSAGES} messages per batch")
+        blank = [i for i, m in enumerate(v) if not m.strip()]
+        if blank:
+            raise ValueError(f"messages must not be blank (index {blank[0]})")
+        return [m.strip() for m in v]
+
+
+class BatchChatResponse(BaseModel):
+    results: list[ChatResponse]
+    timing:  dict
@@ -0,0 +1,91 @@
+"""
+benchmarks/bench_booking_writes.py
+==================================
+Compare the old booking write path (one execute_write per vehicle table +
+one per history row, each its own commit) against the single-statement
+_insert_bookings() used by create_booking / create_multi_booking.
+
+The vehicle names are views over the history table now, so the legacy
+path's vehicle INSERTs land in history too — it still pays the old cost.
+
+Needs the same .env / PostgreSQL as the app. Every row it inserts is
+deleted again at the end.
+
+Usage (from backend/):
+    python -m benchmarks.bench_booking_writes --iterations 200 --vehicles 3
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.core.config import settings
+from app.database.db import init_db, execute_write, close_pool
+from app.agents import tools
+
+
+def _legacy_insert(rows: list[tuple]) -> list[int]:
+    """The pre-transaction path: 2 statements + 2 commits per vehicle."""
+    ids = []
+    for v, src, dst, travel_date in rows:
+        params = (v, src, dst, travel_date)
+        ids.append(execute_write(
+            f"INSERT INTO {v} (vehicle, from_loc, to_loc, travel_date) "
+            f"VALUES (%s, %s, %s, %s) RETURNING id", params,
+        ))
+        execute_write(
+            f"INSERT INTO {settings.TABLE_NAME} (vehicle, from_loc, to_loc, travel_date) "
+            f"VALUES (%s, %s, %s, %s) RETURNING id", params,
+        )
+    return ids
+
+
+def _batched_insert(rows: list[tuple]) -> list[int]:
+    return [b["id"] for b in tools._insert_bookings(rows)]
+
+
+def _run(label: str, fn, rows: list[tuple], iterations: int) -> list[float]:
+    timings = []
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn(rows)
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{label:<10} mean={statistics.mean(timings):7.2f} ms  "
+        f"p50={statistics.median(timings):7.2f} ms  p95={p95:7.2f} ms"
+    )
+    return timings
+
+
+def _cleanup(marker: str) -> None:
+    for tbl in [*settings.VEHICLE_TABLES, settings.TABLE_NAME]:
+        execute_write(f"DELETE FROM {tbl} WHERE from_loc = %s", (marker,))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--vehicles",   type=int, default=3,
+                        help=f"vehicles per booking (max {len(settings.VEHICLE_TABLES)})")
+    args = parser.parse_args()
+
+    init_db()
+    marker   = "Bench-Origin"
+    vehicles = settings.VEHICLE_TABLES[: max(1, min(args.vehicles, len(settings.VEHICLE_TABLES)))]
+    rows     = [(v, marker, "Bench-Destination", "2030-01-01") for v in vehicles]
+
+    print(f"\n{args.iterations} bookings × {len(rows)} vehicle(s) {vehicles}\n")
+    try:
+        legacy  = _run("legacy", _legacy_insert, rows, args.iterations)
+        batched = _run("batched", _batched_insert, rows, args.iterations)
+        print(f"\nspeed-up (mean): {statistics.mean(legacy) / statistics.mean(batched):.2f}×")
+    finally:
+        _cleanup(marker)
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_chat_concurrency.py
+====================================
+Fire POST /api/chat at a running server with 1, 10 and 100 chats in
+flight and report requests/second plus p50/p95 latency per level.
+
+With the old blocking handler, throughput stayed flat as concurrency went
+up (every request queued behind the one holding the event loop); the async
+pipeline should scale until the LLM provider or the DB pool saturates.
+
+Start the server first (python run.py), then from backend/:
+    python -m benchmarks.bench_chat_concurrency --requests 200
+    python -m benchmarks.bench_chat_concurrency --message "show my bus history"
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import httpx
+
+DEFAULT_MESSAGES = [
+    "hello",
+    "show my travel history",
+    "show my bus history",
+]
+
+
+async def _worker(
+    client:    httpx.AsyncClient,
+    messages:  itertools.cycle,
+    remaining: list[int],
+    latencies: list[float],
+    errors:    list[str],
+) -> None:
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        t0 = time.perf_counter()
+        try:
+            r = await client.post("/api/chat", json={"message": next(messages)})
+            r.raise_for_status()
+            latencies.append((time.perf_counter() - t0) * 1000)
+        except Exception as exc:
+            errors.append(f"{type(exc).__name__}: {exc}")
+
+
+async def _run_level(base_url: str, concurrency: int, total: int, messages: list[str]) -> None:
+    latencies: list[float] = []
+    errors:    list[str]   = []
+    remaining = [total]
+    cycle     = itertools.cycle(messages)
+    limits    = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120.0, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(
+            _worker(client, cycle, remaining, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - t0
+
+    latencies.sort()
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)] if latencies else 0.0
+    print(
+        f"concurrency={concurrency:>3}  ok={len(latencies):>4}  err={len(errors):>3}  "
+        f"rps={len(latencies) / elapsed:7.2f}  "
+        f"p50={statistics.median(latencies) if latencies else 0:8.1f} ms  p95={p95:8.1f} ms"
+    )
+    if errors:
+        print(f"               first error: {errors[0]}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrency benchmark for /api/chat")
+    parser.add_argument("--url",         default="http://localhost:8000")
+    parser.add_argument("--requests",    type=int, default=100, help="requests per concurrency level")
+    parser.add_argument("--levels",      default="1,10,100")
+    parser.add_argument("--message",     action="append", help="message(s) to send (repeatable)")
+    args = parser.parse_args()
+
+    messages = args.message or DEFAULT_MESSAGES
+    print(f"\n{args.url}/api/chat  ×{args.requests} per level  messages={messages}\n")
+    for level in (int(x) for x in args.levels.split(",")):
+        await _run_level(args.url, level, args.requests, messages)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
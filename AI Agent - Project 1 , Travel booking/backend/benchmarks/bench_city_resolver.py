@@ -0,0 +1,60 @@
+"""
+benchmarks/bench_city_resolver.py
+=================================
+Lookup cost of the city / station resolver (app/agents/cities.py).
+
+Times each kind of lookup without the memo (CityResolver._resolve /
+_suggest — what a first sighting of a string costs) and through it
+(resolve / suggest — every repeat). Typos only ever get a suggestion (a
+prompt hint), never a resolved city. No database or LLM needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_city_resolver --iterations 20000
+    python -m benchmarks.bench_city_resolver --data path/to/stations.csv
+"""
+from __future__ import annotations
+
+import argparse
+import time
+
+from app.agents import cities
+
+_CASES = [                          # (label, input, suggestion lookup?)
+    ("code",         "bbsr",        False),
+    ("exact name",   "bhubaneswar", False),
+    ("prefix",       "bhubanes",    False),
+    ("typo (1)",     "hydrabad",    True),
+    ("typo (2)",     "trivandram",  True),
+    ("swap",         "pnue",        True),
+    ("not in CSV",   "manali",      True),
+    ("unknown",      "springfield", True),
+]
+
+
+def _us(fn, arg: str, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn(arg)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--data",       default=None, help="cities CSV (default: settings.CITY_DATA_FILE)")
+    args = parser.parse_args()
+
+    res = cities.load(args.data) if args.data else cities.resolver()
+    s   = res.stats()
+    print(f"\n{s['cities']} cities, {s['aliases']} aliases, {s['fuzzy_keys']} fuzzy keys — loaded in {s['load_ms']} ms")
+    print(f"{args.iterations} lookups each, µs per lookup\n")
+    print(f"{'case':<14}{'input':<16}{'result':<22}{'uncached':>10}{'memoised':>10}")
+    for label, text, suggest in _CASES:
+        uncached, memoised = (res._suggest, res.suggest) if suggest else (res._resolve, res.resolve)
+        cold = _us(uncached, text, args.iterations)
+        warm = _us(memoised, text, args.iterations)
+        print(f"{label:<14}{text:<16}{str(memoised(text)):<22}{cold:>10.2f}{warm:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+benchmarks/bench_history_shapes.py
+==================================
+Row objects vs the columnar history shape (GET /api/history?shape=columnar):
+time to build each shape from cursor rows, JSON size, and gzip size.
+
+Uses synthetic rows shaped like a RealDictCursor page of the history
+table — no database or LLM needed.
+
+Usage (from backend/):
+    python -m benchmarks.bench_history_shapes --rows 500 --rounds 200
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from app.agents import tools
+
+_CITIES = ["Bhubaneswar", "Howrah", "Visakhapatnam", "Chennai", "Hyderabad", "Pune", "Delhi", "Mumbai"]
+
+
+def _page(n: int) -> list[dict]:
+    rnd, now = random.Random(7), datetime(2030, 1, 1, 9, 0)
+    return [
+        {
+            "id":          100_000 - i,
+            "vehicle":     rnd.choice(tools.settings.VEHICLE_TABLES),
+            "from_loc":    rnd.choice(_CITIES),
+            "to_loc":      rnd.choice(_CITIES),
+            "travel_date": date(2030, 1, 1) + timedelta(days=rnd.randrange(365)) if rnd.random() > 0.05 else None,
+            "booked_at":   now - timedelta(minutes=7 * i),
+            "status":      "confirmed",
+        }
+        for i in range(n)
+    ]
+
+
+def _build(shape: str, rows: int, rounds: int) -> tuple[float, bytes]:
+    pages = [_page(rows) for _ in range(rounds)]        # _serialize works in place — fresh page per round
+    t0 = time.perf_counter()
+    for page in pages:
+        if shape == "columnar":
+            columns, values = tools._columnar(page)
+            body = {"columns": columns, "rows": values}
+        else:
+            body = {"records": tools._serialize(page)}
+    ms = (time.perf_counter() - t0) * 1000 / rounds
+    return ms, json.dumps(body).encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--rows",   type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"\n{args.rows} rows per page, {args.rounds} round(s)\n")
+    print(f"{'shape':<10}{'build ms':>10}{'json KB':>10}{'gzip KB':>10}")
+    for shape in tools.HISTORY_SHAPES:
+        ms, raw = _build(shape, args.rows, args.rounds)
+        print(f"{shape:<10}{ms:>10.3f}{len(raw) / 1024:>10.1f}{len(gzip.compress(raw)) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
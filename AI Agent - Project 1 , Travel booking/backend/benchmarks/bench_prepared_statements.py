@@ -0,0 +1,123 @@
+"""
+benchmarks/bench_prepared_statements.py
+=======================================
+Planning time saved by the prepared-statement registry, per tool.
+
+For each tool's statement shape it runs EXPLAIN (SUMMARY, FORMAT JSON) —
+which plans without executing — once as plain SQL and once as
+EXECUTE of the registered prepared statement, and compares the
+"Planning Time" Postgres reports. It then times the real round trip both
+ways (writes run inside a transaction that is rolled back).
+
+Needs the same .env / PostgreSQL as the app; leaves no rows behind.
+
+Usage (from backend/):
+    python -m benchmarks.bench_prepared_statements --iterations 500
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.core.config import settings
+from app.database.db import init_db, pooled_connection, close_pool, _statement
+
+
+def _shapes() -> list[tuple[str, tuple, str, tuple]]:
+    """(label, key, sql, params) — the statements tools.py sends, one per tool."""
+    h, v = settings.TABLE_NAME, settings.VEHICLE_TABLES[0]
+    return [
+        (
+            "get_travel_history",
+            ("get_travel_history", h, ("vehicle = %s", "travel_date BETWEEN %s AND %s")),
+            f"SELECT * FROM {h} WHERE vehicle = %s AND travel_date BETWEEN %s AND %s "
+            f"ORDER BY booked_at DESC, id DESC LIMIT %s",
+            (v, "2030-01-01", "2030-12-31", 101),
+        ),
+        (
+            "create_booking",
+            ("create_booking", h, 1),
+            f"WITH h AS (INSERT INTO {h} (vehicle, from_loc, to_loc, travel_date) "
+            f"VALUES (%s, %s, %s, %s::date) RETURNING id)\n"
+            f"SELECT id FROM h ORDER BY id",
+            (v, "Bench-Origin", "Bench-Destination", "2030-01-01"),
+        ),
+        (
+            "update_booking_by_id",
+            ("update_booking_by_id", h, ("status",)),
+            f"UPDATE {h} SET status = %s WHERE id = %s",
+            ("confirmed", -1),
+        ),
+        (
+            "update_booking_by_query",
+            ("update_booking_by_query", h, ("travel_date",), ("vehicle = %s", "LOWER(from_loc) = LOWER(%s)")),
+            f"WITH h AS (UPDATE {h} SET travel_date = %s "
+            f"WHERE vehicle = %s AND LOWER(from_loc) = LOWER(%s) RETURNING id, booked_at)\n"
+            f"SELECT id FROM h ORDER BY booked_at DESC, id",
+            ("2030-02-02", v, "Bench-Nowhere"),
+        ),
+        (
+            "delete_booking",
+            ("delete_booking", h),
+            f"DELETE FROM {h} WHERE id = %s",
+            (-1,),
+        ),
+    ]
+
+
+def _planning_ms(cur, sql_str: str, params: tuple) -> float:
+    cur.execute("EXPLAIN (SUMMARY, FORMAT JSON) " + sql_str, params)
+    return float(cur.fetchone()["QUERY PLAN"][0]["Planning Time"])
+
+
+def _round_trip_ms(conn, cur, sql_str: str, params: tuple) -> float:
+    t0 = time.perf_counter()
+    cur.execute(sql_str, params)
+    if cur.description:
+        cur.fetchall()
+    elapsed = (time.perf_counter() - t0) * 1000
+    conn.rollback()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    init_db()
+    print(f"\n{args.iterations} iteration(s) per tool — mean ms, plain → prepared (saved)\n")
+    print(f"{'tool':<26}{'planning':>24}{'round trip':>26}")
+    try:
+        with pooled_connection() as conn, conn.cursor() as cur:
+            for label, key, sql_str, params in _shapes():
+                stmt = _statement(key, sql_str)
+                cur.execute("DEALLOCATE ALL")
+                conn.prepared.clear()
+                cur.execute(stmt.prepare_sql)
+                conn.commit()
+
+                plan_plain, plan_prep, trip_plain, trip_prep = [], [], [], []
+                for _ in range(args.iterations):
+                    plan_plain.append(_planning_ms(cur, sql_str, params))
+                    plan_prep.append(_planning_ms(cur, stmt.execute_sql, params))
+                    conn.rollback()
+                    trip_plain.append(_round_trip_ms(conn, cur, sql_str, params))
+                    trip_prep.append(_round_trip_ms(conn, cur, stmt.execute_sql, params))
+
+                pp, pr = statistics.mean(plan_plain), statistics.mean(plan_prep)
+                tp, tr = statistics.mean(trip_plain), statistics.mean(trip_prep)
+                print(
+                    f"{label:<26}{pp:9.3f} → {pr:7.3f} ({pp - pr:+6.3f})"
+                    f"{tp:10.3f} → {tr:7.3f} ({tp - tr:+6.3f})"
+                )
+            cur.execute("DEALLOCATE ALL")
+            conn.prepared.clear()
+            conn.commit()
+    finally:
+        close_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+benchmarks/bench_tool_modes.py
+==============================
+JSON-text mode vs native function calling (LLM_TOOL_MODE), same messages,
+same provider: latency, prompt / completion tokens per call, answers that
+could not be used, and how often both modes picked the same tool.
+
+Calls the provider directly (one attempt per message, no router, no LLM
+cache, no database) so only the LLM step is measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tool_modes --rounds 5                    # provider from .env
+    python -m benchmarks.bench_tool_modes --provider gemini
+    ENV_FILE=benchmarks/bench.env python -m benchmarks.bench_tool_modes --fake   # offline
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from app.agents import booking_agent
+from app.core import metrics
+from app.core.config import settings
+
+MESSAGES = [
+    "I need a train ticket from bbsr to vizag on 2030-03-14 please",
+    "book bus and car from Howrah to Bhubaneswar on 2030-04-02",
+    "Plan my trip: bus from hwh to bbsr on 2030-03-27 and return by car on 2030-04-03",
+    "which trips did I take between 2030-01-01 and 2030-02-28?",
+    "show my last 5 flight trips",
+    "please change my bus from hwh to bbsr on 2030-03-27 to 2030-03-29",
+    "change booking 12 destination to Chennai, it's a train",
+    "cancel flight booking 42",
+]
+
+
+def _run_mode(mode: str, provider: str, rounds: int) -> dict:
+    settings.LLM_TOOL_MODE = mode
+    before = metrics.token_snapshot().get(provider, {})
+    ms: list[float] = []
+    tools: list[str | None] = []
+    failures = 0
+    for _ in range(rounds):
+        for message in MESSAGES:
+            t0 = time.perf_counter()
+            try:
+                tools.append(booking_agent._llm_attempt(provider, message).get("tool"))
+            except Exception as exc:
+                failures += 1
+                tools.append(None)
+                print(f"  [{mode}] ❌ {message[:40]!r}: {type(exc).__name__}: {exc}")
+            ms.append((time.perf_counter() - t0) * 1000)
+    after = metrics.token_snapshot().get(provider, {})
+    calls = max(1, after.get("calls", 0) - before.get("calls", 0))
+    ms.sort()
+    return {
+        "tools":      tools,
+        "failures":   failures,
+        "p50":        statistics.median(ms),
+        "p95":        ms[min(len(ms) - 1, int(round(0.95 * len(ms))) - 1)],
+        "prompt":     (after.get("prompt", 0) - before.get("prompt", 0)) / calls,
+        "cached":     (after.get("cached", 0) - before.get("cached", 0)) / calls,
+        "completion": (after.get("completion", 0) - before.get("completion", 0)) / calls,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--provider",   default=settings.LLM_PROVIDER, choices=["openai", "gemini"])
+    parser.add_argument("--rounds",     type=int,   default=3)
+    parser.add_argument("--fake",       action="store_true", help="start benchmarks/fake_llm.py on :9100 (bench.env)")
+    parser.add_argument("--latency-ms", type=float, default=300, help="fake LLM latency with --fake")
+    args = parser.parse_args()
+
+    fake = None
+    if args.fake:
+        from benchmarks import fake_llm
+        fake = fake_llm.serve(9100, args.latency_ms, 0)
+    try:
+        print(f"\n{args.provider}: {len(MESSAGES)} messages × {args.rounds} round(s) per mode\n")
+        results = {mode: _run_mode(mode, args.provider, args.rounds) for mode in ("json", "native")}
+    finally:
+        if fake is not None:
+            fake.shutdown()
+
+    print(f"\n{'mode':<8}{'p50 ms':>9}{'p95 ms':>9}{'prompt tok':>12}{'cached':>8}{'compl. tok':>12}{'unusable':>10}")
+    for mode, r in results.items():
+        print(
+            f"{mode:<8}{r['p50']:>9.0f}{r['p95']:>9.0f}{r['prompt']:>12.0f}"
+            f"{r['cached']:>8.0f}{r['completion']:>12.1f}{r['failures']:>10}"
+        )
+    pairs = list(zip(results["json"]["tools"], results["native"]["tools"]))
+    same  = sum(1 for a, b in pairs if a is not None and a == b)
+    print(f"\nsame tool chosen by both modes: {same}/{len(pairs)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+benchmarks/check_stream_gzip.py
+===============================
+Checks that /api/chat/stream still streams behind GZipMiddleware: a client
+sending "Accept-Encoding: gzip" (every browser) must get the first SSE
+event while the response is still open, uncompressed — not one gzip blob
+at the end.
+
+Drives the ASGI app directly with a greeting ("hi"), so no server,
+database or LLM is needed. Exits 1 on failure.
+
+Usage (from backend/):
+    python -m benchmarks.check_stream_gzip
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+
+from app.main import app
+
+
+async def _messages(message: str) -> list[dict]:
+    body  = json.dumps({"message": message}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/api/chat/stream",
+        "raw_path": b"/api/chat/stream", "query_string": b"", "root_path": "",
+        "server": ("check", 80), "client": ("check", 1),
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"accept-encoding", b"gzip, deflate, br"),
+        ],
+    }
+    sent:   list[dict] = []
+    queued: list[dict] = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive() -> dict:
+        if queued:
+            return queued.pop()
+        await asyncio.Event().wait()            # client stays connected
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    await app(scope, receive, send)
+    return sent
+
+
+def main() -> None:
+    sent    = asyncio.run(_messages("hi"))
+    headers = {k.decode().lower(): v.decode() for k, v in sent[0]["headers"]}
+    bodies  = [m for m in sent if m["type"] == "http.response.body" and m.get("body")]
+    first   = bodies[0] if bodies else {}
+
+    checks = {
+        "not gzip-encoded":            headers.get("content-encoding") != "gzip",
+        "first chunk is an SSE event": first.get("body", b"").startswith(b"event: "),
+        "sent before the stream ends": bool(first.get("more_body")),
+        "more than one chunk":         len(bodies) > 1,
+    }
+    print(f"\ncontent-encoding: {headers.get('content-encoding')!r}, {len(bodies)} chunk(s)")
+    print(f"first chunk: {first.get('body', b'')[:60]!r}\n")
+    for name, ok in checks.items():
+        print(f"  {'✅' if ok else '❌'} {name}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
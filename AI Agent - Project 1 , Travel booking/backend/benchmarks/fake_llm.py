@@ -0,0 +1,218 @@
+"""
+benchmarks/fake_llm.py
+======================
+Local stand-in for the OpenAI chat-completions API — no key, no cost.
+
+Answers POST /v1/chat/completions with the tool-call JSON the real model
+would return for the load-test messages (benchmarks/load_test.py), after
+a configurable latency. Good enough to drive the full agent pipeline;
+not a language model — it reads cities, vehicles, ids and YYYY-MM-DD
+dates out of the message by token matching.
+
+Point the app at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1
+(benchmarks/bench.env already does).
+
+Requests that carry "tools" (LLM_TOOL_MODE=native) get the same answer
+as a function call in message.tool_calls. Token counts are estimates
+(characters / 4, tool schemas included) — useful for comparing modes,
+not for billing.
+
+Usage (from backend/):
+    python -m benchmarks.fake_llm --port 9100 --latency-ms 400 --jitter-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.agents.cities import CITY_MAP
+
+_VEHICLES = {"train", "bus", "flight", "car", "bike"}
+_MAX_CITY_WORDS = max(len(k.split()) for k in CITY_MAP)
+
+
+# ─────────────────────────────────────────────────────────────────
+#  "Model" — message → tool call
+# ─────────────────────────────────────────────────────────────────
+def _tokens(text: str) -> list[str]:
+    cleaned = text.lower()
+    for ch in ",.!?;:()\"'#":
+        cleaned = cleaned.replace(ch, " ")
+    return cleaned.split()
+
+
+def _is_date(token: str) -> bool:
+    parts = token.split("-")
+    return len(parts) == 3 and all(p.isdigit() for p in parts) and len(parts[0]) == 4
+
+
+def _scan(message: str) -> dict:
+    tokens = _tokens(message)
+    found  = {"cities": [], "vehicles": [], "dates": [], "ids": [], "words": set(tokens)}
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_CITY_WORDS, len(tokens) - i), 0, -1):
+            city = CITY_MAP.get(" ".join(tokens[i:i + n]))
+            if city:
+                found["cities"].append(city)
+                i += n
+                break
+        else:
+            t = tokens[i]
+            v = t[:-1] if t.endswith("s") and t[:-1] in _VEHICLES else t
+            if v in _VEHICLES:
+                found["vehicles"].append(v)
+            elif _is_date(t):
+                found["dates"].append(t)
+            elif t.isdigit():
+                found["ids"].append(int(t))
+            i += 1
+    return found
+
+
+def respond(message: str) -> dict:
+    """Tool call for one user message (shapes follow SYSTEM_PROMPT)."""
+    f        = _scan(message)
+    words    = f["words"]
+    cities   = f["cities"]
+    vehicles = f["vehicles"] or ["bus"]
+    dates    = f["dates"]
+
+    if words & {"cancel", "delete", "remove"}:
+        return {"tool": "delete_booking", "arguments": {
+            "booking_id": f["ids"][0] if f["ids"] else 0, "vehicle": f["vehicles"][0] if f["vehicles"] else None,
+        }}
+
+    if words & {"history", "trips", "travelled", "traveled"}:
+        return {"tool": "get_travel_history", "arguments": {
+            "vehicle":    f["vehicles"][0] if f["vehicles"] else None,
+            "start_date": dates[0] if dates else None,
+            "end_date":   dates[1] if len(dates) > 1 else None,
+            "limit":      f["ids"][0] if f["ids"] and "last" in words else None,
+        }}
+
+    if words & {"change", "move", "reschedule", "update"}:
+        return {"tool": "update_booking_by_query", "arguments": {
+            "vehicle":      vehicles[0],
+            "source":       cities[0] if cities else None,
+            "destination":  cities[1] if len(cities) > 1 else None,
+            "current_date": dates[0] if dates else None,
+            "updates":      [{"field": "travel_date", "value": dates[-1]}] if len(dates) > 1
+                            else [{"field": "status", "value": "rescheduled"}],
+        }}
+
+    if "return" in words and len(cities) >= 2 and len(dates) >= 2:
+        back = vehicles[1] if len(vehicles) > 1 else vehicles[0]
+        return {"tool": "create_multi_booking", "arguments": {"bookings": [
+            {"vehicle": vehicles[0], "source": cities[0], "destination": cities[1], "date": dates[0]},
+            {"vehicle": back,        "source": cities[1], "destination": cities[0], "date": dates[1]},
+        ]}}
+
+    return {"tool": "create_booking", "arguments": {
+        "vehicles":    vehicles,
+        "source":      cities[0] if cities else "New Delhi",
+        "destination": cities[1] if len(cities) > 1 else "Mumbai",
+        "date":        dates[0] if dates else None,
+    }}
+
+
+# ─────────────────────────────────────────────────────────────────
+#  HTTP
+# ─────────────────────────────────────────────────────────────────
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"          # keep-alive, like the real API
+    latency_s: float = 0.4
+    jitter_s:  float = 0.0
+    served:    int   = 0
+    _lock = threading.Lock()
+
+    def _send(self, status: int, body: dict) -> None:
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self) -> None:                                   # warm-up: models.retrieve
+        model = self.path.rstrip("/").rsplit("/", 1)[-1]
+        self._send(200, {"id": model, "object": "model", "created": 0, "owned_by": "fake-llm"})
+
+    def do_POST(self) -> None:
+        if not self.path.endswith("/chat/completions"):
+            self._send(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        message = next((m["content"] for m in reversed(request.get("messages", [])) if m["role"] == "user"), "")
+        call    = respond(message)
+        if request.get("tools"):
+            content = json.dumps(call["arguments"])
+            reply   = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_fake_{self.served}", "type": "function",
+                "function": {"name": call["tool"], "arguments": content},
+            }]}
+            finish  = "tool_calls"
+        else:
+            content = json.dumps(call)
+            reply   = {"role": "assistant", "content": content}
+            finish  = "stop"
+
+        time.sleep(max(0.0, self.latency_s + random.uniform(-self.jitter_s, self.jitter_s)))
+        with self._lock:
+            type(self).served += 1
+        prompt_chars  = sum(len(m.get("content") or "") for m in request.get("messages", []))
+        prompt_tokens = (prompt_chars + len(json.dumps(request.get("tools") or ""))) // 4
+        self._send(200, {
+            "id":      f"chatcmpl-fake-{self.served}",
+            "object":  "chat.completion",
+            "created": int(time.time()),
+            "model":   request.get("model", "fake"),
+            "choices": [{
+                "index":         0,
+                "message":       reply,
+                "finish_reason": finish,
+            }],
+            "usage": {
+                "prompt_tokens":     prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens":      prompt_tokens + len(content) // 4,
+            },
+        })
+
+    def log_message(self, *args) -> None:                         # quiet
+        pass
+
+
+def serve(port: int, latency_ms: float, jitter_ms: float) -> ThreadingHTTPServer:
+    """Start the fake provider on a daemon thread; returns the server (call .shutdown())."""
+    _Handler.latency_s = latency_ms / 1000
+    _Handler.jitter_s  = jitter_ms / 1000
+    server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[FakeLLM] 🧪 Listening on http://127.0.0.1:{port}/v1  (latency {latency_ms:g}±{jitter_ms:g} ms)")
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible provider for load tests")
+    parser.add_argument("--port",       type=int,   default=9100)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms",  type=float, default=100)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency_ms, args.jitter_ms)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"[FakeLLM] 🛑 Stopped after {_Handler.served} completion(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+benchmarks/load_test.py
+=======================
+Offline load test for POST /api/chat — realistic message mix, fake LLM,
+local Postgres. Reports p50/p95/p99 latency per scenario and requests/second.
+
+Each scenario produces messages for one tool, phrased either so the
+rule-based intent parser answers them ("rules") or so they need the LLM
+("llm"). Cities, vehicles and dates are randomised, so the LLM cache
+sees a realistic number of repeats; deletes target ids the run created.
+
+Offline setup (from backend/):
+    docker compose -f benchmarks/docker-compose.yml up -d
+    python -m benchmarks.load_test --spawn --requests 2000 --concurrency 50
+
+--spawn starts benchmarks/fake_llm.py in-process and uvicorn with
+ENV_FILE=benchmarks/bench.env, then stops both. Without it, point --url at
+a server you started yourself (with the same env file).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.agents.cities import CITY_MAP
+from benchmarks import fake_llm
+
+_BACKEND  = Path(__file__).resolve().parent.parent
+_CITIES   = sorted(set(CITY_MAP.values()))
+_VEHICLES = ["train", "bus", "flight", "car", "bike"]
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Message mix
+# ─────────────────────────────────────────────────────────────────
+class _Mix:
+    """Weighted scenarios → (scenario name, message)."""
+
+    SCENARIOS: dict[str, int] = {     # name → weight
+        "greeting":          5,
+        "create_rules":     25,
+        "create_llm":       20,
+        "multi_llm":         5,
+        "history_rules":    15,
+        "history_llm":      10,
+        "update_llm":       10,
+        "delete_rules":     10,
+    }
+
+    def __init__(self, seed: int) -> None:
+        self.rng     = random.Random(seed)
+        self.created: list[int] = []
+        self.names   = list(self.SCENARIOS)
+        self.weights = list(self.SCENARIOS.values())
+
+    def _route(self) -> tuple[str, str]:
+        a, b = self.rng.sample(_CITIES, 2)
+        return a, b
+
+    def _date(self) -> str:
+        return (date(2030, 1, 1) + timedelta(days=self.rng.randrange(365))).isoformat()
+
+    def next(self) -> tuple[str, str]:
+        name = self.rng.choices(self.names, self.weights)[0]
+        v, (a, b), d = self.rng.choice(_VEHICLES), self._route(), self._date()
+        if name == "greeting":
+            return name, self.rng.choice(["hello", "hi", "good morning", "thanks"])
+        if name == "create_rules":
+            return name, f"book {v} from {a} to {b} on {d}"
+        if name == "create_llm":
+            return name, f"I need a {v} ticket from {a} to {b} for {d} please"
+        if name == "multi_llm":
+            back = self.rng.choice(_VEHICLES)
+            return name, f"Plan my trip: {v} from {a} to {b} on {d} and return by {back} on {self._date()}"
+        if name == "history_rules":
+            return name, self.rng.choice([f"show my {v} history", "show my travel history", f"list my {v} bookings"])
+        if name == "history_llm":
+            d1, d2 = sorted([d, self._date()])
+            return name, f"which trips did I take between {d1} and {d2}?"
+        if name == "update_llm":
+            return name, f"please change my {v} from {a} to {b} on {d} to {self._date()}"
+        # delete_rules — prefer an id this run created
+        bid = self.created.pop(self.rng.randrange(len(self.created))) if self.created else self.rng.randint(1, 10_000)
+        return name, f"cancel booking {bid}"
+
+    def record(self, body: dict) -> None:
+        for b in body.get("bookings") or []:
+            self.created.append(b["id"])
+
+
+# ─────────────────────────────────────────────────────────────────
+#  Driver
+# ─────────────────────────────────────────────────────────────────
+def _pct(sorted_ms: list[float], q: float) -> float:
+    """Nearest-rank percentile."""
+    if not sorted_ms:
+        return 0.0
+    return sorted_ms[min(len(sorted_ms) - 1, max(0, int(round(q * len(sorted_ms))) - 1))]
+
+
+async def _worker(client: httpx.AsyncClient, mix: _Mix, remaining: list[int], results: dict) -> None:
+    while remaining[0] > 0:
+        remaining[0] -= 1
+        name, message = mix.next()
+        t0 = time.perf_counter()
+        try:
+            r = await client.post("/api/chat", json={"message": message})
+            r.raise_for_status()
+            ms = (time.perf_counter() - t0) * 1000
+            mix.record(r.json())
+            results.setdefault(name, {"ms": [], "errors": []})["ms"].append(ms)
+        except Exception as exc:
+            results.setdefault(name, {"ms": [], "errors": []})["errors"].append(f"{type(exc).__name__}: {exc}")
+
+
+def _report(results: dict, elapsed: float) -> None:
+    print(f"\n{'scenario':<15}{'ok':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    everything: list[float] = []
+    errors = 0
+    for name in _Mix.SCENARIOS:
+        if name not in results:
+            continue
+        ms = sorted(results[name]["ms"])
+        everything.extend(ms)
+        errors += len(results[name]["errors"])
+        print(
+            f"{name:<15}{len(ms):>6}{len(results[name]['errors']):>5}"
+            f"{_pct(ms, .50):>10.1f}{_pct(ms, .95):>10.1f}{_pct(ms, .99):>10.1f}"
+        )
+    everything.sort()
+    print(
+        f"{'ALL':<15}{len(everything):>6}{errors:>5}"
+        f"{_pct(everything, .50):>10.1f}{_pct(everything, .95):>10.1f}{_pct(everything, .99):>10.1f}"
+    )
+    print(f"\nthroughput: {len(everything) / elapsed:.2f} req/s over {elapsed:.1f} s")
+    first = next((r["errors"][0] for r in results.values() if r["errors"]), None)
+    if first:
+        print(f"first error: {first}")
+
+
+async def _run(url: str, total: int, concurrency: int, seed: int) -> None:
+    mix       = _Mix(seed)
+    results:  dict = {}
+    remaining = [total]
+    limits    = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, timeout=120.0, limits=limits) as client:
+        print(f"\n{url}/api/chat  ×{total}  concurrency={concurrency}  seed={seed}")
+        t0 = time.perf_counter()
+        await asyncio.gather(*(_worker(client, mix, remaining, results) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - t0
+        _report(results, elapsed)
+
+        stats = (await client.get("/metrics", params={"format": "json"})).json()
+        print(
+            f"intent parser hit rate: {stats['intent_parser']['hit_rate']:.1%}   "
+            f"LLM cache hit rate: {stats['llm_cache']['hit_rate']:.1%}   "
+            f"DB pool peak: {stats['db_pool'].get('peak_in_use', 0)}"
+        )
+        for provider, t in stats.get("llm_tokens", {}).items():
+            print(
+                f"LLM tokens ({provider}): {t['calls']} call(s), avg prompt {t['avg_prompt']:.0f}, "
+                f"cached {t['cached_ratio']:.1%}, completion {t['completion']}"
+            )
+
+
+# ─────────────────────────────────────────────────────────────────
+#  --spawn: fake LLM + uvicorn
+# ─────────────────────────────────────────────────────────────────
+def _start_server(port: int, workers: int) -> subprocess.Popen:
+    env = {**os.environ, "ENV_FILE": str(_BACKEND / "benchmarks" / "bench.env")}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=_BACKEND, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f"uvicorn exited with {proc.returncode} — is the bench Postgres up?")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return proc
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    proc.terminate()
+    raise SystemExit("uvicorn did not become healthy within 60 s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--url",         default="http://127.0.0.1:8000")
+    parser.add_argument("--requests",    type=int,   default=1000)
+    parser.add_argument("--concurrency", type=int,   default=20)
+    parser.add_argument("--seed",        type=int,   default=7)
+    parser.add_argument("--spawn",       action="store_true", help="start fake LLM + uvicorn (bench.env)")
+    parser.add_argument("--port",        type=int,   default=8100, help="uvicorn port with --spawn")
+    parser.add_argument("--workers",     type=int,   default=1,    help="uvicorn workers with --spawn")
+    parser.add_argument("--latency-ms",  type=float, default=400,  help="fake LLM latency with --spawn")
+    parser.add_argument("--jitter-ms",   type=float, default=100)
+    args = parser.parse_args()
+
+    fake = server = None
+    url  = args.url
+    if args.spawn:
+        fake   = fake_llm.serve(9100, args.latency_ms, args.jitter_ms)   # port fixed in bench.env
+        server = _start_server(args.port, args.workers)
+        url    = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(_run(url, args.requests, args.concurrency, args.seed))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=15)
+        if fake is not None:
+            fake.shutdown()
+
+
+if __name__ == "__main__":
+    main()
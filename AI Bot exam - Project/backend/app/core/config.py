@@ -28,6 +28,9 @@ class Settings(BaseSettings):
     DB_NAME: str = os.getenv("DB_NAME")
     DB_USER: str = os.getenv("DB_USER")
     DB_PASSWORD: str = os.getenv("DB_PASSWORD")
+    DB_POOL_MIN: int = int(os.getenv("DB_POOL_MIN", 2))
+    DB_POOL_MAX: int = int(os.getenv("DB_POOL_MAX", 20))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
 
     @property
     def DATABASE_URL(self) -> str:
@@ -35,7 +38,11 @@ class Settings(BaseSettings):
 
     @property
     def DSN(self) -> str:
-        return f"dbname={self.DB_NAME} user={self.DB_USER} password={self.DB_PASSWORD} host={self.DB_HOST} port={self.DB_PORT}"
+        from psycopg.conninfo import make_conninfo  # quotes values, drops unset ones
+        return make_conninfo(
+            dbname=self.DB_NAME, user=self.DB_USER, password=self.DB_PASSWORD,
+            host=self.DB_HOST, port=self.DB_PORT,
+        )
 
     # JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY")
@@ -67,6 +74,8 @@ class Settings(BaseSettings):
 
     # Default LLM
     DEFAULT_LLM: str = os.getenv("DEFAULT_LLM", "openai")
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 8))  # in-flight calls per provider
+    LLM_TIMEOUT: float = float(os.getenv("LLM_TIMEOUT", 60))  # seconds per request
 
     # Upload
     UPLOAD_DIR: str = "uploads"
@@ -1,41 +1,150 @@
-import psycopg2
-import psycopg2.pool
-import psycopg2.extras
 import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Optional, Sequence
+
+import psycopg
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, PoolTimeout
+
 from app.core.config import settings
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 logger = logging.getLogger(__name__)
 
-# Connection pool
-_pool = None
+# Async connection pool (psycopg 3). Routers borrow a connection only for the
+# statements they run — never across an LLM / TTS await.
+_pool: Optional[AsyncConnectionPool] = None
+
+# Usage counters on top of psycopg_pool's own get_stats()
+_stats = {
+    "acquired": 0,
+    "in_use": 0,
+    "peak_in_use": 0,
+    "timeouts": 0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms": 0.0,
+    "hold_total_ms": 0.0,
+    "hold_max_ms": 0.0,
+}
+
 
-def get_pool():
+def get_pool() -> AsyncConnectionPool:
     global _pool
     if _pool is None:
-        _pool = psycopg2.pool.ThreadedConnectionPool(
-            minconn=2,
-            maxconn=20,
-            host=settings.DB_HOST,
-            port=settings.DB_PORT,
-            dbname=settings.DB_NAME,
-            user=settings.DB_USER,
-            password=settings.DB_PASSWORD,
+        # Same keyword args as init_db — psycopg quotes them (spaces, quotes, '='
+        # in the password) and drops unset ones, unlike a formatted conninfo string.
+        _pool = AsyncConnectionPool(
+            conninfo="",
+            min_size=settings.DB_POOL_MIN,
+            max_size=settings.DB_POOL_MAX,
+            timeout=settings.DB_POOL_TIMEOUT,
+            kwargs={
+                "host": settings.DB_HOST,
+                "port": settings.DB_PORT,
+                "dbname": settings.DB_NAME,
+                "user": settings.DB_USER,
+                "password": settings.DB_PASSWORD,
+                "row_factory": dict_row,
+            },
+            open=False,
+            name="interview",
         )
     return _pool
 
-def get_conn():
-    return get_pool().getconn()
 
-def release_conn(conn):
-    get_pool().putconn(conn)
+async def open_pool():
+    await get_pool().open(wait=True)
+    logger.info(f"DB pool open ({settings.DB_POOL_MIN}..{settings.DB_POOL_MAX} connections)")
 
-def get_db():
-    conn = get_conn()
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("DB pool closed")
+
+
+@asynccontextmanager
+async def connection() -> AsyncIterator[psycopg.AsyncConnection]:
+    """Borrow a pooled connection; commits on success, rolls back on error."""
+    start = time.perf_counter()
     try:
-        yield conn
-    finally:
-        release_conn(conn)
+        async with get_pool().connection() as conn:
+            acquired = time.perf_counter()
+            wait_ms = (acquired - start) * 1000
+            _stats["acquired"] += 1
+            _stats["in_use"] += 1
+            _stats["peak_in_use"] = max(_stats["peak_in_use"], _stats["in_use"])
+            _stats["wait_total_ms"] += wait_ms
+            _stats["wait_max_ms"] = max(_stats["wait_max_ms"], wait_ms)
+            try:
+                yield conn
+            finally:
+                hold_ms = (time.perf_counter() - acquired) * 1000
+                _stats["in_use"] -= 1
+                _stats["hold_total_ms"] += hold_ms
+                _stats["hold_max_ms"] = max(_stats["hold_max_ms"], hold_ms)
+    except PoolTimeout:
+        _stats["timeouts"] += 1
+        logger.error(f"No DB connection free after {settings.DB_POOL_TIMEOUT}s")
+        raise
+
+
+@asynccontextmanager
+async def transaction() -> AsyncIterator[psycopg.AsyncConnection]:
+    """Several statements that must commit together."""
+    async with connection() as conn:
+        async with conn.transaction():
+            yield conn
+
+
+async def fetch_one(query: str, params: Sequence[Any] = (), conn: Optional[psycopg.AsyncConnection] = None) -> Optional[dict]:
+    if conn is not None:
+        cur = await conn.execute(query, params)
+        return await cur.fetchone()
+    async with connection() as c:
+        cur = await c.execute(query, params)
+        return await cur.fetchone()
+
+
+async def fetch_all(query: str, params: Sequence[Any] = (), conn: Optional[psycopg.AsyncConnection] = None) -> list:
+    if conn is not None:
+        cur = await conn.execute(query, params)
+        return await cur.fetchall()
+    async with connection() as c:
+        cur = await c.execute(query, params)
+        return await cur.fetchall()
+
+
+async def execute(query: str, params: Sequence[Any] = (), conn: Optional[psycopg.AsyncConnection] = None) -> int:
+    """INSERT / UPDATE / DELETE without RETURNING; returns the row count."""
+    if conn is not None:
+        cur = await conn.execute(query, params)
+        return cur.rowcount
+    async with connection() as c:
+        cur = await c.execute(query, params)
+        return cur.rowcount
+
+
+def pool_stats() -> dict:
+    """Pool size / waiting requests (psycopg_pool) + acquire wait and hold times."""
+    if _pool is None:
+        return {"status": "not_started"}
+    acquired = _stats["acquired"] or 1
+    return {
+        "status": "ok",
+        **_pool.get_stats(),
+        "acquired": _stats["acquired"],
+        "in_use": _stats["in_use"],
+        "peak_in_use": _stats["peak_in_use"],
+        "timeouts": _stats["timeouts"],
+        "wait_avg_ms": round(_stats["wait_total_ms"] / acquired, 2),
+        "wait_max_ms": round(_stats["wait_max_ms"], 2),
+        "hold_avg_ms": round(_stats["hold_total_ms"] / acquired, 2),
+        "hold_max_ms": round(_stats["hold_max_ms"], 2),
+    }
+
 
 async def init_db():
     """Initialize database and create database/tables if not exist."""
@@ -45,36 +154,36 @@ async def init_db():
 
     try:
         # STEP 1: Connect to default postgres database
-        temp_conn = psycopg2.connect(
+        temp_conn = await psycopg.AsyncConnection.connect(
             host=settings.DB_HOST,
             port=settings.DB_PORT,
             dbname="postgres",
             user=settings.DB_USER,
             password=settings.DB_PASSWORD,
+            autocommit=True,
         )
 
-        temp_conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         temp_cur = temp_conn.cursor()
 
         # STEP 2: Check if target DB exists
-        temp_cur.execute(
+        await temp_cur.execute(
             "SELECT 1 FROM pg_database WHERE datname = %s",
             (settings.DB_NAME,)
         )
 
-        exists = temp_cur.fetchone()
+        exists = await temp_cur.fetchone()
 
         # STEP 3: Create DB if missing
         if not exists:
             logger.info(f"Creating database: {settings.DB_NAME}")
-            temp_cur.execute(f'CREATE DATABASE "{settings.DB_NAME}"')
+            await temp_cur.execute(f'CREATE DATABASE "{settings.DB_NAME}"')
             logger.info("Database created successfully")
 
-        temp_cur.close()
-        temp_conn.close()
+        await temp_cur.close()
+        await temp_conn.close()
 
         # STEP 4: Connect to actual application DB
-        conn = psycopg2.connect(
+        conn = await psycopg.AsyncConnection.connect(
             host=settings.DB_HOST,
             port=settings.DB_PORT,
             dbname=settings.DB_NAME,
@@ -85,7 +194,7 @@ async def init_db():
         cur = conn.cursor()
 
         # USERS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS users (
                 id SERIAL PRIMARY KEY,
                 email VARCHAR(255) UNIQUE NOT NULL,
@@ -99,7 +208,7 @@ async def init_db():
         """)
 
         # RESUMES TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS resumes (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
@@ -124,7 +233,7 @@ async def init_db():
         """)
 
         # INTERVIEW CONFIGS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS interview_configs (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
@@ -149,7 +258,7 @@ async def init_db():
         """)
 
         # INTERVIEW SESSIONS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS interview_sessions (
                 id SERIAL PRIMARY KEY,
                 user_id INTEGER REFERENCES users(id) ON DELETE CASCADE,
@@ -173,7 +282,7 @@ async def init_db():
         """)
 
         # QUESTIONS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS questions (
                 id SERIAL PRIMARY KEY,
                 session_id INTEGER REFERENCES interview_sessions(id) ON DELETE CASCADE,
@@ -193,7 +302,7 @@ async def init_db():
         """)
 
         # ANSWERS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS answers (
                 id SERIAL PRIMARY KEY,
                 session_id INTEGER REFERENCES interview_sessions(id) ON DELETE CASCADE,
@@ -217,7 +326,7 @@ async def init_db():
         """)
 
         # VOICE METRICS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS voice_metrics (
                 id SERIAL PRIMARY KEY,
                 session_id INTEGER REFERENCES interview_sessions(id) ON DELETE CASCADE,
@@ -235,7 +344,7 @@ async def init_db():
         """)
 
         # ANALYTICS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS analytics (
                 id SERIAL PRIMARY KEY,
                 session_id INTEGER REFERENCES interview_sessions(id) ON DELETE CASCADE,
@@ -258,7 +367,7 @@ async def init_db():
         """)
 
         # REPORTS TABLE
-        cur.execute("""
+        await cur.execute("""
             CREATE TABLE IF NOT EXISTS reports (
                 id SERIAL PRIMARY KEY,
                 session_id INTEGER REFERENCES interview_sessions(id) ON DELETE CASCADE,
@@ -270,20 +379,20 @@ async def init_db():
         """)
 
         # Create indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON interview_sessions(user_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_token ON interview_sessions(session_token);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_questions_session ON questions(session_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id);")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes(user_id);")
-
-        conn.commit()
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);")
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON interview_sessions(user_id);")
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_sessions_token ON interview_sessions(session_token);")
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_questions_session ON questions(session_id);")
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_answers_session ON answers(session_id);")
+        await cur.execute("CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes(user_id);")
+
+        await conn.commit()
         logger.info("All database tables created/verified successfully.")
     except Exception as e:
         logger.error(f"Database initialization error: {e}")
         if conn:
-            conn.rollback()
+            await conn.rollback()
         raise
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            await conn.close()
@@ -5,7 +5,8 @@ import logging
 import os
 
 from app.core.config import settings
-from app.database.connection import init_db
+from app.database.connection import init_db, open_pool, close_pool, pool_stats
+from app.services.llm_service import close_clients, llm_stats
 from app.routers import auth, interview, resume, analytics, voice, websocket_router
 
 logging.basicConfig(level=logging.INFO)
@@ -31,11 +32,14 @@ app.add_middleware(
 async def startup_event():
     logger.info("Starting AI Interview Platform...")
     await init_db()
+    await open_pool()
     logger.info("Database initialized successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down AI Interview Platform...")
+    await close_clients()
+    await close_pool()
 
 # Mount static files for uploads
 os.makedirs("uploads", exist_ok=True)
@@ -55,4 +59,4 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy", "db_pool": pool_stats(), "llm": llm_stats()}
\ No newline at end of file
@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-import psycopg2.extras
 import os, uuid, json, logging
-from app.database.connection import get_db
+from app.database.connection import execute, fetch_all, fetch_one
 from app.core.security import get_current_user
 from app.core.config import settings
 from app.services.resume_service import extract_text_from_file, analyze_resume
@@ -13,7 +12,6 @@ logger = logging.getLogger(__name__)
 async def upload_resume(
     file: UploadFile = File(...),
     current_user=Depends(get_current_user),
-    conn=Depends(get_db)
 ):
     if file.content_type not in ["application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
         raise HTTPException(status_code=400, detail="Only PDF and DOCX files allowed")
@@ -26,27 +24,23 @@ async def upload_resume(
         raise HTTPException(status_code=400, detail="File too large (max 10MB)")
     with open(file_path, "wb") as f:
         f.write(content)
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute(
+    row = await fetch_one(
         "INSERT INTO resumes (user_id, filename, file_path) VALUES (%s,%s,%s) RETURNING id",
         (current_user["user_id"], file.filename, file_path)
     )
-    resume_id = cur.fetchone()["id"]
-    conn.commit()
+    resume_id = row["id"]
     return {"resume_id": resume_id, "filename": file.filename, "message": "Uploaded successfully"}
 
 @router.post("/analyze/{resume_id}")
-async def analyze(resume_id: int, current_user=Depends(get_current_user), conn=Depends(get_db)):
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT * FROM resumes WHERE id=%s AND user_id=%s", (resume_id, current_user["user_id"]))
-    resume = cur.fetchone()
+async def analyze(resume_id: int, current_user=Depends(get_current_user)):
+    resume = await fetch_one("SELECT * FROM resumes WHERE id=%s AND user_id=%s", (resume_id, current_user["user_id"]))
     if not resume:
         raise HTTPException(status_code=404, detail="Resume not found")
     raw_text = await extract_text_from_file(resume["file_path"], resume["filename"])
     if not raw_text.strip():
         raise HTTPException(status_code=422, detail="Could not extract text from resume")
     parsed = await analyze_resume(raw_text)
-    cur.execute("""
+    await execute("""
         UPDATE resumes SET
             raw_text=%s, parsed_data=%s,
             ats_score=%s, ai_readiness_score=%s, ml_readiness_score=%s, genai_readiness_score=%s,
@@ -63,7 +57,6 @@ async def analyze(resume_id: int, current_user=Depends(get_current_user), conn=D
         parsed.get("experience_years", 0), json.dumps(parsed.get("education", [])),
         resume_id
     ))
-    conn.commit()
     return {
         "resume_id": resume_id,
         "ats_score": parsed.get("ats_score", 0),
@@ -82,16 +75,12 @@ async def analyze(resume_id: int, current_user=Depends(get_current_user), conn=D
     }
 
 @router.get("/list")
-async def list_resumes(current_user=Depends(get_current_user), conn=Depends(get_db)):
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT id, filename, ats_score, ai_readiness_score, created_at FROM resumes WHERE user_id=%s ORDER BY created_at DESC", (current_user["user_id"],))
-    return cur.fetchall()
+async def list_resumes(current_user=Depends(get_current_user)):
+    return await fetch_all("SELECT id, filename, ats_score, ai_readiness_score, created_at FROM resumes WHERE user_id=%s ORDER BY created_at DESC", (current_user["user_id"],))
 
 @router.get("/{resume_id}")
-async def get_resume(resume_id: int, current_user=Depends(get_current_user), conn=Depends(get_db)):
-    cur = conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor)
-    cur.execute("SELECT * FROM resumes WHERE id=%s AND user_id=%s", (resume_id, current_user["user_id"]))
-    r = cur.fetchone()
+async def get_resume(resume_id: int, current_user=Depends(get_current_user)):
+    r = await fetch_one("SELECT * FROM resumes WHERE id=%s AND user_id=%s", (resume_id, current_user["user_id"]))
     if not r:
         raise HTTPException(status_code=404, detail="Resume not found")
     return r
\ No newline at end of file
@@ -1,11 +1,86 @@
+import asyncio
 import json
 import logging
 import re
+from contextlib import asynccontextmanager
 from typing import Any, Dict, Optional
+import httpx
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# One long-lived client per provider (keep-alive connection pool), built on
+# first use and closed on shutdown; a semaphore per provider caps in-flight calls.
+_clients: Dict[str, Any] = {}
+_semaphores: Dict[str, asyncio.Semaphore] = {}
+_in_flight: Dict[str, int] = {}
+
+def _http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=settings.LLM_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONCURRENCY,
+            max_keepalive_connections=settings.LLM_MAX_CONCURRENCY,
+        ),
+    )
+
+def _client(provider: str):
+    client = _clients.get(provider)
+    if client is not None:
+        return client
+    if provider == "openai":
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=_http_client())
+    elif provider == "claude":
+        import anthropic
+        client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY, http_client=_http_client())
+    elif provider == "groq":
+        from groq import AsyncGroq
+        client = AsyncGroq(api_key=settings.GROQ_API_KEY, http_client=_http_client())
+    elif provider == "gemini":
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        client = genai.GenerativeModel(settings.GEMINI_MODEL)
+    else:
+        raise ValueError(f"Unknown LLM provider: {provider}")
+    _clients[provider] = client
+    logger.info(f"LLM client ready: {provider}")
+    return client
+
+@asynccontextmanager
+async def _slot(provider: str):
+    """Hold one of the provider's LLM_MAX_CONCURRENCY slots for a call."""
+    sem = _semaphores.get(provider)
+    if sem is None:
+        sem = _semaphores[provider] = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    async with sem:
+        _in_flight[provider] = _in_flight.get(provider, 0) + 1
+        try:
+            yield
+        finally:
+            _in_flight[provider] = _in_flight.get(provider, 1) - 1
+
+async def close_clients():
+    """Close every provider client's connection pool (app shutdown)."""
+    for provider, client in list(_clients.items()):
+        close = getattr(client, "close", None)       # Gemini's model has no pool of its own
+        if close is not None:
+            try:
+                await close()
+            except Exception as e:
+                logger.warning(f"Closing {provider} client failed: {e}")
+    _clients.clear()
+    _semaphores.clear()
+    _in_flight.clear()
+
+def llm_stats() -> dict:
+    """In-flight calls per provider (out of LLM_MAX_CONCURRENCY)."""
+    return {
+        "max_concurrency": settings.LLM_MAX_CONCURRENCY,
+        "clients": sorted(_clients),
+        "in_flight": dict(_in_flight),
+    }
+
 async def call_llm(prompt: str, llm_provider: str = None, system_prompt: str = None, temperature: float = 0.7) -> str:
     """Unified LLM caller supporting OpenAI, Claude, Gemini, Groq."""
     provider = llm_provider or settings.DEFAULT_LLM
@@ -31,23 +106,22 @@ async def call_llm(prompt: str, llm_provider: str = None, system_prompt: str = N
             return "{}"
 
 async def _call_openai(prompt: str, system_prompt: str = None, temperature: float = 0.7) -> str:
-    from openai import AsyncOpenAI
-    client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+    client = _client("openai")
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
-    response = await client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        messages=messages,
-        temperature=temperature,
-        response_format={"type": "json_object"} if "JSON" in prompt else None,
-    )
+    async with _slot("openai"):
+        response = await client.chat.completions.create(
+            model=settings.OPENAI_MODEL,
+            messages=messages,
+            temperature=temperature,
+            response_format={"type": "json_object"} if "JSON" in prompt else None,
+        )
     return response.choices[0].message.content
 
 async def _call_claude(prompt: str, system_prompt: str = None, temperature: float = 0.7) -> str:
-    import anthropic
-    client = anthropic.AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+    client = _client("claude")
     kwargs = {
         "model": settings.CLAUDE_MODEL,
         "max_tokens": 4096,
@@ -56,29 +130,29 @@ async def _call_claude(prompt: str, system_prompt: str = None, temperature: floa
     }
     if system_prompt:
         kwargs["system"] = system_prompt
-    response = await client.messages.create(**kwargs)
+    async with _slot("claude"):
+        response = await client.messages.create(**kwargs)
     return response.content[0].text
 
 async def _call_gemini(prompt: str, system_prompt: str = None, temperature: float = 0.7) -> str:
-    import google.generativeai as genai
-    genai.configure(api_key=settings.GOOGLE_API_KEY)
-    model = genai.GenerativeModel(settings.GEMINI_MODEL)
+    model = _client("gemini")
     full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
-    response = await model.generate_content_async(full_prompt)
+    async with _slot("gemini"):
+        response = await model.generate_content_async(full_prompt)
     return response.text
 
 async def _call_groq(prompt: str, system_prompt: str = None, temperature: float = 0.7) -> str:
-    from groq import AsyncGroq
-    client = AsyncGroq(api_key=settings.GROQ_API_KEY)
+    client = _client("groq")
     messages = []
     if system_prompt:
         messages.append({"role": "system", "content": system_prompt})
     messages.append({"role": "user", "content": prompt})
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=messages,
-        temperature=temperature,
-    )
+    async with _slot("groq"):
+        response = await client.chat.completions.create(
+            model=settings.GROQ_MODEL,
+            messages=messages,
+            temperature=temperature,
+        )
     return response.choices[0].message.content
 
 def parse_json_response(text: str) -> Dict[str, Any]:
@@ -1,7 +1,9 @@
+import asyncio
 import json
 import logging
+import time
 import uuid
-from typing import Any, Dict, List, Optional, TypedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypedDict
 from app.services.llm_service import call_llm, parse_json_response
 
 logger = logging.getLogger(__name__)
@@ -336,6 +338,29 @@ def _decrease_difficulty(current: str) -> str:
     idx = order.index(current) if current in order else 1
     return order[max(idx - 1, 0)]
 
+# ── Parallel Branches ──────────────────────────────────────────────────────────
+Node = Callable[[InterviewState], Awaitable[InterviewState]]
+
+async def run_parallel(state: InterviewState, *nodes: Node) -> InterviewState:
+    """Run independent nodes concurrently and merge what each one wrote into state.
+
+    Every branch works on its own shallow copy, so no branch sees another's
+    partial writes. Keys a branch added or replaced are merged back in node
+    order; if two branches write the same key, the later node wins.
+    """
+    results = await asyncio.gather(*(node(InterviewState(**state)) for node in nodes))
+    merged = InterviewState(**state)
+    written: Dict[str, str] = {}
+    for node, result in zip(nodes, results):
+        for key, value in result.items():
+            if key in state and state[key] is value:
+                continue
+            if key in written:
+                logger.warning(f"Parallel branches {written[key]} and {node.__name__} both wrote '{key}'")
+            merged[key] = value
+            written[key] = node.__name__
+    return merged
+
 # ── Main Interview Graph Runner ────────────────────────────────────────────────
 async def run_config_analysis(config: dict, llm_provider: str = "openai") -> dict:
     state = InterviewState(config=config, llm_provider=llm_provider,
@@ -361,8 +386,9 @@ async def evaluate_answer(question: dict, answer: str, config: dict,
         config=config, llm_provider=llm_provider,
         difficulty_level=question.get("difficulty", "Medium"),
     )
-    state = await answer_evaluator_node(state)
-    state = await voice_analytics_node(state)
+    start = time.perf_counter()
+    state = await run_parallel(state, answer_evaluator_node, voice_analytics_node)
+    logger.info(f"Answer evaluated in {(time.perf_counter() - start) * 1000:.0f} ms (evaluator + voice analytics in parallel)")
     return state.get("evaluation", {}), state.get("voice_analytics", {}), state.get("difficulty_level", "Medium")
 
 async def generate_final_report(config: dict, resume_analysis: dict,
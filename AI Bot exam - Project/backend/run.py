@@ -1,9 +1,15 @@
+import asyncio
+import sys
 import uvicorn
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# psycopg's async pool needs a selector event loop (Windows defaults to Proactor)
+if sys.platform == "win32":
+    asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",